@@ -35,7 +35,6 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_locations_id'), 'locations', ['id'], unique=False)
     op.create_index(op.f('ix_locations_name'), 'locations', ['name'], unique=False)
     
     # Create hazards table
@@ -53,7 +52,6 @@ def upgrade() -> None:
         sa.UniqueConstraint('hazard_type')
     )
     op.create_index(op.f('ix_hazards_hazard_type'), 'hazards', ['hazard_type'], unique=True)
-    op.create_index(op.f('ix_hazards_id'), 'hazards', ['id'], unique=False)
     
     # Create risk_assessments table
     op.create_table(
@@ -73,7 +71,6 @@ def upgrade() -> None:
     )
     op.create_index(op.f('ix_risk_assessments_assessed_at'), 'risk_assessments', ['assessed_at'], unique=False)
     op.create_index(op.f('ix_risk_assessments_hazard_id'), 'risk_assessments', ['hazard_id'], unique=False)
-    op.create_index(op.f('ix_risk_assessments_id'), 'risk_assessments', ['id'], unique=False)
     op.create_index(op.f('ix_risk_assessments_location_id'), 'risk_assessments', ['location_id'], unique=False)
     
     # Create historical_data table
@@ -95,28 +92,23 @@ def upgrade() -> None:
     )
     op.create_index(op.f('ix_historical_data_event_date'), 'historical_data', ['event_date'], unique=False)
     op.create_index(op.f('ix_historical_data_hazard_id'), 'historical_data', ['hazard_id'], unique=False)
-    op.create_index(op.f('ix_historical_data_id'), 'historical_data', ['id'], unique=False)
     op.create_index(op.f('ix_historical_data_location_id'), 'historical_data', ['location_id'], unique=False)
 
 
 def downgrade() -> None:
     """Drop all tables."""
     op.drop_index(op.f('ix_historical_data_location_id'), table_name='historical_data')
-    op.drop_index(op.f('ix_historical_data_id'), table_name='historical_data')
     op.drop_index(op.f('ix_historical_data_hazard_id'), table_name='historical_data')
     op.drop_index(op.f('ix_historical_data_event_date'), table_name='historical_data')
     op.drop_table('historical_data')
     
     op.drop_index(op.f('ix_risk_assessments_location_id'), table_name='risk_assessments')
-    op.drop_index(op.f('ix_risk_assessments_id'), table_name='risk_assessments')
     op.drop_index(op.f('ix_risk_assessments_hazard_id'), table_name='risk_assessments')
     op.drop_index(op.f('ix_risk_assessments_assessed_at'), table_name='risk_assessments')
     op.drop_table('risk_assessments')
     
-    op.drop_index(op.f('ix_hazards_id'), table_name='hazards')
     op.drop_index(op.f('ix_hazards_hazard_type'), table_name='hazards')
     op.drop_table('hazards')
     
     op.drop_index(op.f('ix_locations_name'), table_name='locations')
-    op.drop_index(op.f('ix_locations_id'), table_name='locations')
     op.drop_table('locations')
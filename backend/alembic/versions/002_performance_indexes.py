@@ -43,20 +43,8 @@ def upgrade() -> None:
         unique=False
     )
     
-    # Foreign key indexes for join performance
-    op.create_index(
-        'idx_risk_assessments_location_id',
-        'risk_assessments',
-        ['location_id'],
-        unique=False
-    )
-    
-    op.create_index(
-        'idx_risk_assessments_hazard_id',
-        'risk_assessments',
-        ['hazard_id'],
-        unique=False
-    )
+    # Single-column foreign key, time and hazard_type indexes already exist
+    # as ix_* from 001, so only composite and new columns are indexed here
     
     # Composite index for location-hazard lookups
     op.create_index(
@@ -74,37 +62,6 @@ def upgrade() -> None:
         unique=False
     )
     
-    # Time-based index for recent assessments
-    op.create_index(
-        'idx_risk_assessments_assessed_at',
-        'risk_assessments',
-        ['assessed_at'],
-        unique=False
-    )
-    
-    # Historical data indexes
-    op.create_index(
-        'idx_historical_data_location_id',
-        'historical_data',
-        ['location_id'],
-        unique=False
-    )
-    
-    op.create_index(
-        'idx_historical_data_hazard_id',
-        'historical_data',
-        ['hazard_id'],
-        unique=False
-    )
-    
-    # Time-based index for historical queries
-    op.create_index(
-        'idx_historical_data_event_date',
-        'historical_data',
-        ['event_date'],
-        unique=False
-    )
-    
     # Composite index for location-hazard-date queries
     op.create_index(
         'idx_historical_data_location_hazard_date',
@@ -112,32 +69,16 @@ def upgrade() -> None:
         ['location_id', 'hazard_id', 'event_date'],
         unique=False
     )
-    
-    # Hazard type index for filtering
-    op.create_index(
-        'idx_hazards_type',
-        'hazards',
-        ['hazard_type'],
-        unique=False
-    )
 
 
 def downgrade() -> None:
     """Remove performance indexes."""
     
     # Drop all indexes in reverse order
-    op.drop_index('idx_hazards_type', table_name='hazards')
-    
     op.drop_index('idx_historical_data_location_hazard_date', table_name='historical_data')
-    op.drop_index('idx_historical_data_event_date', table_name='historical_data')
-    op.drop_index('idx_historical_data_hazard_id', table_name='historical_data')
-    op.drop_index('idx_historical_data_location_id', table_name='historical_data')
     
-    op.drop_index('idx_risk_assessments_assessed_at', table_name='risk_assessments')
     op.drop_index('idx_risk_assessments_risk_level', table_name='risk_assessments')
     op.drop_index('idx_risk_assessments_location_hazard', table_name='risk_assessments')
-    op.drop_index('idx_risk_assessments_hazard_id', table_name='risk_assessments')
-    op.drop_index('idx_risk_assessments_location_id', table_name='risk_assessments')
     
     op.drop_index('idx_locations_longitude', table_name='locations')
     op.drop_index('idx_locations_latitude', table_name='locations')
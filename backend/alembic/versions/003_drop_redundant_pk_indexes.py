@@ -0,0 +1,41 @@
+"""Drop redundant indexes on primary key columns
+
+Revision ID: 003_drop_redundant_pk_indexes
+Revises: 002_performance_indexes
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+# Every primary key is already backed by a unique B-tree, so these
+# secondary indexes only add write amplification and disk usage.
+REDUNDANT_PK_INDEXES = [
+    ('ix_locations_id', 'locations'),
+    ('ix_hazards_id', 'hazards'),
+    ('ix_risk_assessments_id', 'risk_assessments'),
+    ('ix_historical_data_id', 'historical_data'),
+]
+
+
+def upgrade() -> None:
+    """Drop indexes duplicating the primary key."""
+    
+    # IF EXISTS keeps this safe for databases created after 001 stopped
+    # emitting these indexes (supported by both SQLite and PostgreSQL)
+    for index_name, _ in REDUNDANT_PK_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    """Recreate the primary key indexes."""
+    
+    for index_name, table_name in REDUNDANT_PK_INDEXES:
+        op.create_index(index_name, table_name, ['id'], unique=False)
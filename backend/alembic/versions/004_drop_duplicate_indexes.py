@@ -0,0 +1,43 @@
+"""Drop idx_* indexes duplicating ix_* indexes from the initial schema
+
+Revision ID: 004_drop_duplicate_indexes
+Revises: 003_drop_redundant_pk_indexes
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+# (duplicate index, index kept, table, columns). The ix_* names match the
+# model definitions, so those are kept and the idx_* copies are dropped.
+DUPLICATE_INDEXES = [
+    ('idx_risk_assessments_location_id', 'ix_risk_assessments_location_id', 'risk_assessments', ['location_id']),
+    ('idx_risk_assessments_hazard_id', 'ix_risk_assessments_hazard_id', 'risk_assessments', ['hazard_id']),
+    ('idx_risk_assessments_assessed_at', 'ix_risk_assessments_assessed_at', 'risk_assessments', ['assessed_at']),
+    ('idx_historical_data_location_id', 'ix_historical_data_location_id', 'historical_data', ['location_id']),
+    ('idx_historical_data_hazard_id', 'ix_historical_data_hazard_id', 'historical_data', ['hazard_id']),
+    ('idx_historical_data_event_date', 'ix_historical_data_event_date', 'historical_data', ['event_date']),
+    ('idx_hazards_type', 'ix_hazards_hazard_type', 'hazards', ['hazard_type']),
+]
+
+
+def upgrade() -> None:
+    """Drop duplicate single-column indexes."""
+    
+    # 002 no longer creates these, so only older databases still have them
+    for duplicate, _, _, _ in DUPLICATE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {duplicate}")
+
+
+def downgrade() -> None:
+    """Recreate the duplicate indexes."""
+    
+    for duplicate, _, table_name, columns in DUPLICATE_INDEXES:
+        op.create_index(duplicate, table_name, columns, unique=False)
@@ -0,0 +1,62 @@
+"""Widen location-hazard composite indexes into covering indexes
+
+Revision ID: 005_covering_indexes
+Revises: 004_drop_duplicate_indexes
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace narrow composite indexes with covering ones."""
+    
+    # Latest-assessment lookups filter on (location_id, hazard_id) and order
+    # by assessed_at DESC; risk_score/risk_level ride along so the read is
+    # index-only. postgresql_include is ignored by other dialects.
+    op.create_index(
+        'idx_risk_assessments_location_hazard_assessed',
+        'risk_assessments',
+        ['location_id', 'hazard_id', sa.text('assessed_at DESC'), 'risk_score'],
+        unique=False,
+        postgresql_include=['risk_level']
+    )
+    op.drop_index('idx_risk_assessments_location_hazard', table_name='risk_assessments')
+    
+    # Trend queries filter on (location_id, hazard_id), range on event_date
+    # and read severity
+    op.create_index(
+        'idx_historical_data_location_hazard_date_severity',
+        'historical_data',
+        ['location_id', 'hazard_id', sa.text('event_date DESC'), 'severity'],
+        unique=False
+    )
+    op.drop_index('idx_historical_data_location_hazard_date', table_name='historical_data')
+
+
+def downgrade() -> None:
+    """Restore the narrower composite indexes."""
+    
+    op.create_index(
+        'idx_historical_data_location_hazard_date',
+        'historical_data',
+        ['location_id', 'hazard_id', 'event_date'],
+        unique=False
+    )
+    op.drop_index('idx_historical_data_location_hazard_date_severity', table_name='historical_data')
+    
+    op.create_index(
+        'idx_risk_assessments_location_hazard',
+        'risk_assessments',
+        ['location_id', 'hazard_id'],
+        unique=False
+    )
+    op.drop_index('idx_risk_assessments_location_hazard_assessed', table_name='risk_assessments')
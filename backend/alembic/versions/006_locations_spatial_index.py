@@ -0,0 +1,72 @@
+"""Add a spatial index for bounding-box location queries
+
+Revision ID: 006_locations_spatial_index
+Revises: 005_covering_indexes
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_RTREE_TRIGGERS = [
+    """
+    CREATE TRIGGER locations_rtree_insert AFTER INSERT ON locations BEGIN
+        INSERT INTO locations_rtree VALUES
+            (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER locations_rtree_update AFTER UPDATE OF latitude, longitude ON locations BEGIN
+        INSERT OR REPLACE INTO locations_rtree VALUES
+            (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER locations_rtree_delete AFTER DELETE ON locations BEGIN
+        DELETE FROM locations_rtree WHERE id = old.id;
+    END
+    """,
+]
+
+
+def upgrade() -> None:
+    """Create the dialect-specific spatial index over location points."""
+    
+    dialect = op.get_bind().dialect.name
+    
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE locations_rtree "
+            "USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+        )
+        op.execute(
+            "INSERT INTO locations_rtree "
+            "SELECT id, latitude, latitude, longitude, longitude FROM locations"
+        )
+        for trigger in SQLITE_RTREE_TRIGGERS:
+            op.execute(trigger)
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX idx_locations_gist ON locations "
+            "USING gist (point(longitude, latitude))"
+        )
+
+
+def downgrade() -> None:
+    """Drop the spatial index."""
+    
+    dialect = op.get_bind().dialect.name
+    
+    if dialect == 'sqlite':
+        for name in ('locations_rtree_insert', 'locations_rtree_update', 'locations_rtree_delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS locations_rtree")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS idx_locations_gist")
@@ -0,0 +1,38 @@
+"""Add precomputed risk hotspot ranking table
+
+Revision ID: 007_risk_hotspots_cache
+Revises: 006_locations_spatial_index
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the risk_hotspots_cache table."""
+    
+    # Rows are rebuilt lazily per hazard, so the table starts empty
+    op.create_table(
+        'risk_hotspots_cache',
+        sa.Column('hazard_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('risk_score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['hazard_id'], ['hazards.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('hazard_id', 'rank')
+    )
+
+
+def downgrade() -> None:
+    """Drop the risk_hotspots_cache table."""
+    
+    op.drop_table('risk_hotspots_cache')
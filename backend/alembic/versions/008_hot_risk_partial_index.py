@@ -0,0 +1,37 @@
+"""Add partial index over high and critical risk assessments
+
+Revision ID: 008_hot_risk_partial_index
+Revises: 007_risk_hotspots_cache
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import HOT_RISK_LEVEL_PREDICATE
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the partial index for alarming-assessment exports."""
+    
+    op.create_index(
+        'idx_risk_assessments_hot',
+        'risk_assessments',
+        [sa.text('assessed_at DESC'), sa.text('risk_score DESC')],
+        unique=False,
+        sqlite_where=sa.text(HOT_RISK_LEVEL_PREDICATE),
+        postgresql_where=sa.text(HOT_RISK_LEVEL_PREDICATE)
+    )
+
+
+def downgrade() -> None:
+    """Drop the partial index."""
+    
+    op.drop_index('idx_risk_assessments_hot', table_name='risk_assessments')
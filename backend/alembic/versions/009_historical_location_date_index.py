@@ -0,0 +1,43 @@
+"""Add location/event-date index for per-location history pages
+
+Revision ID: 009_historical_location_date_index
+Revises: 008_hot_risk_partial_index
+Create Date: 2025-11-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the (location_id, event_date DESC, id DESC) index without locking writes."""
+    
+    # History pages without a hazard filter order by (event_date, id) DESC;
+    # the (location_id, hazard_id, ...) index from 005 cannot serve that order.
+    # CREATE INDEX CONCURRENTLY must run outside a transaction on PostgreSQL.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_historical_data_location_date',
+            'historical_data',
+            ['location_id', sa.text('event_date DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Drop the location/event-date index."""
+    
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_historical_data_location_date',
+            table_name='historical_data',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,45 @@
+"""Add hazard/location/score index for hotspot aggregation
+
+Revision ID: 010_hotspot_aggregation_index
+Revises: 009_historical_location_date_index
+Create Date: 2025-11-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the (hazard_id, location_id, risk_score) index and drop ix_risk_assessments_hazard_id."""
+    
+    # Hotspot refreshes average one hazard's scores per location; with this
+    # index the GROUP BY reads rows in order without touching the table.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_risk_assessments_hazard_location_score',
+            'risk_assessments',
+            ['hazard_id', 'location_id', 'risk_score'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+    
+    # The new index leads with hazard_id, so the single-column one is redundant
+    op.execute("DROP INDEX IF EXISTS ix_risk_assessments_hazard_id")
+
+
+def downgrade() -> None:
+    """Restore ix_risk_assessments_hazard_id and drop the hotspot index."""
+    
+    op.create_index('ix_risk_assessments_hazard_id', 'risk_assessments', ['hazard_id'], unique=False)
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_risk_assessments_hazard_location_score',
+            table_name='risk_assessments',
+            postgresql_concurrently=True
+        )
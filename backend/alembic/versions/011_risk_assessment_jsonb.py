@@ -0,0 +1,55 @@
+"""Store risk assessment factors and recommendations as JSONB on PostgreSQL
+
+Revision ID: 011_risk_assessment_jsonb
+Revises: 010_hotspot_aggregation_index
+Create Date: 2025-11-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+JSON_DOCUMENT_COLUMNS = ['factors_analysis', 'recommendations']
+
+
+def upgrade() -> None:
+    """Convert the JSON document columns to JSONB."""
+    
+    # SQLite has a single JSON representation, so there is nothing to convert
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for column in JSON_DOCUMENT_COLUMNS:
+        op.alter_column(
+            'risk_assessments',
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=True,
+            postgresql_using=f'{column}::jsonb'
+        )
+
+
+def downgrade() -> None:
+    """Convert the JSON document columns back to JSON."""
+    
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for column in JSON_DOCUMENT_COLUMNS:
+        op.alter_column(
+            'risk_assessments',
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=True,
+            postgresql_using=f'{column}::json'
+        )
@@ -0,0 +1,75 @@
+"""Cover the remaining columns read by trend and comparison queries
+
+Revision ID: 012_widen_covering_indexes
+Revises: 011_risk_assessment_jsonb
+Create Date: 2025-11-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, key columns, INCLUDE columns before, INCLUDE columns after)
+COVERING_INDEXES = [
+    (
+        'idx_risk_assessments_location_hazard_assessed',
+        'risk_assessments',
+        ['location_id', 'hazard_id', sa.text('assessed_at DESC'), 'risk_score'],
+        ['risk_level'],
+        ['risk_level', 'confidence_level'],
+    ),
+    (
+        'idx_historical_data_location_hazard_date_severity',
+        'historical_data',
+        ['location_id', 'hazard_id', sa.text('event_date DESC'), 'severity'],
+        [],
+        ['casualties', 'economic_damage'],
+    ),
+]
+
+
+def _rebuild(name: str, table_name: str, columns: list, include: list) -> None:
+    """Rebuild an index with new INCLUDE columns without blocking writes.
+    
+    The replacement is built concurrently under a temporary name and swapped
+    in, so the old index keeps serving reads until the new one is ready.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            f'{name}_new',
+            table_name,
+            columns,
+            unique=False,
+            postgresql_include=include,
+            postgresql_concurrently=True
+        )
+        op.drop_index(name, table_name=table_name, postgresql_concurrently=True)
+        op.execute(f'ALTER INDEX {name}_new RENAME TO {name}')
+
+
+def upgrade() -> None:
+    """Add the trend and comparison columns to the covering indexes."""
+    
+    # INCLUDE is PostgreSQL-only; the SQLite indexes are unchanged
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for name, table_name, columns, _, include in COVERING_INDEXES:
+        _rebuild(name, table_name, columns, include)
+
+
+def downgrade() -> None:
+    """Restore the previous INCLUDE columns."""
+    
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for name, table_name, columns, include, _ in COVERING_INDEXES:
+        _rebuild(name, table_name, columns, include)
@@ -0,0 +1,49 @@
+"""Backfill the precomputed risk hotspot rankings
+
+Revision ID: 013_backfill_risk_hotspots
+Revises: 012_widen_covering_indexes
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+# Must match AdvancedAnalyticsService.HOTSPOT_CACHE_SIZE
+HOTSPOT_CACHE_SIZE = 100
+
+
+def upgrade() -> None:
+    """Rank every hazard's hotspots from the existing assessments."""
+    
+    # Rankings are now rebuilt by assessment writes instead of lazily on
+    # read, so existing data needs its rankings built once up front
+    op.execute("DELETE FROM risk_hotspots_cache")
+    op.execute(f"""
+        INSERT INTO risk_hotspots_cache (hazard_id, rank, location_id, risk_score)
+        SELECT hazard_id, rank, location_id, risk_score
+        FROM (
+            SELECT
+                hazard_id,
+                location_id,
+                ROUND(CAST(AVG(risk_score) AS NUMERIC), 2) AS risk_score,
+                ROW_NUMBER() OVER (
+                    PARTITION BY hazard_id ORDER BY AVG(risk_score) DESC
+                ) AS rank
+            FROM risk_assessments
+            GROUP BY hazard_id, location_id
+        ) ranked
+        WHERE rank <= {HOTSPOT_CACHE_SIZE}
+    """)
+
+
+def downgrade() -> None:
+    """Empty the hotspot rankings; the previous revision rebuilds them on read."""
+    
+    op.execute("DELETE FROM risk_hotspots_cache")
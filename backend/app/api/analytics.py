@@ -1,29 +1,133 @@
 """API endpoints for advanced risk analytics."""
-from typing import List
+from typing import List, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, bindparam, select
+from pydantic import ValidationError
 
 from app.db import get_db
 from app.models import Location, Hazard
 from app.services import AdvancedAnalyticsService
-from app.schemas import LocationResponse
+from app.services.caching_service import CacheKey, get_hazard_cache
+from app.schemas import LocationResponse, LocationBounds
 
-router = APIRouter(prefix="/analytics", tags=["Analytics"])
+# Analytics payloads are large float-heavy dicts; orjson encodes them far faster.
+# Routes return ORJSONResponse directly so FastAPI skips its response-model
+# validation and jsonable_encoder walk, which cost ~30x the encoding itself.
+router = APIRouter(prefix="/analytics", tags=["Analytics"], default_response_class=ORJSONResponse)
+
+# Upper bound on IDs per comparison, keeping the IN list and per-location work bounded
+MAX_COMPARE_LOCATIONS = 200
+
+# Analytics only read location attributes, so a plain column row is fetched
+# instead of hydrating a Location into the identity map
+_location_row_by_id = select(Location.__table__).where(
+    Location.__table__.c.id == bindparam("location_id")
+)
+
+# Hazards are cached process-wide across requests, so they are kept as
+# immutable column rows; an ORM instance would stay bound to the closed
+# session of the request that loaded it
+_hazard_row_by_id = select(Hazard.__table__).where(
+    Hazard.__table__.c.id == bindparam("hazard_id")
+)
+
+
+def get_analytics(db: AsyncSession = Depends(get_db)) -> AdvancedAnalyticsService:
+    """Provide an analytics service bound to the request's database session.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        AdvancedAnalyticsService instance
+    """
+    return AdvancedAnalyticsService(db)
+
+
+async def _get_hazard_cached(db: AsyncSession, hazard_id: int) -> Row | None:
+    """Get a hazard by ID, serving repeat lookups from the hazard cache.
+    
+    Args:
+        db: Database session
+        hazard_id: Hazard ID
+        
+    Returns:
+        Hazard column row or None if not found
+    """
+    cache = get_hazard_cache()
+    key = CacheKey.hazard(hazard_id)
+    
+    hazard = await cache.get(key)
+    if hazard is not None:
+        return hazard
+    
+    result = await db.execute(_hazard_row_by_id, {"hazard_id": hazard_id})
+    hazard = result.one_or_none()
+    
+    if hazard is not None:
+        await cache.set(key, hazard)
+    
+    return hazard
+
+
+async def _fetch_location_and_hazard(
+    db: AsyncSession,
+    location_id: int,
+    hazard_id: int
+) -> Tuple[Row, Row]:
+    """Load a location and a hazard for an analytics request.
+    
+    The hazard normally comes from the hazard cache, leaving the location
+    lookup as the only database round trip. Both are returned as column
+    rows rather than ORM instances.
+    
+    Args:
+        db: Database session
+        location_id: Location ID
+        hazard_id: Hazard ID
+        
+    Returns:
+        Tuple of (location row, hazard row)
+        
+    Raises:
+        HTTPException: If location or hazard not found
+    """
+    result = await db.execute(_location_row_by_id, {"location_id": location_id})
+    location = result.one_or_none()
+    
+    if not location:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Location with id {location_id} not found"
+        )
+    
+    hazard = await _get_hazard_cached(db, hazard_id)
+    
+    if not hazard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Hazard with id {hazard_id} not found"
+        )
+    
+    return location, hazard
 
 
 @router.get("/hotspots/{hazard_id}", status_code=status.HTTP_200_OK)
 async def get_risk_hotspots(
     hazard_id: int,
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
-) -> dict:
+    db: AsyncSession = Depends(get_db),
+    analytics: AdvancedAnalyticsService = Depends(get_analytics)
+) -> ORJSONResponse:
     """Get high-risk locations for a specific hazard.
     
     Args:
         hazard_id: Hazard ID
         limit: Maximum number of hotspots to return
         db: Database session
+        analytics: Analytics service bound to the request session
         
     Returns:
         List of high-risk locations sorted by risk score
@@ -31,10 +135,7 @@ async def get_risk_hotspots(
     Raises:
         HTTPException: If hazard not found
     """
-    result = await db.execute(
-        select(Hazard).where(Hazard.id == hazard_id)
-    )
-    hazard = result.scalar_one_or_none()
+    hazard = await _get_hazard_cached(db, hazard_id)
     
     if not hazard:
         raise HTTPException(
@@ -42,14 +143,13 @@ async def get_risk_hotspots(
             detail=f"Hazard with id {hazard_id} not found"
         )
     
-    analytics = AdvancedAnalyticsService(db)
     hotspots = await analytics.calculate_risk_hotspots(hazard, limit)
     
-    return {
+    return ORJSONResponse({
         'hazard_type': hazard.hazard_type.value,
         'hotspot_count': len(hotspots),
         'hotspots': hotspots
-    }
+    })
 
 
 @router.get("/trends/{location_id}/{hazard_id}", status_code=status.HTTP_200_OK)
@@ -57,8 +157,9 @@ async def get_historical_trends(
     location_id: int,
     hazard_id: int,
     years: int = Query(10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db)
-) -> dict:
+    db: AsyncSession = Depends(get_db),
+    analytics: AdvancedAnalyticsService = Depends(get_analytics)
+) -> ORJSONResponse:
     """Get historical trends for a location-hazard pair.
     
     Args:
@@ -66,6 +167,7 @@ async def get_historical_trends(
         hazard_id: Hazard ID
         years: Number of years to analyze
         db: Database session
+        analytics: Analytics service bound to the request session
         
     Returns:
         Trend analysis with frequency, severity, and patterns
@@ -73,51 +175,32 @@ async def get_historical_trends(
     Raises:
         HTTPException: If location or hazard not found
     """
-    result = await db.execute(
-        select(Location).where(Location.id == location_id)
-    )
-    location = result.scalar_one_or_none()
-    
-    if not location:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Location with id {location_id} not found"
-        )
-    
-    result = await db.execute(
-        select(Hazard).where(Hazard.id == hazard_id)
-    )
-    hazard = result.scalar_one_or_none()
-    
-    if not hazard:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Hazard with id {hazard_id} not found"
-        )
+    location, hazard = await _fetch_location_and_hazard(db, location_id, hazard_id)
     
-    analytics = AdvancedAnalyticsService(db)
     trends = await analytics.analyze_historical_trends(location, hazard, years)
     
-    return {
-        'location': LocationResponse.model_validate(location),
+    return ORJSONResponse({
+        'location': LocationResponse.model_validate(location).model_dump(mode="json"),
         'hazard_type': hazard.hazard_type.value,
         'analysis_years': years,
         'trends': trends
-    }
+    })
 
 
 @router.post("/compare-locations", status_code=status.HTTP_200_OK)
 async def compare_locations(
-    location_ids: List[int] = Query(...),
+    location_ids: List[int] = Query(..., min_length=1, max_length=MAX_COMPARE_LOCATIONS),
     hazard_id: int = Query(...),
-    db: AsyncSession = Depends(get_db)
-) -> dict:
+    db: AsyncSession = Depends(get_db),
+    analytics: AdvancedAnalyticsService = Depends(get_analytics)
+) -> ORJSONResponse:
     """Compare risk profiles across multiple locations.
     
     Args:
         location_ids: List of location IDs to compare
         hazard_id: Hazard ID for comparison
         db: Database session
+        analytics: Analytics service bound to the request session
         
     Returns:
         Comparative risk profiles
@@ -125,10 +208,10 @@ async def compare_locations(
     Raises:
         HTTPException: If invalid locations or hazard
     """
-    result = await db.execute(
-        select(Hazard).where(Hazard.id == hazard_id)
-    )
-    hazard = result.scalar_one_or_none()
+    # Repeated IDs would only widen the IN clause and duplicate work
+    location_ids = list(dict.fromkeys(location_ids))
+    
+    hazard = await _get_hazard_cached(db, hazard_id)
     
     if not hazard:
         raise HTTPException(
@@ -136,63 +219,93 @@ async def compare_locations(
             detail=f"Hazard with id {hazard_id} not found"
         )
     
-    analytics = AdvancedAnalyticsService(db)
+    result = await db.execute(
+        select(Location.id).where(Location.id.in_(location_ids))
+    )
+    missing_ids = set(location_ids) - set(result.scalars().all())
+    
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Locations not found: {sorted(missing_ids)}"
+        )
+    
     comparison = await analytics.compare_locations(location_ids, hazard_id)
     
-    return {
+    return ORJSONResponse({
         'hazard_type': hazard.hazard_type.value,
         'locations_compared': len(comparison),
         'comparison': comparison
-    }
+    })
 
 
-@router.get("/regional-risk", status_code=status.HTTP_200_OK)
-async def get_regional_risk_index(
+def _region_bounds(
     min_latitude: float = Query(...),
     max_latitude: float = Query(...),
     min_longitude: float = Query(...),
-    max_longitude: float = Query(...),
-    hazard_id: int | None = Query(None),
-    db: AsyncSession = Depends(get_db)
-) -> dict:
-    """Calculate aggregate risk for a geographic region.
+    max_longitude: float = Query(...)
+) -> LocationBounds:
+    """Validate regional query parameters as a bounding box.
     
     Args:
         min_latitude: Minimum latitude boundary
         max_latitude: Maximum latitude boundary
         min_longitude: Minimum longitude boundary
         max_longitude: Maximum longitude boundary
-        hazard_id: Optional hazard ID to filter
-        db: Database session
         
     Returns:
-        Regional risk statistics
+        Validated bounding box
         
     Raises:
-        HTTPException: If invalid coordinates or hazard
+        HTTPException: If the bounds are out of range or inverted
     """
-    if min_latitude >= max_latitude or min_longitude >= max_longitude:
+    try:
+        return LocationBounds(
+            min_lat=min_latitude,
+            max_lat=max_latitude,
+            min_lon=min_longitude,
+            max_lon=max_longitude
+        )
+    except ValidationError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid coordinate boundaries"
         )
+
+
+@router.get("/regional-risk", status_code=status.HTTP_200_OK)
+async def get_regional_risk_index(
+    bounds: LocationBounds = Depends(_region_bounds),
+    hazard_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    analytics: AdvancedAnalyticsService = Depends(get_analytics)
+) -> ORJSONResponse:
+    """Calculate aggregate risk for a geographic region.
     
+    Args:
+        bounds: Validated bounding box from the latitude/longitude query parameters
+        hazard_id: Optional hazard ID to filter
+        db: Database session
+        analytics: Analytics service bound to the request session
+        
+    Returns:
+        Regional risk statistics
+        
+    Raises:
+        HTTPException: If invalid coordinates or hazard
+    """
     if hazard_id:
-        result = await db.execute(
-            select(Hazard).where(Hazard.id == hazard_id)
-        )
-        if not result.scalar_one_or_none():
+        if not await _get_hazard_cached(db, hazard_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Hazard with id {hazard_id} not found"
             )
     
-    analytics = AdvancedAnalyticsService(db)
     regional_risk = await analytics.calculate_regional_risk_index(
-        min_latitude, max_latitude, min_longitude, max_longitude, hazard_id
+        bounds.min_lat, bounds.max_lat, bounds.min_lon, bounds.max_lon, hazard_id
     )
     
-    return regional_risk
+    return ORJSONResponse(regional_risk)
 
 
 @router.get("/forecast/{location_id}/{hazard_id}", status_code=status.HTTP_200_OK)
@@ -200,8 +313,9 @@ async def get_risk_forecast(
     location_id: int,
     hazard_id: int,
     months_ahead: int = Query(12, ge=1, le=60),
-    db: AsyncSession = Depends(get_db)
-) -> dict:
+    db: AsyncSession = Depends(get_db),
+    analytics: AdvancedAnalyticsService = Depends(get_analytics)
+) -> ORJSONResponse:
     """Forecast risk evolution over time.
     
     Args:
@@ -209,6 +323,7 @@ async def get_risk_forecast(
         hazard_id: Hazard ID
         months_ahead: Number of months to forecast
         db: Database session
+        analytics: Analytics service bound to the request session
         
     Returns:
         Risk forecast with projections
@@ -216,46 +331,27 @@ async def get_risk_forecast(
     Raises:
         HTTPException: If location or hazard not found
     """
-    result = await db.execute(
-        select(Location).where(Location.id == location_id)
-    )
-    location = result.scalar_one_or_none()
-    
-    if not location:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Location with id {location_id} not found"
-        )
-    
-    result = await db.execute(
-        select(Hazard).where(Hazard.id == hazard_id)
-    )
-    hazard = result.scalar_one_or_none()
-    
-    if not hazard:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Hazard with id {hazard_id} not found"
-        )
+    location, hazard = await _fetch_location_and_hazard(db, location_id, hazard_id)
     
-    analytics = AdvancedAnalyticsService(db)
     forecast = await analytics.forecast_risk_evolution(location, hazard, months_ahead)
     
-    return forecast
+    return ORJSONResponse(forecast)
 
 
 @router.get("/critical-factors/{location_id}/{hazard_id}", status_code=status.HTTP_200_OK)
 async def get_critical_risk_factors(
     location_id: int,
     hazard_id: int,
-    db: AsyncSession = Depends(get_db)
-) -> dict:
+    db: AsyncSession = Depends(get_db),
+    analytics: AdvancedAnalyticsService = Depends(get_analytics)
+) -> ORJSONResponse:
     """Identify critical risk factors for a location-hazard pair.
     
     Args:
         location_id: Location ID
         hazard_id: Hazard ID
         db: Database session
+        analytics: Analytics service bound to the request session
         
     Returns:
         List of critical factors ranked by impact
@@ -263,34 +359,13 @@ async def get_critical_risk_factors(
     Raises:
         HTTPException: If location or hazard not found
     """
-    result = await db.execute(
-        select(Location).where(Location.id == location_id)
-    )
-    location = result.scalar_one_or_none()
-    
-    if not location:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Location with id {location_id} not found"
-        )
-    
-    result = await db.execute(
-        select(Hazard).where(Hazard.id == hazard_id)
-    )
-    hazard = result.scalar_one_or_none()
-    
-    if not hazard:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Hazard with id {hazard_id} not found"
-        )
+    location, hazard = await _fetch_location_and_hazard(db, location_id, hazard_id)
     
-    analytics = AdvancedAnalyticsService(db)
     factors = await analytics.identify_critical_risk_factors(location, hazard)
     
-    return {
+    return ORJSONResponse({
         'location_name': location.name,
         'hazard_type': hazard.hazard_type.value,
         'critical_factors_count': len(factors),
         'critical_factors': factors
-    }
+    })
@@ -1,28 +1,35 @@
 """API endpoints for data export functionality."""
+import hashlib
+import json
 from typing import List, Optional, Dict, Any
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.db import get_db
 from app.models import HazardType, RiskLevel
+from app.schemas import LocationBounds
 from app.services.export_service import ExportService
 
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
 
-# Request/Response Schemas
-class LocationBounds(BaseModel):
-    """Geographic bounding box for filtering."""
-    min_lat: float = Field(..., ge=-90, le=90, description="Minimum latitude")
-    max_lat: float = Field(..., ge=-90, le=90, description="Maximum latitude")
-    min_lon: float = Field(..., ge=-180, le=180, description="Minimum longitude")
-    max_lon: float = Field(..., ge=-180, le=180, description="Maximum longitude")
+def get_export_service(db: AsyncSession = Depends(get_db)) -> ExportService:
+    """Provide an export service bound to the request's database session.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        ExportService instance
+    """
+    return ExportService(db)
 
 
+# Request/Response Schemas
 class RiskReportRequest(BaseModel):
     """Request schema for risk report export."""
     start_date: Optional[datetime] = Field(None, description="Filter assessments after this date")
@@ -32,7 +39,7 @@ class RiskReportRequest(BaseModel):
     min_risk_score: Optional[float] = Field(None, ge=0, le=100, description="Minimum risk score")
     risk_levels: Optional[List[RiskLevel]] = Field(None, description="Filter by risk levels")
     location_ids: Optional[List[int]] = Field(None, description="Specific location IDs")
-    stream: bool = Field(default=False, description="Use streaming for large datasets")
+    stream: bool = Field(default=False, description="Deprecated and ignored: reports are always streamed")
 
 
 class BatchLocationRequest(BaseModel):
@@ -71,30 +78,29 @@ class HistoricalTrendsRequest(BaseModel):
 @router.post("/risk-report", status_code=status.HTTP_200_OK)
 async def export_risk_report(
     request: RiskReportRequest,
-    db: AsyncSession = Depends(get_db)
+    export_service: ExportService = Depends(get_export_service)
 ):
     """Export risk assessment report as CSV.
     
-    This endpoint generates a CSV report of risk assessments with various filters.
-    Use stream=true for large datasets to avoid memory issues.
+    This endpoint streams a CSV report of risk assessments with various filters.
+    Rows are flushed in chunks, so memory use does not grow with report size.
     
     Args:
-        request: Export parameters including filters and streaming option
-        db: Database session
+        request: Export parameters including filters
+        export_service: Export service bound to the request session
         
     Returns:
-        CSV file as streaming response or direct download
+        CSV file as streaming response
         
     Example:
         POST /api/export/risk-report
         {
             "start_date": "2024-01-01T00:00:00",
             "hazard_types": ["earthquake", "flood"],
-            "min_risk_score": 50,
-            "stream": true
+            "min_risk_score": 50
         }
     """
-    export_service = ExportService(db)
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
     
     # Convert location bounds to dict if provided
     location_bounds = None
@@ -106,58 +112,33 @@ async def export_risk_report(
             'max_lon': request.location_bounds.max_lon
         }
     
-    try:
-        if request.stream:
-            # Use streaming for large datasets
-            async def csv_generator():
-                async for chunk in export_service.stream_risk_report_csv(
-                    start_date=request.start_date,
-                    end_date=request.end_date,
-                    location_bounds=location_bounds,
-                    hazard_types=request.hazard_types,
-                    min_risk_score=request.min_risk_score,
-                    risk_levels=request.risk_levels,
-                    location_ids=request.location_ids
-                ):
-                    yield chunk
-            
-            return StreamingResponse(
-                csv_generator(),
-                media_type="text/csv",
-                headers={
-                    "Content-Disposition": f"attachment; filename=risk_report_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-                }
-            )
-        else:
-            # Generate complete CSV in memory
-            csv_data = await export_service.generate_risk_report_csv(
-                start_date=request.start_date,
-                end_date=request.end_date,
-                location_bounds=location_bounds,
-                hazard_types=request.hazard_types,
-                min_risk_score=request.min_risk_score,
-                risk_levels=request.risk_levels,
-                location_ids=request.location_ids
-            )
-            
-            return StreamingResponse(
-                iter([csv_data]),
-                media_type="text/csv",
-                headers={
-                    "Content-Disposition": f"attachment; filename=risk_report_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-                }
-            )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate report: {str(e)}"
-        )
+    async def csv_generator():
+        async for chunk in export_service.stream_risk_report_csv(
+            start_date=request.start_date,
+            end_date=request.end_date,
+            location_bounds=location_bounds,
+            hazard_types=request.hazard_types,
+            min_risk_score=request.min_risk_score,
+            risk_levels=request.risk_levels,
+            location_ids=request.location_ids
+        ):
+            yield chunk
+    
+    return StreamingResponse(
+        csv_generator(),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename=risk_report_{timestamp}.csv",
+            # Stop nginx from re-buffering the chunked body
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 @router.post("/batch-process", response_model=BatchProcessingResponse, status_code=status.HTTP_200_OK)
 async def batch_process_locations(
     request: BatchLocationRequest,
-    db: AsyncSession = Depends(get_db)
+    export_service: ExportService = Depends(get_export_service)
 ) -> BatchProcessingResponse:
     """Batch process multiple locations for risk assessment.
     
@@ -166,7 +147,7 @@ async def batch_process_locations(
     
     Args:
         request: Batch processing parameters with coordinates and options
-        db: Database session
+        export_service: Export service bound to the request session
         
     Returns:
         Processing results with success/failure counts
@@ -182,8 +163,6 @@ async def batch_process_locations(
             "save_to_db": true
         }
     """
-    export_service = ExportService(db)
-    
     try:
         results = await export_service.batch_process_locations(
             coordinates=request.coordinates,
@@ -211,13 +190,13 @@ async def batch_process_locations(
 @router.post("/historical-trends", status_code=status.HTTP_200_OK)
 async def export_historical_trends(
     request: HistoricalTrendsRequest,
-    db: AsyncSession = Depends(get_db)
+    export_service: ExportService = Depends(get_export_service)
 ):
     """Export historical trend data for a location and hazard type.
     
     Args:
         request: Historical trends parameters
-        db: Database session
+        export_service: Export service bound to the request session
         
     Returns:
         CSV file with historical event data
@@ -231,7 +210,7 @@ async def export_historical_trends(
             "end_date": "2024-12-31T23:59:59"
         }
     """
-    export_service = ExportService(db)
+    datestamp = datetime.now(timezone.utc).strftime('%Y%m%d')
     
     try:
         csv_data = await export_service.export_historical_trends(
@@ -241,7 +220,7 @@ async def export_historical_trends(
             end_date=request.end_date
         )
         
-        filename = f"historical_trends_loc{request.location_id}_{request.hazard_type.value}_{datetime.utcnow().strftime('%Y%m%d')}.csv"
+        filename = f"historical_trends_loc{request.location_id}_{request.hazard_type.value}_{datestamp}.csv"
         
         return StreamingResponse(
             iter([csv_data]),
@@ -257,26 +236,53 @@ async def export_historical_trends(
         )
 
 
-@router.get("/formats", status_code=status.HTTP_200_OK)
-async def get_supported_formats() -> Dict[str, Any]:
+# The formats payload never changes at runtime, so it is serialized and
+# fingerprinted once at import
+_FORMATS_BYTES = json.dumps({
+    "formats": {
+        "csv": {
+            "mime_type": "text/csv",
+            "description": "Comma-separated values format",
+            "supports_streaming": True,
+            "max_recommended_records": 10000
+        }
+    },
+    "risk_report_schema": {
+        "columns": ExportService.RISK_REPORT_COLUMNS,
+        "description": "Risk assessment report with location and hazard details"
+    },
+    "batch_size": ExportService.BATCH_SIZE,
+    "streaming_recommendation": "Use streaming for datasets with >1000 records"
+}, separators=(",", ":")).encode("utf-8")
+_FORMATS_ETAG = f'"{hashlib.sha256(_FORMATS_BYTES).hexdigest()[:32]}"'
+_FORMATS_HEADERS = {
+    "ETag": _FORMATS_ETAG,
+    "Cache-Control": "public, max-age=86400"
+}
+
+
+@router.api_route("/formats", methods=["GET", "HEAD"], status_code=status.HTTP_200_OK)
+async def get_supported_formats(
+    if_none_match: Optional[str] = Header(None)
+) -> Response:
     """Get information about supported export formats and their schemas.
     
+    The payload is static, so clients revalidating with a matching
+    If-None-Match header get an empty 304 response.
+    
+    Args:
+        if_none_match: ETag(s) the client already holds
+        
     Returns:
-        Dictionary with format specifications
+        Pre-serialized JSON with format specifications, or 304 Not Modified
     """
-    return {
-        "formats": {
-            "csv": {
-                "mime_type": "text/csv",
-                "description": "Comma-separated values format",
-                "supports_streaming": True,
-                "max_recommended_records": 10000
-            }
-        },
-        "risk_report_schema": {
-            "columns": ExportService.RISK_REPORT_COLUMNS,
-            "description": "Risk assessment report with location and hazard details"
-        },
-        "batch_size": ExportService.BATCH_SIZE,
-        "streaming_recommendation": "Use streaming for datasets with >1000 records"
-    }
+    if if_none_match:
+        client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if _FORMATS_ETAG in client_etags or "*" in client_etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_FORMATS_HEADERS)
+    
+    return Response(
+        content=_FORMATS_BYTES,
+        media_type="application/json",
+        headers=_FORMATS_HEADERS
+    )
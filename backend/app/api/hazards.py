@@ -1,21 +1,28 @@
 """API endpoints for hazards."""
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
 
+from app.api.responses import json_bytes_response, model_response, serialize_model_list
 from app.db import get_db
 from app.models import Hazard
 from app.schemas import HazardCreate, HazardResponse
+from app.services.caching_service import CacheKey, get_hazard_cache, get_response_cache
 
 router = APIRouter(prefix="/hazards", tags=["Hazards"])
 
+_hazard_list_adapter = TypeAdapter(List[HazardResponse])
+
 
 @router.post("", response_model=HazardResponse, status_code=status.HTTP_201_CREATED)
 async def create_hazard(
     hazard_data: HazardCreate,
     db: AsyncSession = Depends(get_db)
-) -> HazardResponse:
+) -> Response:
     """Create a new hazard type configuration.
     
     Args:
@@ -28,30 +35,30 @@ async def create_hazard(
     Raises:
         HTTPException: If hazard type already exists
     """
-    # Check if hazard type already exists
-    result = await db.execute(
-        select(Hazard).where(Hazard.hazard_type == hazard_data.hazard_type)
-    )
-    existing = result.scalar_one_or_none()
-    
-    if existing:
+    # The unique constraint on hazard_type rejects duplicates, so the row is
+    # written and read back in a single INSERT ... RETURNING round trip.
+    try:
+        result = await db.execute(
+            insert(Hazard).values(**hazard_data.model_dump()).returning(Hazard)
+        )
+        hazard = result.scalar_one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Hazard type {hazard_data.hazard_type} already exists"
         )
+    await get_hazard_cache().clear()
+    await get_response_cache().delete_prefix(CacheKey.HAZARD_LIST_PREFIX)
     
-    hazard = Hazard(**hazard_data.model_dump())
-    db.add(hazard)
-    await db.commit()
-    await db.refresh(hazard)
-    
-    return HazardResponse.model_validate(hazard)
+    return model_response(HazardResponse, hazard, status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=List[HazardResponse])
 async def get_hazards(
     db: AsyncSession = Depends(get_db)
-) -> List[HazardResponse]:
+) -> Response:
     """Get all configured hazard types.
     
     Args:
@@ -60,17 +67,23 @@ async def get_hazards(
     Returns:
         List of hazards
     """
-    result = await db.execute(select(Hazard))
-    hazards = result.scalars().all()
+    cache = get_response_cache()
+    key = CacheKey.hazard_list()
+    
+    content = await cache.get(key)
+    if content is None:
+        result = await db.execute(select(Hazard))
+        content = serialize_model_list(_hazard_list_adapter, result.scalars().all())
+        await cache.set(key, content)
     
-    return [HazardResponse.model_validate(h) for h in hazards]
+    return json_bytes_response(content)
 
 
 @router.get("/{hazard_id}", response_model=HazardResponse)
 async def get_hazard(
     hazard_id: int,
     db: AsyncSession = Depends(get_db)
-) -> HazardResponse:
+) -> Response:
     """Get a specific hazard by ID.
     
     Args:
@@ -83,10 +96,7 @@ async def get_hazard(
     Raises:
         HTTPException: If hazard not found
     """
-    result = await db.execute(
-        select(Hazard).where(Hazard.id == hazard_id)
-    )
-    hazard = result.scalar_one_or_none()
+    hazard = await db.get(Hazard, hazard_id)
     
     if not hazard:
         raise HTTPException(
@@ -94,4 +104,4 @@ async def get_hazard(
             detail=f"Hazard with id {hazard_id} not found"
         )
     
-    return HazardResponse.model_validate(hazard)
+    return model_response(HazardResponse, hazard)
@@ -1,21 +1,62 @@
 """API endpoints for historical data."""
-from typing import List
+from datetime import datetime
+from typing import List, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, exists, insert, literal, tuple_
 
+from app.api.responses import model_list_response, model_response, next_cursor_headers
 from app.db import get_db
 from app.models import HistoricalData, Location, Hazard
 from app.schemas import HistoricalDataCreate, HistoricalDataResponse
+from app.services.caching_service import CacheKey, get_trend_cache
 
 router = APIRouter(prefix="/historical-data", tags=["Historical Data"])
 
+_historical_list_adapter = TypeAdapter(List[HistoricalDataResponse])
+
+
+def _encode_history_cursor(record: HistoricalData) -> str:
+    """Encode the keyset position of a historical record.
+    
+    Args:
+        record: Last record of a page
+        
+    Returns:
+        Cursor string of the form "<event_date ISO>_<id>"
+    """
+    return f"{record.event_date.isoformat()}_{record.id}"
+
+
+def _decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by _encode_history_cursor.
+    
+    Args:
+        cursor: Cursor string
+        
+    Returns:
+        Tuple of (event_date, id)
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        event_date, record_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(event_date), int(record_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
 
 @router.post("", response_model=HistoricalDataResponse, status_code=status.HTTP_201_CREATED)
 async def create_historical_data(
     data: HistoricalDataCreate,
     db: AsyncSession = Depends(get_db)
-) -> HistoricalDataResponse:
+) -> Response:
     """Create a new historical event record.
     
     Args:
@@ -28,47 +69,61 @@ async def create_historical_data(
     Raises:
         HTTPException: If location or hazard not found
     """
-    # Verify location exists
-    result = await db.execute(
-        select(Location).where(Location.id == data.location_id)
-    )
-    if not result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Location with id {data.location_id} not found"
-        )
+    values = data.model_dump()
+    columns = HistoricalData.__table__.c
     
-    # Verify hazard exists
+    # Insert only when both parents exist, so the happy path is one statement
+    guarded_row = select(
+        *(literal(value, type_=columns[name].type) for name, value in values.items())
+    ).where(
+        exists().where(Location.id == data.location_id),
+        exists().where(Hazard.id == data.hazard_id)
+    )
     result = await db.execute(
-        select(Hazard).where(Hazard.id == data.hazard_id)
+        insert(HistoricalData)
+        .from_select(list(values), guarded_row)
+        .returning(HistoricalData)
     )
-    if not result.scalar_one_or_none():
+    historical = result.scalar_one_or_none()
+    
+    if historical is None:
+        if await db.get(Location, data.location_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Location with id {data.location_id} not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Hazard with id {data.hazard_id} not found"
         )
     
-    historical = HistoricalData(**data.model_dump())
-    db.add(historical)
     await db.commit()
-    await db.refresh(historical)
+    await get_trend_cache().delete_prefix(
+        CacheKey.trends_prefix(historical.location_id, historical.hazard_id)
+    )
     
-    return HistoricalDataResponse.model_validate(historical)
+    return model_response(HistoricalDataResponse, historical, status.HTTP_201_CREATED)
 
 
 @router.get("/{location_id}", response_model=List[HistoricalDataResponse])
 async def get_historical_data_by_location(
     location_id: int,
     hazard_id: int | None = Query(None),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db)
-) -> List[HistoricalDataResponse]:
+) -> Response:
     """Get historical data for a specific location.
     
+    Records are returned newest first. A full page carries an X-Next-Cursor
+    header; passing it back as cursor continues from the (event_date, id) of
+    the last record with an index range scan instead of an OFFSET skip.
+    
     Args:
         location_id: Location ID
         hazard_id: Optional hazard ID to filter by
+        cursor: Keyset cursor from the previous page
         skip: Number of records to skip
         limit: Maximum number of records to return
         db: Database session
@@ -77,30 +132,40 @@ async def get_historical_data_by_location(
         List of historical data records
         
     Raises:
-        HTTPException: If location not found
+        HTTPException: If location not found or cursor is malformed
     """
-    # Verify location exists
-    result = await db.execute(
-        select(Location).where(Location.id == location_id)
-    )
-    if not result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Location with id {location_id} not found"
-        )
-    
     # Build query
     query = select(HistoricalData).where(HistoricalData.location_id == location_id)
     
     if hazard_id is not None:
         query = query.where(HistoricalData.hazard_id == hazard_id)
     
-    query = query.order_by(HistoricalData.event_date.desc()).offset(skip).limit(limit)
+    if cursor is not None:
+        query = query.where(
+            tuple_(HistoricalData.event_date, HistoricalData.id) < _decode_history_cursor(cursor)
+        )
+    
+    query = query.order_by(
+        HistoricalData.event_date.desc(), HistoricalData.id.desc()
+    ).offset(skip).limit(limit)
     
     result = await db.execute(query)
     historical_data = result.scalars().all()
     
-    return [HistoricalDataResponse.model_validate(h) for h in historical_data]
+    # Rows prove the location exists; only an empty page needs the check
+    if not historical_data and await db.get(Location, location_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Location with id {location_id} not found"
+        )
+    
+    next_cursor = None
+    if len(historical_data) == limit:
+        next_cursor = _encode_history_cursor(historical_data[-1])
+    
+    return model_list_response(
+        _historical_list_adapter, historical_data, next_cursor_headers(next_cursor)
+    )
 
 
 @router.get("", response_model=List[HistoricalDataResponse])
@@ -108,7 +173,7 @@ async def get_all_historical_data(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db)
-) -> List[HistoricalDataResponse]:
+) -> Response:
     """Get all historical data records.
     
     Args:
@@ -127,4 +192,4 @@ async def get_all_historical_data(
     )
     historical_data = result.scalars().all()
     
-    return [HistoricalDataResponse.model_validate(h) for h in historical_data]
+    return model_list_response(_historical_list_adapter, historical_data)
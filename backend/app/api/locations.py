@@ -1,21 +1,33 @@
 """API endpoints for locations."""
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete
 
+from app.api.responses import (
+    json_bytes_response,
+    model_response,
+    next_cursor_headers,
+    serialize_model_list
+)
 from app.db import get_db
-from app.models import Location
+from app.models import Location, RiskAssessment, HistoricalData
 from app.schemas import LocationCreate, LocationUpdate, LocationResponse, MessageResponse
+from app.services.analytics_service import get_hotspot_refresher
+from app.services.caching_service import CacheKey, get_response_cache, get_trend_cache
 
 router = APIRouter(prefix="/locations", tags=["Locations"])
 
+_location_list_adapter = TypeAdapter(List[LocationResponse])
+
 
 @router.post("", response_model=LocationResponse, status_code=status.HTTP_201_CREATED)
 async def create_location(
     location_data: LocationCreate,
     db: AsyncSession = Depends(get_db)
-) -> LocationResponse:
+) -> Response:
     """Create a new location.
     
     Args:
@@ -25,23 +37,31 @@ async def create_location(
     Returns:
         Created location
     """
-    location = Location(**location_data.model_dump())
-    db.add(location)
+    result = await db.execute(
+        insert(Location).values(**location_data.model_dump()).returning(Location)
+    )
+    location = result.scalar_one()
     await db.commit()
-    await db.refresh(location)
+    await get_response_cache().delete_prefix(CacheKey.LOCATION_LIST_PREFIX)
     
-    return LocationResponse.model_validate(location)
+    return model_response(LocationResponse, location, status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=List[LocationResponse])
 async def get_locations(
+    cursor: int | None = Query(None, ge=0, description="Return locations with id greater than this cursor"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db)
-) -> List[LocationResponse]:
+) -> Response:
     """Get all locations with pagination.
     
+    Pages are ordered by id. Passing the X-Next-Cursor header of a full page
+    back as cursor continues with an index range scan, so deep pages cost the
+    same as the first; skip remains for offset-based clients.
+    
     Args:
+        cursor: Last location ID of the previous page
         skip: Number of records to skip
         limit: Maximum number of records to return
         db: Database session
@@ -49,19 +69,31 @@ async def get_locations(
     Returns:
         List of locations
     """
-    result = await db.execute(
-        select(Location).offset(skip).limit(limit)
-    )
-    locations = result.scalars().all()
+    cache = get_response_cache()
+    key = CacheKey.location_list(skip, limit, cursor)
+    
+    page = await cache.get(key)
+    if page is None:
+        query = select(Location)
+        if cursor is not None:
+            query = query.where(Location.id > cursor)
+        
+        result = await db.execute(query.order_by(Location.id).offset(skip).limit(limit))
+        locations = result.scalars().all()
+        
+        next_cursor = str(locations[-1].id) if len(locations) == limit else None
+        page = (serialize_model_list(_location_list_adapter, locations), next_cursor)
+        await cache.set(key, page)
     
-    return [LocationResponse.model_validate(loc) for loc in locations]
+    content, next_cursor = page
+    return json_bytes_response(content, next_cursor_headers(next_cursor))
 
 
 @router.get("/{location_id}", response_model=LocationResponse)
 async def get_location(
     location_id: int,
     db: AsyncSession = Depends(get_db)
-) -> LocationResponse:
+) -> Response:
     """Get a specific location by ID.
     
     Args:
@@ -74,10 +106,7 @@ async def get_location(
     Raises:
         HTTPException: If location not found
     """
-    result = await db.execute(
-        select(Location).where(Location.id == location_id)
-    )
-    location = result.scalar_one_or_none()
+    location = await db.get(Location, location_id)
     
     if not location:
         raise HTTPException(
@@ -85,7 +114,7 @@ async def get_location(
             detail=f"Location with id {location_id} not found"
         )
     
-    return LocationResponse.model_validate(location)
+    return model_response(LocationResponse, location)
 
 
 @router.put("/{location_id}", response_model=LocationResponse)
@@ -93,7 +122,7 @@ async def update_location(
     location_id: int,
     location_data: LocationUpdate,
     db: AsyncSession = Depends(get_db)
-) -> LocationResponse:
+) -> Response:
     """Update a location.
     
     Args:
@@ -107,10 +136,18 @@ async def update_location(
     Raises:
         HTTPException: If location not found
     """
-    result = await db.execute(
-        select(Location).where(Location.id == location_id)
-    )
-    location = result.scalar_one_or_none()
+    update_data = location_data.model_dump(exclude_unset=True)
+    
+    if update_data:
+        result = await db.execute(
+            update(Location)
+            .where(Location.id == location_id)
+            .values(**update_data)
+            .returning(Location)
+        )
+        location = result.scalar_one_or_none()
+    else:
+        location = await db.get(Location, location_id)
     
     if not location:
         raise HTTPException(
@@ -118,15 +155,10 @@ async def update_location(
             detail=f"Location with id {location_id} not found"
         )
     
-    # Update fields
-    update_data = location_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(location, field, value)
-    
     await db.commit()
-    await db.refresh(location)
+    await get_response_cache().delete_prefix(CacheKey.LOCATION_LIST_PREFIX)
     
-    return LocationResponse.model_validate(location)
+    return model_response(LocationResponse, location)
 
 
 @router.delete("/{location_id}", response_model=MessageResponse)
@@ -146,18 +178,31 @@ async def delete_location(
     Raises:
         HTTPException: If location not found
     """
+    # Lock the row up front so a missing location writes nothing and
+    # invalidates no caches
     result = await db.execute(
-        select(Location).where(Location.id == location_id)
+        select(Location.id).where(Location.id == location_id).with_for_update()
     )
-    location = result.scalar_one_or_none()
     
-    if not location:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Location with id {location_id} not found"
         )
     
-    await db.delete(location)
+    # Bulk deletes skip the ORM cascade, so dependent rows go first
+    result = await db.execute(
+        delete(RiskAssessment)
+        .where(RiskAssessment.location_id == location_id)
+        .returning(RiskAssessment.hazard_id)
+    )
+    hazard_ids = result.scalars().all()
+    await db.execute(delete(HistoricalData).where(HistoricalData.location_id == location_id))
+    await db.execute(delete(Location).where(Location.id == location_id))
+    
     await db.commit()
+    get_hotspot_refresher().schedule(hazard_ids)
+    await get_response_cache().delete_prefix(CacheKey.LOCATION_LIST_PREFIX)
+    await get_trend_cache().delete_prefix(CacheKey.trends_prefix(location_id))
     
     return MessageResponse(message=f"Location {location_id} deleted successfully")
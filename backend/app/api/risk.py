@@ -1,9 +1,11 @@
 """API endpoints for risk assessment."""
+from statistics import fmean
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, bindparam, lambda_stmt
 
+from app.api.responses import PydanticJSONResponse
 from app.db import get_db
 from app.models import Location, Hazard, RiskAssessment, HazardType, RiskLevel
 from app.schemas import (
@@ -14,15 +16,28 @@ from app.schemas import (
     LocationCreate
 )
 from app.services import RiskCalculationService
+from app.services.analytics_service import get_hotspot_refresher
+from app.services.caching_service import CacheKey, get_response_cache
 
 router = APIRouter(prefix="/assess-risk", tags=["Risk Assessment"])
 
+# Statements run on every assessment are built once as lambda statements, so
+# each call reuses the cached construct and compiled SQL instead of rebuilding
+# and re-keying the select
+_location_row_by_id = lambda_stmt(
+    lambda: select(Location.__table__).where(Location.__table__.c.id == bindparam("location_id"))
+)
+_hazards_by_type = lambda_stmt(
+    lambda: select(Hazard.id, Hazard.hazard_type, Hazard.base_severity)
+    .where(Hazard.hazard_type.in_(bindparam("hazard_types", expanding=True)))
+)
+
 
 @router.post("", response_model=RiskAssessmentBatchResponse, status_code=status.HTTP_200_OK)
 async def assess_risk(
     request: RiskAssessmentRequest,
     db: AsyncSession = Depends(get_db)
-) -> RiskAssessmentBatchResponse:
+) -> PydanticJSONResponse:
     """Assess risk for a location across multiple hazard types.
     
     Args:
@@ -35,12 +50,12 @@ async def assess_risk(
     Raises:
         HTTPException: If location not found or hazard types invalid
     """
-    # Get or create location
+    # Get or create location. Plain column rows are enough for the risk
+    # calculation and the response, so no ORM instance is hydrated.
+    locations = Location.__table__
     if request.location_id:
-        result = await db.execute(
-            select(Location).where(Location.id == request.location_id)
-        )
-        location = result.scalar_one_or_none()
+        result = await db.execute(_location_row_by_id, {"location_id": request.location_id})
+        location = result.one_or_none()
         if not location:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -48,9 +63,10 @@ async def assess_risk(
             )
     elif request.location:
         # Create new location
-        location = Location(**request.location.model_dump())
-        db.add(location)
-        await db.flush()
+        result = await db.execute(
+            insert(locations).values(**request.location.model_dump()).returning(locations)
+        )
+        location = result.one()
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -68,15 +84,14 @@ async def assess_risk(
         # Remove None values
         custom_factors = {k: v for k, v in custom_factors.items() if v is not None}
     
-    # Get hazard objects
-    result = await db.execute(
-        select(Hazard).where(Hazard.hazard_type.in_(request.hazard_types))
-    )
-    hazards = result.scalars().all()
+    # Get hazards, reading only the columns the risk calculation uses
+    requested_types = set(request.hazard_types)
+    result = await db.execute(_hazards_by_type, {"hazard_types": list(requested_types)})
+    hazards = result.all()
     
-    if len(hazards) != len(request.hazard_types):
+    if len(hazards) != len(requested_types):
         found_types = {h.hazard_type for h in hazards}
-        missing_types = set(request.hazard_types) - found_types
+        missing_types = requested_types - found_types
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Hazard types not found: {missing_types}"
@@ -84,52 +99,56 @@ async def assess_risk(
     
     # Calculate risk for each hazard
     risk_service = RiskCalculationService(db)
-    assessments = []
-    total_risk_score = 0
+    calculations = await risk_service.calculate_risks(location, hazards, custom_factors)
     
-    for hazard in hazards:
-        risk_score, risk_level, confidence, factors_analysis, recommendations = \
-            await risk_service.calculate_risk(location, hazard, custom_factors)
-        
-        # Create risk assessment record
-        assessment = RiskAssessment(
-            location_id=location.id,
-            hazard_id=hazard.id,
-            risk_score=risk_score,
-            risk_level=risk_level,
-            confidence_level=confidence,
-            factors_analysis=factors_analysis,
-            recommendations=recommendations
-        )
-        db.add(assessment)
-        await db.flush()
-        
-        # Add to response
-        assessments.append(
-            RiskAssessmentResponse(
-                id=assessment.id,
-                location_id=location.id,
-                hazard_id=hazard.id,
-                hazard_type=hazard.hazard_type,
-                risk_score=risk_score,
-                risk_level=risk_level,
-                confidence_level=confidence,
-                factors_analysis=factors_analysis,
-                recommendations=recommendations,
-                assessed_at=assessment.assessed_at
-            )
+    rows = []
+    hazard_types = []
+    for hazard, (risk_score, risk_level, confidence, factors_analysis, recommendations) in zip(
+        hazards, calculations
+    ):
+        rows.append({
+            'location_id': location.id,
+            'hazard_id': hazard.id,
+            'risk_score': risk_score,
+            'risk_level': risk_level,
+            'confidence_level': confidence,
+            'factors_analysis': factors_analysis,
+            'recommendations': recommendations
+        })
+        hazard_types.append(hazard.hazard_type)
+    
+    # Persist every assessment with one multi-row INSERT
+    result = await db.execute(
+        insert(RiskAssessment).returning(
+            RiskAssessment.id, RiskAssessment.assessed_at, sort_by_parameter_order=True
+        ),
+        rows
+    )
+    
+    # Rows come straight from the risk engine and the INSERT, so the
+    # per-assessment models skip field validation
+    assessments = [
+        RiskAssessmentResponse.model_construct(
+            id=assessment_id,
+            hazard_type=hazard_type,
+            assessed_at=assessed_at,
+            **row
         )
-        total_risk_score += risk_score
+        for row, hazard_type, (assessment_id, assessed_at) in zip(rows, hazard_types, result.all())
+    ]
     
     # Calculate overall risk
-    overall_risk_score = round(total_risk_score / len(assessments), 2)
+    overall_risk_score = round(fmean(row['risk_score'] for row in rows), 2)
     overall_risk_level = risk_service._determine_risk_level(overall_risk_score)
     
     await db.commit()
+    get_hotspot_refresher().schedule(h.id for h in hazards)
+    if request.location_id is None:
+        await get_response_cache().delete_prefix(CacheKey.LOCATION_LIST_PREFIX)
     
-    return RiskAssessmentBatchResponse(
+    return PydanticJSONResponse(RiskAssessmentBatchResponse(
         location=LocationResponse.model_validate(location),
         assessments=assessments,
         overall_risk_score=overall_risk_score,
         overall_risk_level=overall_risk_level
-    )
+    ))
@@ -1,4 +1,4 @@
 """Core application components."""
-from app.core.config import settings
+from app.core.config import settings, get_settings
 
-__all__ = ["settings"]
+__all__ = ["settings", "get_settings"]
@@ -1,5 +1,7 @@
 """Application configuration management."""
+from functools import cached_property, lru_cache
 from typing import List
+import orjson
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,6 +17,25 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite+aiosqlite:///./georisk.db"
     database_url_sync: str = "sqlite:///./georisk.db"
+    db_pool_size: int = 25
+    db_max_overflow: int = 25
+    db_pool_recycle: int = 1800
+    db_pool_timeout: int = 30
+    db_pool_warm_size: int = 5
+    db_query_log_enabled: bool = False
+    db_query_log_path: str = "logs/db-queries.jsonl"
+    
+    # In-memory caches. They are per worker process, and write endpoints only
+    # invalidate the worker that handled the write, so list responses and
+    # trend analyses are kept briefly enough that other workers converge
+    # within these TTLs
+    cache_reap_interval_seconds: int = 60
+    response_cache_ttl_seconds: int = 5
+    trend_cache_ttl_seconds: int = 5
+    
+    # Hotspot rankings are rebuilt in the background after assessment writes
+    # commit; writes within this window share one rebuild per hazard
+    hotspot_refresh_delay_seconds: float = 1.0
     
     # Secret key for session management
     secret_key: str = "change-this-in-production-minimum-32-characters"
@@ -23,14 +44,13 @@ class Settings(BaseSettings):
     # CORS
     backend_cors_origins: str = '["http://localhost:3000","http://localhost"]'
     
-    @property
+    @cached_property
     def cors_origins(self) -> List[str]:
-        """Parse CORS origins from string or list."""
+        """Parse CORS origins from string or list, once per settings instance."""
         if isinstance(self.backend_cors_origins, str):
-            import json
             try:
-                return json.loads(self.backend_cors_origins)
-            except json.JSONDecodeError:
+                return orjson.loads(self.backend_cors_origins)
+            except orjson.JSONDecodeError:
                 return [self.backend_cors_origins]
         return self.backend_cors_origins
     
@@ -44,4 +64,17 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings instance.
+    
+    The environment and .env file are read once per process; tests can call
+    get_settings.cache_clear() to re-read them.
+    
+    Returns:
+        Settings instance
+    """
+    return Settings()
+
+
+settings = get_settings()
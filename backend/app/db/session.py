@@ -1,17 +1,151 @@
 """Database session management with async support."""
-from typing import AsyncGenerator
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
 
-# Create async engine
+_is_sqlite = settings.database_url.startswith("sqlite")
+
+# Create async engine. The compiled-SQL cache is sized well above the default
+# 500 entries so every hot statement shape stays resident; on SQLite the
+# driver's own prepared-statement cache is enlarged to match. Server databases
+# get a pool sized for concurrent request handlers; aiosqlite keeps its own
+# default of NullPool for file databases (StaticPool for :memory:), since
+# pooling its per-connection worker threads gains nothing.
+if _is_sqlite:
+    _engine_options = {
+        "connect_args": {"cached_statements": 512, "check_same_thread": False},
+    }
+else:
+    _engine_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.environment == "development",
-    future=True
+    echo=False,
+    future=True,
+    query_cache_size=1200,
+    **_engine_options
 )
 
+if _is_sqlite:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """Enable WAL journaling and a larger page cache on each connection."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        cursor.close()
+
+# Per-request query bookkeeping, set by the request middleware while the query
+# log is enabled: {"request_id", "endpoint", "statements": Counter}
+query_log_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("query_log_scope", default=None)
+
+# A statement repeated this many times within one request is reported as a
+# likely N+1 pattern in the request summary
+N_PLUS_ONE_THRESHOLD = 5
+
+_query_logger = logging.getLogger("app.db.queries")
+
+if settings.db_query_log_enabled:
+    _query_logger.propagate = False
+    _query_logger.setLevel(logging.INFO)
+    os.makedirs(os.path.dirname(settings.db_query_log_path) or ".", exist_ok=True)
+    _query_logger.addHandler(logging.FileHandler(settings.db_query_log_path))
+    
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        """Record when a statement is sent to the driver."""
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+    
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _log_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        """Append the statement and its duration to the JSONL query log."""
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        scope = query_log_scope.get()
+        if scope is not None:
+            scope["statements"][statement] += 1
+        
+        _query_logger.info(json.dumps({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "request_id": scope["request_id"] if scope else None,
+            "endpoint": scope["endpoint"] if scope else None,
+            "duration_ms": round(elapsed * 1000, 3),
+            "executemany": executemany,
+            "statement": statement,
+        }))
+
+
+def log_request_query_summary(scope: Dict[str, Any]) -> None:
+    """Append a per-request summary line to the query log.
+    
+    Statements executed at least N_PLUS_ONE_THRESHOLD times are listed under
+    "repeated" and the line is logged at WARNING level.
+    
+    Args:
+        scope: Query log scope collected for the request
+    """
+    statements: Counter = scope["statements"]
+    repeated = [
+        {"statement": statement, "count": count}
+        for statement, count in statements.most_common()
+        if count >= N_PLUS_ONE_THRESHOLD
+    ]
+    
+    _query_logger.log(
+        logging.WARNING if repeated else logging.INFO,
+        json.dumps({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "request_id": scope["request_id"],
+            "endpoint": scope["endpoint"],
+            "query_count": sum(statements.values()),
+            "repeated": repeated,
+        })
+    )
+
+
+async def summarize_queries_after_body(
+    body_iterator: AsyncIterator[bytes],
+    scope: Dict[str, Any]
+) -> AsyncGenerator[bytes, None]:
+    """Pass a response body through, logging the query summary once it is sent.
+    
+    A streaming response runs its queries while the body is iterated, after
+    the middleware has the response object, so the summary waits for the
+    body to finish (or the client to disconnect).
+    
+    Args:
+        body_iterator: Response body chunks
+        scope: Query log scope collected for the request
+        
+    Yields:
+        The body chunks unchanged
+    """
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        log_request_query_summary(scope)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -21,13 +155,19 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
-# Base class for SQLAlchemy models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Base class for SQLAlchemy models."""
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async database sessions.
     
+    Write handlers commit explicitly so a failed commit still reaches the
+    client as an error: on this FastAPI version dependency teardown runs after
+    the response is sent. The commit below only persists work a handler left
+    pending; after a handler commit there is no open transaction, so it emits
+    no COMMIT and costs no round trip.
+    
     Yields:
         AsyncSession: Database session
         
@@ -47,6 +187,26 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def warm_pool(size: int) -> None:
+    """Open pooled connections up front so early requests skip the connect handshake.
+    
+    The connections are held concurrently, so each one is a distinct pool
+    member, then returned to the pool. SQLite is skipped; it does not pool.
+    
+    Args:
+        size: Number of connections to open, capped at the pool size
+    """
+    if _is_sqlite:
+        return
+    
+    size = min(size, settings.db_pool_size)
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(size))
+        )
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in connections))
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
@@ -1,11 +1,28 @@
 """Main FastAPI application."""
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager, suppress
+from uuid import uuid4
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db import init_db
+from app.db import get_db, init_db
+from app.db.session import (
+    engine,
+    log_request_query_summary,
+    query_log_scope,
+    summarize_queries_after_body,
+    warm_pool
+)
 from app.api import api_router
+from app.services.analytics_service import get_hotspot_refresher
+from app.services.caching_service import reap_expired_cache_entries
 from app.ws import stream_location_risk_updates, stream_regional_risk_visualization, stream_hazard_risk_heatmap
 
 
@@ -14,15 +31,22 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     await init_db()
+    await warm_pool(settings.db_pool_warm_size)
+    reaper = asyncio.create_task(reap_expired_cache_entries(settings.cache_reap_interval_seconds))
     yield
-    # Shutdown
-    pass
+    # Shutdown; rebuild hotspot rankings still waiting out their debounce window
+    await get_hotspot_refresher().flush()
+    reaper.cancel()
+    with suppress(asyncio.CancelledError):
+        await reaper
 
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Encode every JSON body with orjson's C encoder rather than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -34,6 +58,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (CSV exports in particular) for clients that accept
+# gzip; streaming bodies are compressed chunk by chunk
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+if settings.db_query_log_enabled:
+    @app.middleware("http")
+    async def log_request_queries(request: Request, call_next):
+        """Group query-log lines by request and summarize repeated statements."""
+        scope = {
+            "request_id": uuid4().hex,
+            "endpoint": f"{request.method} {request.url.path}",
+            "statements": Counter(),
+        }
+        # The endpoint task copies the context when call_next starts it, so
+        # resetting here does not stop a streamed body from being counted
+        token = query_log_scope.set(scope)
+        try:
+            response = await call_next(request)
+        except Exception:
+            log_request_query_summary(scope)
+            raise
+        finally:
+            query_log_scope.reset(token)
+        
+        response.body_iterator = summarize_queries_after_body(response.body_iterator, scope)
+        return response
+
 # Include API routes
 app.include_router(api_router, prefix=settings.api_prefix)
 
@@ -85,3 +136,43 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+# Probes poll frequently; a stalled database should fail them, not hang them
+DB_HEALTH_TIMEOUT_SECONDS = 2.0
+
+
+@app.get("/health/db")
+async def database_health(db: AsyncSession = Depends(get_db)):
+    """Database health check endpoint.
+    
+    Raises:
+        HTTPException: If the database is unreachable or does not answer
+            SELECT 1 in time
+    """
+    try:
+        await asyncio.wait_for(db.execute(text("SELECT 1")), timeout=DB_HEALTH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        # The cancelled statement may still be in flight on the connection, so
+        # it is discarded instead of being returned to the pool
+        await db.invalidate()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database health check timed out"
+        )
+    except (SQLAlchemyError, OSError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unreachable"
+        )
+    
+    return {"status": "healthy", "database": "reachable"}
+
+
+@app.get("/health/db-pool")
+async def db_pool_status():
+    """Connection pool health endpoint."""
+    return {
+        "status": "healthy",
+        "pool": engine.pool.status()
+    }
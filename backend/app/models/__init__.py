@@ -1,13 +1,50 @@
 """SQLAlchemy database models."""
+from bisect import bisect_right
 from datetime import datetime
-from typing import List
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from typing import Any, Dict, List, Optional
+from sqlalchemy import String, Float, DateTime, ForeignKey, JSON, Enum as SQLEnum, DDL, Index, event, table, column, text
+from sqlalchemy import ColumnElement, and_, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
 from app.db.session import Base
 
 
+# Stored as binary JSONB on PostgreSQL, plain JSON text elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, evaluated by the database.
+    
+    Used as a column default so inserts and updates render the timestamp
+    inline instead of binding a Python datetime per row.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _compile_utcnow_postgresql(element, compiler, **kw) -> str:
+    # Columns are timestamp without time zone holding UTC
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _compile_utcnow_sqlite(element, compiler, **kw) -> str:
+    # CURRENT_TIMESTAMP has whole-second precision; keep milliseconds so
+    # rows written in quick succession still order by time
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
 class HazardType(str, enum.Enum):
     """Types of natural hazards."""
     EARTHQUAKE = "earthquake"
@@ -24,78 +61,246 @@ class RiskLevel(str, enum.Enum):
     CRITICAL = "critical"
 
 
+# Rows covered by the idx_risk_assessments_hot partial index. Enum columns
+# store member names, and queries must repeat this text verbatim for the
+# planner to match the index.
+HOT_RISK_LEVEL_PREDICATE = "risk_level IN ('HIGH', 'CRITICAL')"
+
+# Lower score bounds of MODERATE, HIGH and CRITICAL; anything below 25 is LOW
+RISK_LEVEL_LOWER_BOUNDS = (25.0, 50.0, 75.0)
+_RISK_LEVELS_ASCENDING = (RiskLevel.LOW, RiskLevel.MODERATE, RiskLevel.HIGH, RiskLevel.CRITICAL)
+
+
+def risk_level_for_score(risk_score: float) -> RiskLevel:
+    """Map a 0-100 risk score to its risk level.
+    
+    Args:
+        risk_score: Risk score (0-100)
+        
+    Returns:
+        RiskLevel enum value
+    """
+    return _RISK_LEVELS_ASCENDING[bisect_right(RISK_LEVEL_LOWER_BOUNDS, risk_score)]
+
+
 class Location(Base):
     """Geographic location model."""
     __tablename__ = "locations"
+    # updated_at is set by SQL on UPDATE; fetch it back with RETURNING so it
+    # is not left expired (and lazy-loaded outside the greenlet) after a flush
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False, index=True)
-    latitude = Column(Float, nullable=False)
-    longitude = Column(Float, nullable=False)
-    population_density = Column(Float, nullable=False, default=0.0)
-    building_code_rating = Column(Float, nullable=False, default=5.0)  # 0-10 scale
-    infrastructure_quality = Column(Float, nullable=False, default=5.0)  # 0-10 scale
-    extra_data = Column(JSON, nullable=True)  # Renamed from metadata to avoid SQLAlchemy conflict
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    latitude: Mapped[float] = mapped_column(Float, nullable=False)
+    longitude: Mapped[float] = mapped_column(Float, nullable=False)
+    population_density: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    building_code_rating: Mapped[float] = mapped_column(Float, nullable=False, default=5.0)  # 0-10 scale
+    infrastructure_quality: Mapped[float] = mapped_column(Float, nullable=False, default=5.0)  # 0-10 scale
+    extra_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)  # Renamed from metadata to avoid SQLAlchemy conflict
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=utcnow(), onupdate=utcnow())
     
     # Relationships
-    risk_assessments = relationship("RiskAssessment", back_populates="location", cascade="all, delete-orphan")
-    historical_data = relationship("HistoricalData", back_populates="location", cascade="all, delete-orphan")
+    risk_assessments: Mapped[List["RiskAssessment"]] = relationship(back_populates="location", cascade="all, delete-orphan", lazy="raise_on_sql")
+    historical_data: Mapped[List["HistoricalData"]] = relationship(back_populates="location", cascade="all, delete-orphan", lazy="raise_on_sql")
+
+
+# Spatial index over location points. SQLite keeps an R-Tree virtual table in
+# sync through triggers; PostgreSQL uses a GiST index on point(longitude, latitude).
+locations_rtree = table(
+    "locations_rtree",
+    column("id"),
+    column("min_lat"),
+    column("max_lat"),
+    column("min_lon"),
+    column("max_lon"),
+)
+
+LOCATIONS_SPATIAL_INDEX_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS locations_rtree "
+        "USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+        "CREATE TRIGGER IF NOT EXISTS locations_rtree_insert AFTER INSERT ON locations BEGIN "
+        "INSERT INTO locations_rtree VALUES "
+        "(new.id, new.latitude, new.latitude, new.longitude, new.longitude); END",
+        "CREATE TRIGGER IF NOT EXISTS locations_rtree_update AFTER UPDATE OF latitude, longitude ON locations BEGIN "
+        "INSERT OR REPLACE INTO locations_rtree VALUES "
+        "(new.id, new.latitude, new.latitude, new.longitude, new.longitude); END",
+        "CREATE TRIGGER IF NOT EXISTS locations_rtree_delete AFTER DELETE ON locations BEGIN "
+        "DELETE FROM locations_rtree WHERE id = old.id; END",
+    ],
+    "postgresql": [
+        "CREATE INDEX IF NOT EXISTS idx_locations_gist ON locations "
+        "USING gist (point(longitude, latitude))",
+    ],
+}
+
+for _dialect, _statements in LOCATIONS_SPATIAL_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(Location.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+event.listen(
+    Location.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS locations_rtree").execute_if(dialect="sqlite")
+)
+
+
+def location_bounds_conditions(
+    dialect_name: str,
+    min_latitude: float,
+    max_latitude: float,
+    min_longitude: float,
+    max_longitude: float
+) -> List[ColumnElement[bool]]:
+    """Build WHERE conditions selecting locations inside a bounding box.
+    
+    The exact coordinate bounds are always included. On SQLite and PostgreSQL
+    a predicate the spatial index can answer is added to prune both
+    dimensions at once; the exact bounds still apply since R-Tree
+    coordinates are stored as float32.
+    
+    Args:
+        dialect_name: Name of the dialect the query will run on
+        min_latitude: Minimum latitude boundary
+        max_latitude: Maximum latitude boundary
+        min_longitude: Minimum longitude boundary
+        max_longitude: Maximum longitude boundary
+        
+    Returns:
+        Conditions on Location to AND into the query
+    """
+    conditions = [
+        Location.latitude >= min_latitude,
+        Location.latitude <= max_latitude,
+        Location.longitude >= min_longitude,
+        Location.longitude <= max_longitude
+    ]
+    
+    if dialect_name == "sqlite":
+        candidate_ids = select(locations_rtree.c.id).where(
+            and_(
+                locations_rtree.c.max_lat >= min_latitude,
+                locations_rtree.c.min_lat <= max_latitude,
+                locations_rtree.c.max_lon >= min_longitude,
+                locations_rtree.c.min_lon <= max_longitude
+            )
+        )
+        conditions.append(Location.id.in_(candidate_ids))
+    elif dialect_name == "postgresql":
+        bounding_box = func.box(
+            func.point(min_longitude, min_latitude),
+            func.point(max_longitude, max_latitude)
+        )
+        conditions.append(
+            func.point(Location.longitude, Location.latitude).op("<@")(bounding_box)
+        )
+    
+    return conditions
 
 
 class Hazard(Base):
     """Hazard type configuration model."""
     __tablename__ = "hazards"
+    # updated_at is set by SQL on UPDATE; fetch it back with RETURNING so it
+    # is not left expired (and lazy-loaded outside the greenlet) after a flush
+    __mapper_args__ = {"eager_defaults": True}
     
-    id = Column(Integer, primary_key=True, index=True)
-    hazard_type = Column(SQLEnum(HazardType), nullable=False, unique=True, index=True)
-    name = Column(String(100), nullable=False)
-    description = Column(String(500), nullable=True)
-    base_severity = Column(Float, nullable=False, default=5.0)  # 0-10 scale
-    weight_factors = Column(JSON, nullable=True)  # Weights for different risk factors
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    hazard_type: Mapped[HazardType] = mapped_column(SQLEnum(HazardType), nullable=False, unique=True, index=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    base_severity: Mapped[float] = mapped_column(Float, nullable=False, default=5.0)  # 0-10 scale
+    weight_factors: Mapped[Optional[Dict[str, float]]] = mapped_column(JSON, nullable=True)  # Weights for different risk factors
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=utcnow(), onupdate=utcnow())
     
     # Relationships
-    risk_assessments = relationship("RiskAssessment", back_populates="hazard")
-    historical_data = relationship("HistoricalData", back_populates="hazard")
+    risk_assessments: Mapped[List["RiskAssessment"]] = relationship(back_populates="hazard", lazy="raise_on_sql")
+    historical_data: Mapped[List["HistoricalData"]] = relationship(back_populates="hazard", lazy="raise_on_sql")
 
 
 class RiskAssessment(Base):
     """Risk assessment result model."""
     __tablename__ = "risk_assessments"
+    __table_args__ = (
+        # Latest-assessment lookups per (location, hazard); covering on PostgreSQL
+        Index(
+            "idx_risk_assessments_location_hazard_assessed",
+            "location_id", "hazard_id", text("assessed_at DESC"), "risk_score",
+            postgresql_include=["risk_level", "confidence_level"]
+        ),
+        # Hotspot aggregation groups one hazard's scores by location from the
+        # index alone; also serves the plain hazard_id lookups
+        Index(
+            "idx_risk_assessments_hazard_location_score",
+            "hazard_id", "location_id", "risk_score"
+        ),
+        # Newest alarming assessments for high/critical exports
+        Index(
+            "idx_risk_assessments_hot",
+            text("assessed_at DESC"), text("risk_score DESC"),
+            sqlite_where=text(HOT_RISK_LEVEL_PREDICATE),
+            postgresql_where=text(HOT_RISK_LEVEL_PREDICATE)
+        ),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False, index=True)
-    hazard_id = Column(Integer, ForeignKey("hazards.id"), nullable=False, index=True)
-    risk_score = Column(Float, nullable=False)  # 0-100 scale
-    risk_level = Column(SQLEnum(RiskLevel), nullable=False)
-    confidence_level = Column(Float, nullable=False, default=0.0)  # 0-1 scale
-    factors_analysis = Column(JSON, nullable=True)  # Detailed breakdown of contributing factors
-    recommendations = Column(JSON, nullable=True)  # List of mitigation recommendations
-    assessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False, index=True)
+    hazard_id: Mapped[int] = mapped_column(ForeignKey("hazards.id"), nullable=False)
+    risk_score: Mapped[float] = mapped_column(Float, nullable=False)  # 0-100 scale
+    risk_level: Mapped[RiskLevel] = mapped_column(SQLEnum(RiskLevel), nullable=False)
+    confidence_level: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # 0-1 scale
+    factors_analysis: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONDocument, nullable=True)  # Detailed breakdown of contributing factors
+    recommendations: Mapped[Optional[List[str]]] = mapped_column(JSONDocument, nullable=True)  # List of mitigation recommendations
+    assessed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=utcnow(), index=True)
     
     # Relationships
-    location = relationship("Location", back_populates="risk_assessments")
-    hazard = relationship("Hazard", back_populates="risk_assessments")
+    location: Mapped["Location"] = relationship(back_populates="risk_assessments", lazy="raise_on_sql")
+    hazard: Mapped["Hazard"] = relationship(back_populates="risk_assessments", lazy="raise_on_sql")
 
 
 class HistoricalData(Base):
     """Historical hazard event data model."""
     __tablename__ = "historical_data"
+    __table_args__ = (
+        # Per-location history pages, newest first; id breaks event_date ties
+        # so keyset cursors resume without a sort
+        Index(
+            "idx_historical_data_location_date",
+            "location_id", text("event_date DESC"), text("id DESC")
+        ),
+        # Per-(location, hazard) pages and trend ranges; trend analysis also
+        # reads casualties and damage, covered on PostgreSQL
+        Index(
+            "idx_historical_data_location_hazard_date_severity",
+            "location_id", "hazard_id", text("event_date DESC"), "severity",
+            postgresql_include=["casualties", "economic_damage"]
+        ),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False, index=True)
-    hazard_id = Column(Integer, ForeignKey("hazards.id"), nullable=False, index=True)
-    event_date = Column(DateTime, nullable=False, index=True)
-    severity = Column(Float, nullable=False)  # 0-10 scale
-    impact_description = Column(String(1000), nullable=True)
-    casualties = Column(Integer, nullable=True, default=0)
-    economic_damage = Column(Float, nullable=True, default=0.0)  # In USD
-    extra_data = Column(JSON, nullable=True)  # Renamed from metadata to avoid SQLAlchemy conflict
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False, index=True)
+    hazard_id: Mapped[int] = mapped_column(ForeignKey("hazards.id"), nullable=False, index=True)
+    event_date: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    severity: Mapped[float] = mapped_column(Float, nullable=False)  # 0-10 scale
+    impact_description: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
+    casualties: Mapped[Optional[int]] = mapped_column(nullable=True, default=0)
+    economic_damage: Mapped[Optional[float]] = mapped_column(Float, nullable=True, default=0.0)  # In USD
+    extra_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)  # Renamed from metadata to avoid SQLAlchemy conflict
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=utcnow())
     
     # Relationships
-    location = relationship("Location", back_populates="historical_data")
-    hazard = relationship("Hazard", back_populates="historical_data")
+    location: Mapped["Location"] = relationship(back_populates="historical_data", lazy="raise_on_sql")
+    hazard: Mapped["Hazard"] = relationship(back_populates="historical_data", lazy="raise_on_sql")
+
+
+class RiskHotspot(Base):
+    """Precomputed hotspot ranking, rebuilt per hazard after assessments change."""
+    __tablename__ = "risk_hotspots_cache"
+    
+    hazard_id: Mapped[int] = mapped_column(ForeignKey("hazards.id", ondelete="CASCADE"), primary_key=True)
+    rank: Mapped[int] = mapped_column(primary_key=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id", ondelete="CASCADE"), nullable=False)
+    risk_score: Mapped[float] = mapped_column(Float, nullable=False)  # Average 0-100 score across assessments
@@ -1,7 +1,7 @@
 """Pydantic schemas for request/response validation."""
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from enum import Enum
 
 
@@ -58,6 +58,21 @@ class LocationResponse(LocationBase):
     updated_at: datetime
 
 
+class LocationBounds(BaseModel):
+    """Geographic bounding box for filtering."""
+    min_lat: float = Field(..., ge=-90, le=90, description="Minimum latitude")
+    max_lat: float = Field(..., ge=-90, le=90, description="Maximum latitude")
+    min_lon: float = Field(..., ge=-180, le=180, description="Minimum longitude")
+    max_lon: float = Field(..., ge=-180, le=180, description="Maximum longitude")
+    
+    @model_validator(mode="after")
+    def check_ordering(self) -> "LocationBounds":
+        """Reject empty or inverted boxes before any query runs."""
+        if self.min_lat >= self.max_lat or self.min_lon >= self.max_lon:
+            raise ValueError("Minimum bounds must be less than maximum bounds")
+        return self
+
+
 # Hazard Schemas
 class HazardBase(BaseModel):
     """Base hazard schema."""
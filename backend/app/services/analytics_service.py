@@ -1,16 +1,60 @@
 """Advanced analytics service for comprehensive risk assessment."""
-from typing import Dict, List, Tuple
+from typing import Any, AsyncContextManager, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, delete, insert, cast, Numeric, Row, RowMapping
+from collections import defaultdict
+from contextlib import suppress
+import asyncio
+import logging
+import math
 import statistics
 
-from app.models import Location, Hazard, HazardType, RiskLevel, HistoricalData, RiskAssessment
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.caching_service import CacheKey, get_trend_cache
+from app.models import (
+    Location, Hazard, HazardType, RiskLevel, HistoricalData, RiskAssessment, RiskHotspot,
+    location_bounds_conditions
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _sample_stdev(values: Sequence[float], mean: float) -> float:
+    """Sample standard deviation in float arithmetic.
+    
+    statistics.stdev() sums squares exactly through Fractions, which is
+    several times slower and makes no difference after rounding.
+    
+    Args:
+        values: At least two samples
+        mean: Precomputed mean of the samples
+        
+    Returns:
+        Sample standard deviation
+    """
+    return math.sqrt(math.fsum((x - mean) ** 2 for x in values) / (len(values) - 1))
 
 
 class AdvancedAnalyticsService:
     """Service for advanced risk analysis including trends, patterns, and predictions."""
     
+    # Number of ranked hotspots precomputed per hazard (the endpoint caps limit at 100)
+    HOTSPOT_CACHE_SIZE = 100
+    
+    # First key of the PostgreSQL advisory lock taken per hazard while its
+    # hotspot ranking is rebuilt (the second key is the hazard id)
+    HOTSPOT_LOCK_CLASS = 7007
+    
+    # The only event columns trend analysis reads; selecting them skips ORM hydration
+    _TREND_COLUMNS = (
+        HistoricalData.severity,
+        HistoricalData.casualties,
+        HistoricalData.economic_damage
+    )
+    
     def __init__(self, db: AsyncSession):
         """Initialize analytics service.
         
@@ -35,10 +79,16 @@ class AdvancedAnalyticsService:
         Returns:
             Dictionary with trend analysis including frequency, severity, and patterns
         """
+        cache = get_trend_cache()
+        cache_key = CacheKey.trends(location.id, hazard.id, years)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         start_date = datetime.utcnow() - timedelta(days=years*365)
         
         result = await self.db.execute(
-            select(HistoricalData)
+            select(*self._TREND_COLUMNS)
             .where(
                 and_(
                     HistoricalData.location_id == location.id,
@@ -48,8 +98,23 @@ class AdvancedAnalyticsService:
             )
             .order_by(HistoricalData.event_date)
         )
-        events = result.scalars().all()
+        events = result.all()
         
+        trends = self._compute_trend(events, years)
+        await cache.set(cache_key, trends)
+        return trends
+    
+    @staticmethod
+    def _compute_trend(events: Sequence[Tuple[float, Any, Any]], years: int) -> Dict[str, Any]:
+        """Summarize a location-hazard event history.
+        
+        Args:
+            events: (severity, casualties, economic_damage) rows ordered by event date
+            years: Number of years the events cover
+            
+        Returns:
+            Dictionary with trend analysis including frequency, severity, and patterns
+        """
         if not events:
             return {
                 'event_count': 0,
@@ -63,14 +128,14 @@ class AdvancedAnalyticsService:
                 'total_economic_damage': 0.0
             }
         
-        severities = [e.severity for e in events]
-        casualties = [e.casualties or 0 for e in events]
-        damages = [e.economic_damage or 0.0 for e in events]
+        # Transpose the rows into column tuples in one pass
+        severities, casualties, damages = zip(*events)
+        average_severity = statistics.fmean(severities)
         
         # Calculate trend direction (increasing, decreasing, stable)
         if len(events) > 1:
-            first_half_avg = statistics.mean(severities[:len(severities)//2])
-            second_half_avg = statistics.mean(severities[len(severities)//2:])
+            first_half_avg = statistics.fmean(severities[:len(severities)//2])
+            second_half_avg = statistics.fmean(severities[len(severities)//2:])
             
             if second_half_avg > first_half_avg * 1.2:
                 trend = 'increasing'
@@ -84,13 +149,15 @@ class AdvancedAnalyticsService:
         return {
             'event_count': len(events),
             'trend': trend,
-            'average_severity': round(statistics.mean(severities), 2),
+            'average_severity': round(average_severity, 2),
             'max_severity': max(severities),
             'min_severity': min(severities),
-            'std_deviation': round(statistics.stdev(severities) if len(severities) > 1 else 0.0, 2),
+            'std_deviation': round(
+                _sample_stdev(severities, average_severity) if len(severities) > 1 else 0.0, 2
+            ),
             'frequency_per_year': round(len(events) / years, 2),
-            'total_casualties': sum(casualties),
-            'total_economic_damage': round(sum(damages), 2)
+            'total_casualties': sum(filter(None, casualties)),
+            'total_economic_damage': round(math.fsum(filter(None, damages)), 2)
         }
     
     async def calculate_risk_hotspots(
@@ -100,6 +167,10 @@ class AdvancedAnalyticsService:
     ) -> List[Dict[str, any]]:
         """Identify high-risk locations for a specific hazard.
         
+        Reads the precomputed ranking only. HotspotRefresher rebuilds it shortly
+        after each write that changes assessments, so an empty ranking means
+        the hazard has none.
+        
         Args:
             hazard: Hazard object
             limit: Maximum number of hotspots to return
@@ -107,32 +178,89 @@ class AdvancedAnalyticsService:
         Returns:
             List of locations sorted by risk score
         """
-        result = await self.db.execute(
+        rows = await self._fetch_cached_hotspots(hazard.id, limit)
+        
+        return [dict(row) for row in rows]
+    
+    async def refresh_risk_hotspots(self, hazard_ids: Iterable[int] | None = None) -> None:
+        """Rebuild the precomputed hotspot rankings in this session's transaction.
+        
+        Each hazard costs an aggregate over all of its assessments, so request
+        handlers do not call this; they queue the hazards on
+        get_hotspot_refresher() after committing their write.
+        
+        Args:
+            hazard_ids: Hazards whose rankings changed (default: all)
+        """
+        if hazard_ids is None:
+            hazard_ids = (await self.db.execute(select(Hazard.id))).scalars().all()
+        
+        # Sorted so concurrent writers take the per-hazard locks in one order
+        for hazard_id in sorted(set(hazard_ids)):
+            await self._rebuild_risk_hotspots(hazard_id)
+    
+    async def _rebuild_risk_hotspots(self, hazard_id: int) -> None:
+        """Replace one hazard's hotspot ranking with a fresh aggregate.
+        
+        On PostgreSQL a transaction-scoped advisory lock serialises rebuilds
+        of the same hazard, so a concurrent rebuild cannot insert the same
+        (hazard_id, rank) keys before this one commits. SQLite already
+        serialises writers.
+        
+        Args:
+            hazard_id: Hazard ID to rebuild
+        """
+        if self.db.get_bind().dialect.name == 'postgresql':
+            await self.db.execute(
+                select(func.pg_advisory_xact_lock(self.HOTSPOT_LOCK_CLASS, hazard_id))
+            )
+        
+        avg_risk = func.avg(RiskAssessment.risk_score)
+        # Scores are stored pre-rounded so reads return them as-is
+        ranked = (
             select(
+                RiskAssessment.hazard_id,
+                func.row_number().over(order_by=avg_risk.desc()),
                 RiskAssessment.location_id,
-                Location.name,
+                func.round(cast(avg_risk, Numeric), 2)
+            )
+            .where(RiskAssessment.hazard_id == hazard_id)
+            .group_by(RiskAssessment.hazard_id, RiskAssessment.location_id)
+            .order_by(avg_risk.desc())
+            .limit(self.HOTSPOT_CACHE_SIZE)
+        )
+        
+        await self.db.execute(delete(RiskHotspot).where(RiskHotspot.hazard_id == hazard_id))
+        await self.db.execute(
+            insert(RiskHotspot).from_select(
+                ['hazard_id', 'rank', 'location_id', 'risk_score'], ranked
+            )
+        )
+    
+    async def _fetch_cached_hotspots(self, hazard_id: int, limit: int) -> Sequence[RowMapping]:
+        """Read the top precomputed hotspots for a hazard.
+        
+        Args:
+            hazard_id: Hazard ID
+            limit: Maximum number of rows
+            
+        Returns:
+            Mappings with location_id, location_name, latitude, longitude and risk_score
+        """
+        result = await self.db.execute(
+            select(
+                RiskHotspot.location_id,
+                Location.name.label('location_name'),
                 Location.latitude,
                 Location.longitude,
-                func.avg(RiskAssessment.risk_score).label('avg_risk')
+                RiskHotspot.risk_score
             )
-            .join(Location)
-            .where(RiskAssessment.hazard_id == hazard.id)
-            .group_by(RiskAssessment.location_id, Location.id)
-            .order_by(func.avg(RiskAssessment.risk_score).desc())
+            .join(Location, Location.id == RiskHotspot.location_id)
+            .where(RiskHotspot.hazard_id == hazard_id)
+            .order_by(RiskHotspot.rank)
             .limit(limit)
         )
-        
-        hotspots = []
-        for row in result:
-            hotspots.append({
-                'location_id': row[0],
-                'location_name': row[1],
-                'latitude': row[2],
-                'longitude': row[3],
-                'risk_score': round(row[4], 2)
-            })
-        
-        return hotspots
+        return result.mappings().all()
     
     async def compare_locations(
         self,
@@ -148,15 +276,82 @@ class AdvancedAnalyticsService:
         Returns:
             Dictionary mapping location IDs to their risk profiles
         """
-        result = await self.db.execute(
-            select(Location).where(Location.id.in_(location_ids))
+        # Latest assessment per location, ranked in the database
+        ranked = (
+            select(
+                RiskAssessment.location_id,
+                RiskAssessment.risk_score,
+                RiskAssessment.risk_level,
+                RiskAssessment.confidence_level,
+                RiskAssessment.assessed_at,
+                func.row_number().over(
+                    partition_by=RiskAssessment.location_id,
+                    order_by=RiskAssessment.assessed_at.desc()
+                ).label('recency')
+            )
+            .where(
+                and_(
+                    RiskAssessment.location_id.in_(location_ids),
+                    RiskAssessment.hazard_id == hazard_id
+                )
+            )
+            .subquery()
         )
-        locations = {l.id: l for l in result.scalars().all()}
         
-        hazard_result = await self.db.execute(
-            select(Hazard).where(Hazard.id == hazard_id)
+        # Location columns and their latest assessment in one round trip
+        result = await self.db.execute(
+            select(
+                Location.id,
+                Location.name,
+                Location.latitude,
+                Location.longitude,
+                Location.population_density,
+                Location.building_code_rating,
+                Location.infrastructure_quality,
+                ranked.c.risk_score,
+                ranked.c.risk_level,
+                ranked.c.confidence_level,
+                ranked.c.assessed_at
+            )
+            .outerjoin(
+                ranked,
+                and_(ranked.c.location_id == Location.id, ranked.c.recency == 1)
+            )
+            .where(Location.id.in_(location_ids))
         )
-        hazard = hazard_result.scalar_one_or_none()
+        locations = {row.id: row for row in result.all()}
+        
+        years = 10
+        cache = get_trend_cache()
+        trends_by_location = {}
+        for loc_id in locations:
+            cached = await cache.get(CacheKey.trends(loc_id, hazard_id, years))
+            if cached is not None:
+                trends_by_location[loc_id] = cached
+        
+        # Events for every uncached location in one query, bucketed per location
+        uncached_ids = [loc_id for loc_id in locations if loc_id not in trends_by_location]
+        if uncached_ids:
+            start_date = datetime.utcnow() - timedelta(days=years*365)
+            events_result = await self.db.execute(
+                select(HistoricalData.location_id, *self._TREND_COLUMNS)
+                .where(
+                    and_(
+                        HistoricalData.location_id.in_(uncached_ids),
+                        HistoricalData.hazard_id == hazard_id,
+                        HistoricalData.event_date >= start_date
+                    )
+                )
+                .order_by(HistoricalData.location_id, HistoricalData.event_date)
+            )
+            events_by_location = defaultdict(list)
+            for location_id, *event in events_result.all():
+                events_by_location[location_id].append(event)
+            
+            for loc_id in uncached_ids:
+                trends = self._compute_trend(events_by_location[loc_id], years)
+                await cache.set(CacheKey.trends(loc_id, hazard_id, years), trends)
+                trends_by_location[loc_id] = trends
         
         comparison = {}
         for loc_id in location_ids:
@@ -164,23 +359,9 @@ class AdvancedAnalyticsService:
                 continue
             
             location = locations[loc_id]
-            
-            # Get latest risk assessment
-            assess_result = await self.db.execute(
-                select(RiskAssessment)
-                .where(
-                    and_(
-                        RiskAssessment.location_id == loc_id,
-                        RiskAssessment.hazard_id == hazard_id
-                    )
-                )
-                .order_by(RiskAssessment.assessed_at.desc())
-                .limit(1)
-            )
-            latest_assessment = assess_result.scalar_one_or_none()
-            
-            # Get historical trends
-            trends = await self.analyze_historical_trends(location, hazard)
+            # risk_score is NOT NULL, so NULL here means no assessment matched
+            assessed = location.risk_score is not None
+            trends = trends_by_location[loc_id]
             
             comparison[loc_id] = {
                 'location_name': location.name,
@@ -194,10 +375,10 @@ class AdvancedAnalyticsService:
                     'infrastructure_quality': location.infrastructure_quality
                 },
                 'current_risk': {
-                    'risk_score': latest_assessment.risk_score if latest_assessment else 0.0,
-                    'risk_level': latest_assessment.risk_level if latest_assessment else 'unknown',
-                    'confidence': latest_assessment.confidence_level if latest_assessment else 0.0,
-                    'assessed_at': latest_assessment.assessed_at.isoformat() if latest_assessment else None
+                    'risk_score': location.risk_score if assessed else 0.0,
+                    'risk_level': location.risk_level if assessed else 'unknown',
+                    'confidence': location.confidence_level if assessed else 0.0,
+                    'assessed_at': location.assessed_at.isoformat() if assessed else None
                 },
                 'historical_trends': trends
             }
@@ -224,22 +405,33 @@ class AdvancedAnalyticsService:
         Returns:
             Regional risk index with statistics
         """
-        query = select(RiskAssessment).join(Location).where(
-            and_(
-                Location.latitude >= min_latitude,
-                Location.latitude <= max_latitude,
-                Location.longitude >= min_longitude,
-                Location.longitude <= max_longitude
-            )
+        conditions = location_bounds_conditions(
+            self.db.get_bind().dialect.name,
+            min_latitude, max_latitude, min_longitude, max_longitude
         )
         
         if hazard_id:
-            query = query.where(RiskAssessment.hazard_id == hazard_id)
+            conditions.append(RiskAssessment.hazard_id == hazard_id)
         
-        result = await self.db.execute(query)
-        assessments = result.scalars().all()
+        # Per-level partial aggregates; SQLite has no stddev_samp, so the
+        # deviation is derived from the sum of squares below
+        score = RiskAssessment.risk_score
+        result = await self.db.execute(
+            select(
+                RiskAssessment.risk_level,
+                func.count(),
+                func.sum(score),
+                func.sum(score * score),
+                func.min(score),
+                func.max(score)
+            )
+            .join(Location)
+            .where(*conditions)
+            .group_by(RiskAssessment.risk_level)
+        )
+        level_rows = result.all()
         
-        if not assessments:
+        if not level_rows:
             return {
                 'region': {
                     'bounds': {
@@ -251,12 +443,29 @@ class AdvancedAnalyticsService:
                 'risk_statistics': {}
             }
         
-        scores = [a.risk_score for a in assessments]
+        count = sum(row[1] for row in level_rows)
+        total = math.fsum(row[2] for row in level_rows)
+        total_squares = math.fsum(row[3] for row in level_rows)
+        average_score = total / count
         
-        risk_level_counts = {}
-        for level in RiskLevel:
-            count = sum(1 for a in assessments if a.risk_level == level)
-            risk_level_counts[level.value] = count
+        std_deviation = 0.0
+        if count > 1:
+            variance = (total_squares - total * average_score) / (count - 1)
+            std_deviation = math.sqrt(max(variance, 0.0))
+        
+        # Median from the one or two middle rows rather than every score
+        median_result = await self.db.execute(
+            select(score)
+            .join(Location)
+            .where(*conditions)
+            .order_by(score)
+            .offset((count - 1) // 2)
+            .limit(2 - count % 2)
+        )
+        median_score = statistics.fmean(median_result.scalars().all())
+        
+        level_counts = {row[0]: row[1] for row in level_rows}
+        risk_level_counts = {level.value: level_counts.get(level, 0) for level in RiskLevel}
         
         return {
             'region': {
@@ -265,17 +474,42 @@ class AdvancedAnalyticsService:
                     'longitude': [min_longitude, max_longitude]
                 }
             },
-            'assessment_count': len(assessments),
+            'assessment_count': count,
             'risk_statistics': {
-                'average_risk_score': round(statistics.mean(scores), 2),
-                'median_risk_score': round(statistics.median(scores), 2),
-                'std_deviation': round(statistics.stdev(scores) if len(scores) > 1 else 0.0, 2),
-                'min_risk_score': min(scores),
-                'max_risk_score': max(scores),
+                'average_risk_score': round(average_score, 2),
+                'median_risk_score': round(median_score, 2),
+                'std_deviation': round(std_deviation, 2),
+                'min_risk_score': min(row[4] for row in level_rows),
+                'max_risk_score': max(row[5] for row in level_rows),
                 'risk_level_distribution': risk_level_counts
             }
         }
     
+    async def _latest_assessment(self, location_id: int, hazard_id: int) -> Optional[Row]:
+        """Fetch the score and factors of the latest assessment for a location-hazard pair.
+        
+        Forecasting and factor ranking both start from this row.
+        
+        Args:
+            location_id: Location ID
+            hazard_id: Hazard ID
+            
+        Returns:
+            Row with risk_score and factors_analysis, or None if never assessed
+        """
+        result = await self.db.execute(
+            select(RiskAssessment.risk_score, RiskAssessment.factors_analysis)
+            .where(
+                and_(
+                    RiskAssessment.location_id == location_id,
+                    RiskAssessment.hazard_id == hazard_id
+                )
+            )
+            .order_by(RiskAssessment.assessed_at.desc())
+            .limit(1)
+        )
+        return result.one_or_none()
+    
     async def forecast_risk_evolution(
         self,
         location: Location,
@@ -292,24 +526,10 @@ class AdvancedAnalyticsService:
         Returns:
             Forecast data with confidence intervals
         """
-        # Analyze historical trends
-        trends = await self.analyze_historical_trends(location, hazard, years=5)
+        latest = await self._latest_assessment(location.id, hazard.id)
+        base_risk = latest.risk_score if latest is not None else None
         
-        # Simple trend-based forecast
-        current_result = await self.db.execute(
-            select(RiskAssessment)
-            .where(
-                and_(
-                    RiskAssessment.location_id == location.id,
-                    RiskAssessment.hazard_id == hazard.id
-                )
-            )
-            .order_by(RiskAssessment.assessed_at.desc())
-            .limit(1)
-        )
-        current_assessment = current_result.scalar_one_or_none()
-        
-        if not current_assessment:
+        if base_risk is None:
             return {
                 'location_id': location.id,
                 'hazard_type': hazard.hazard_type.value,
@@ -317,7 +537,8 @@ class AdvancedAnalyticsService:
                 'forecast': []
             }
         
-        base_risk = current_assessment.risk_score
+        # Analyze historical trends
+        trends = await self.analyze_historical_trends(location, hazard, years=5)
         trend_factor = 1.0
         
         if trends['trend'] == 'increasing':
@@ -325,19 +546,21 @@ class AdvancedAnalyticsService:
         elif trends['trend'] == 'decreasing':
             trend_factor = 0.98
         
-        forecast = []
-        for month in range(1, months_ahead + 1):
-            projected_risk = base_risk * (trend_factor ** month)
-            projected_risk = min(max(projected_risk, 0), 100)
-            
-            forecast.append({
+        projections = [
+            min(max(base_risk * (trend_factor ** month), 0), 100)
+            for month in range(1, months_ahead + 1)
+        ]
+        forecast = [
+            {
                 'month_ahead': month,
                 'projected_risk_score': round(projected_risk, 2),
                 'confidence_interval': {
                     'lower': round(max(0, projected_risk - 5), 2),
                     'upper': round(min(100, projected_risk + 5), 2)
                 }
-            })
+            }
+            for month, projected_risk in enumerate(projections, start=1)
+        ]
         
         return {
             'location_id': location.id,
@@ -363,34 +586,102 @@ class AdvancedAnalyticsService:
         Returns:
             List of risk factors ranked by impact
         """
-        result = await self.db.execute(
-            select(RiskAssessment)
-            .where(
-                and_(
-                    RiskAssessment.location_id == location.id,
-                    RiskAssessment.hazard_id == hazard.id
-                )
-            )
-            .order_by(RiskAssessment.assessed_at.desc())
-            .limit(1)
-        )
-        assessment = result.scalar_one_or_none()
+        latest = await self._latest_assessment(location.id, hazard.id)
+        factors = latest.factors_analysis if latest is not None else None
         
-        if not assessment or not assessment.factors_analysis:
+        if not factors:
             return []
         
-        factors = assessment.factors_analysis
-        ranked_factors = sorted(
-            [
-                {
-                    'factor_name': name,
-                    'impact_score': value,
-                    'impact_percentage': round((value / 100) * 100, 1)
-                }
-                for name, value in factors.items()
-            ],
-            key=lambda x: x['impact_score'],
-            reverse=True
-        )
+        # Impact scores are already on a 0-100 scale, so the percentage is the score
+        return [
+            {
+                'factor_name': name,
+                'impact_score': value,
+                'impact_percentage': round(value, 1)
+            }
+            for name, value in sorted(factors.items(), key=lambda item: item[1], reverse=True)
+        ]
+
+
+class HotspotRefresher:
+    """Debounced background rebuilds of the precomputed hotspot rankings.
+    
+    Writers call schedule() after their transaction commits. Hazard ids are
+    collected for delay_seconds, then each hazard is rebuilt once in a
+    session and transaction of its own, so request transactions never run
+    the ranking aggregate or wait on its lock, and a burst of writes to the
+    same hazards costs one rebuild each. Rankings lag writes by about
+    delay_seconds.
+    
+    Queued ids live in the worker process; the application lifespan flushes
+    them on shutdown, and a worker that dies first leaves those rankings
+    stale until the hazard is next written.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        delay_seconds: float
+    ):
+        """Initialize the refresher.
         
-        return ranked_factors
+        Args:
+            session_factory: Opens the session each rebuild runs in
+            delay_seconds: Debounce window between the first queued write and the rebuilds
+        """
+        self.session_factory = session_factory
+        self.delay_seconds = delay_seconds
+        self._pending: set[int] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def schedule(self, hazard_ids: Iterable[int]) -> None:
+        """Queue hazards for a rebuild once the debounce window closes.
+        
+        Args:
+            hazard_ids: Hazards whose assessments changed in a committed write
+        """
+        self._pending.update(hazard_ids)
+        if self._pending and (self._task is None or self._task.done()):
+            self._wake.clear()
+            self._task = asyncio.create_task(self._run())
+    
+    async def flush(self) -> None:
+        """Rebuild every queued hazard now and wait for the rebuilds to finish."""
+        if self._task is not None and not self._task.done():
+            self._wake.set()
+            await self._task
+    
+    async def _run(self) -> None:
+        """Wait out the debounce window, then rebuild the queued hazards."""
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wake.wait(), self.delay_seconds)
+        
+        # Hazards queued while an earlier one rebuilds are picked up here
+        while self._pending:
+            hazard_id = min(self._pending)
+            self._pending.discard(hazard_id)
+            try:
+                async with self.session_factory() as session:
+                    await AdvancedAnalyticsService(session).refresh_risk_hotspots([hazard_id])
+                    await session.commit()
+            except Exception:
+                # The previous ranking stays until the hazard's next write
+                logger.exception("Hotspot ranking rebuild failed for hazard %s", hazard_id)
+
+
+_hotspot_refresher: Optional[HotspotRefresher] = None
+
+
+def get_hotspot_refresher() -> HotspotRefresher:
+    """Get the process-wide hotspot refresher.
+    
+    Returns:
+        HotspotRefresher instance
+    """
+    global _hotspot_refresher
+    if _hotspot_refresher is None:
+        _hotspot_refresher = HotspotRefresher(
+            AsyncSessionLocal, settings.hotspot_refresh_delay_seconds
+        )
+    return _hotspot_refresher
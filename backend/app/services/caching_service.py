@@ -3,18 +3,39 @@ Caching service for frequently assessed locations.
 
 Implements Redis-based caching with TTL for risk assessments.
 """
-import json
-import hashlib
-from typing import Optional, Dict, Any
-from datetime import timedelta
 import asyncio
+import hashlib
+import struct
+from collections import OrderedDict
+from time import monotonic_ns
+from typing import Optional, Awaitable, Callable, Dict, Any, List, Sequence, Set, Tuple
 
+from app.core.config import settings
 from app.models import HazardType
 
 
 class CacheKey:
     """Helper for generating consistent cache keys."""
     
+    # Coordinates are keyed in units of 1e-4 degrees (~11m), which reduces
+    # cache fragmentation while staying precise enough to tell sites apart
+    COORDINATE_KEY_SCALE = 10_000
+    
+    @staticmethod
+    def quantize_coordinate(value: float) -> int:
+        """Quantize a latitude or longitude to an integer key bucket.
+        
+        Integer buckets format faster than rounded floats and have no -0.0
+        spelling that would split one bucket into two keys.
+        
+        Args:
+            value: Coordinate in degrees
+            
+        Returns:
+            Coordinate in units of 1 / COORDINATE_KEY_SCALE degrees
+        """
+        return round(value * CacheKey.COORDINATE_KEY_SCALE)
+    
     @staticmethod
     def risk_assessment(
         latitude: float,
@@ -26,7 +47,7 @@ class CacheKey:
         Generate cache key for risk assessment.
         
         Args:
-            latitude: Location latitude (rounded to 4 decimals ~11m precision)
+            latitude: Location latitude (quantized to ~11m precision)
             longitude: Location longitude
             hazard_types: List of hazard types being assessed
             risk_factors: Optional custom risk factors
@@ -34,61 +55,180 @@ class CacheKey:
         Returns:
             Cache key string
         """
-        # Round coordinates to reduce cache fragmentation
-        # 4 decimal places = ~11m precision, good balance
-        lat_rounded = round(latitude, 4)
-        lon_rounded = round(longitude, 4)
-        
-        # Sort hazard types for consistency
-        hazards_str = ",".join(sorted(h.value if hasattr(h, 'value') else str(h) for h in hazard_types))
+        # Sort hazard types for consistency. HazardType is a str enum, so its
+        # members sort and join as their values without per-item attribute access
+        hazards_str = ",".join(sorted(hazard_types))
         
-        # Include risk factors if provided
+        # Include risk factors if provided, as a short digest of the sorted
+        # (name, value) pairs packed to bytes rather than JSON-encoded
         factors_str = ""
         if risk_factors:
-            # Sort keys for consistency
-            sorted_factors = sorted(risk_factors.items())
-            factors_str = json.dumps(sorted_factors)
+            packed = b"".join(
+                name.encode() + struct.pack("<d", value)
+                for name, value in sorted(risk_factors.items())
+            )
+            factors_str = hashlib.blake2b(packed, digest_size=8).hexdigest()
         
-        # Generate key
+        # Generate key; the location prefix comes first so one location's
+        # entries can be dropped with delete_prefix()
         key_parts = [
-            f"risk_assessment",
-            f"lat:{lat_rounded}",
-            f"lon:{lon_rounded}",
             f"hazards:{hazards_str}",
             f"factors:{factors_str}" if factors_str else ""
         ]
         
         key = ":".join(part for part in key_parts if part)
-        return key
+        return f"{CacheKey.risk_assessment_prefix(latitude, longitude)}{key}"
+    
+    @staticmethod
+    def risk_assessment_prefix(latitude: float, longitude: float) -> str:
+        """Generate key prefix covering every cached assessment at a location."""
+        lat_q = CacheKey.quantize_coordinate(latitude)
+        lon_q = CacheKey.quantize_coordinate(longitude)
+        return f"risk_assessment:lat:{lat_q}:lon:{lon_q}:"
     
     @staticmethod
     def location_by_coords(latitude: float, longitude: float) -> str:
         """Generate cache key for location lookup by coordinates."""
-        lat_rounded = round(latitude, 4)
-        lon_rounded = round(longitude, 4)
-        return f"location:coords:{lat_rounded}:{lon_rounded}"
+        lat_q = CacheKey.quantize_coordinate(latitude)
+        lon_q = CacheKey.quantize_coordinate(longitude)
+        return f"location:coords:{lat_q}:{lon_q}"
+    
+    @staticmethod
+    def hazard(hazard_id: int) -> str:
+        """Generate cache key for hazard lookup by ID."""
+        return f"hazard:{hazard_id}"
+    
+    HAZARD_LIST_PREFIX = "geo:hazards:"
+    LOCATION_LIST_PREFIX = "geo:locations:"
+    TRENDS_PREFIX = "geo:trends:"
+    
+    @staticmethod
+    def hazard_list() -> str:
+        """Generate cache key for the serialized hazard list."""
+        return f"{CacheKey.HAZARD_LIST_PREFIX}all"
+    
+    @staticmethod
+    def location_list(skip: int, limit: int, cursor: Optional[int] = None) -> str:
+        """Generate cache key for one serialized page of locations."""
+        return f"{CacheKey.LOCATION_LIST_PREFIX}cursor:{cursor}:skip:{skip}:limit:{limit}"
+    
+    @staticmethod
+    def trends(location_id: int, hazard_id: int, years: int) -> str:
+        """Generate cache key for a location-hazard trend analysis."""
+        return f"{CacheKey.trends_prefix(location_id, hazard_id)}years:{years}"
+    
+    @staticmethod
+    def trends_prefix(location_id: int, hazard_id: Optional[int] = None) -> str:
+        """Generate key prefix covering a location's trends, optionally for one hazard."""
+        if hazard_id is None:
+            return f"{CacheKey.TRENDS_PREFIX}{location_id}:"
+        return f"{CacheKey.TRENDS_PREFIX}{location_id}:{hazard_id}:"
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent key access frequencies.
+    
+    Used as a TinyLFU admission filter: when the cache is full, a new key
+    only displaces the LRU victim if it has been requested more often
+    recently, so one-off keys from a scan cannot flush hot entries.
+    Counters saturate at 15 and are halved periodically so that popularity
+    decays over time.
+    """
+    
+    __slots__ = ("_rows", "_mask", "_additions", "_sample_size")
+    
+    # Odd 64-bit multipliers giving each row an independent index for a key
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _MAX_COUNT = 15
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize sketch.
+        
+        Args:
+            capacity: Number of entries of the cache being filtered
+        """
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self._rows = [bytearray(width) for _ in self._SEEDS]
+        self._mask = width - 1
+        self._additions = 0
+        self._sample_size = 10 * capacity
+    
+    def _indexes(self, key: str) -> List[int]:
+        """Map a key to one counter index per row."""
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return [(((h * seed) & 0xFFFFFFFFFFFFFFFF) >> 32) & self._mask for seed in self._SEEDS]
+    
+    def increment(self, key: str) -> None:
+        """Record one access to a key."""
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self._MAX_COUNT:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._rows = [bytearray(count >> 1 for count in row) for row in self._rows]
+            self._additions //= 2
+    
+    def estimate(self, key: str) -> int:
+        """Estimate how often a key was accessed recently."""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
 
 
 class InMemoryCache:
     """
     Simple in-memory LRU cache for risk assessments.
     
+    Instances are only used from the event loop and no method awaits, so each
+    call runs to completion without interleaving and needs no lock. The
+    methods stay coroutines so a networked backend can be swapped in.
+    
     For production, replace with Redis or Memcached.
     """
     
-    def __init__(self, max_size: int = 1000, default_ttl_seconds: int = 3600):
+    __slots__ = ("max_size", "default_ttl", "_cache", "_tags", "_sketch")
+    
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl_seconds: int = 3600,
+        admission_filter: bool = False
+    ):
         """
         Initialize cache.
         
         Args:
             max_size: Maximum number of cached items
             default_ttl_seconds: Default TTL for cached items (1 hour)
+            admission_filter: Admit new keys into a full cache only if they are
+                requested more often than the LRU victim (TinyLFU)
         """
         self.max_size = max_size
         self.default_ttl = default_ttl_seconds
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._access_order: list[str] = []  # LRU tracking
-        self._lock = asyncio.Lock()
+        # (expires_at_ns, value, tag) entries ordered least to most recently
+        # used; move_to_end/popitem keep LRU upkeep O(1)
+        self._cache: OrderedDict[str, Tuple[int, Dict[str, Any], Optional[str]]] = OrderedDict()
+        # Secondary index of keys per tag, so delete_tag() touches only its keys
+        self._tags: Dict[str, Set[str]] = {}
+        self._sketch = FrequencySketch(max_size) if admission_filter else None
+    
+    def _untag(self, key: str, tag: Optional[str]) -> None:
+        """Remove a key from its tag's index entry."""
+        if tag is None:
+            return
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+    
+    def _remove(self, key: str) -> None:
+        """Remove an item and its tag index entry, if present."""
+        cached_item = self._cache.pop(key, None)
+        if cached_item is not None:
+            self._untag(key, cached_item[2])
     
     async def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
@@ -100,33 +240,63 @@ class InMemoryCache:
         Returns:
             Cached value or None if not found/expired
         """
-        async with self._lock:
-            if key not in self._cache:
-                return None
-            
-            cached_item = self._cache[key]
-            
-            # Check if expired
-            import time
-            if time.time() > cached_item['expires_at']:
-                # Remove expired item
-                del self._cache[key]
-                if key in self._access_order:
-                    self._access_order.remove(key)
-                return None
-            
-            # Update access order (move to end)
-            if key in self._access_order:
-                self._access_order.remove(key)
-            self._access_order.append(key)
+        if self._sketch is not None:
+            self._sketch.increment(key)
+        
+        cached_item = self._cache.get(key)
+        if cached_item is None:
+            return None
+        
+        expires_at_ns, value, _ = cached_item
+        
+        # Check if expired
+        if monotonic_ns() > expires_at_ns:
+            # Remove expired item
+            self._remove(key)
+            return None
+        
+        # Mark as most recently used
+        self._cache.move_to_end(key)
+        
+        return value
+    
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get several items from cache in one call.
+        
+        The clock is read once for the whole batch and lookups run in a
+        single loop, instead of paying one coroutine call per key.
+        
+        Args:
+            keys: Cache keys
             
-            return cached_item['value']
+        Returns:
+            Cached values in key order, None where not found/expired
+        """
+        cache = self._cache
+        now = monotonic_ns()
+        values = []
+        if self._sketch is not None:
+            for key in keys:
+                self._sketch.increment(key)
+        for key in keys:
+            cached_item = cache.get(key)
+            if cached_item is None:
+                values.append(None)
+            elif now > cached_item[0]:
+                self._remove(key)
+                values.append(None)
+            else:
+                cache.move_to_end(key)
+                values.append(cached_item[1])
+        return values
     
     async def set(
         self,
         key: str,
         value: Dict[str, Any],
-        ttl_seconds: Optional[int] = None
+        ttl_seconds: Optional[int] = None,
+        tag: Optional[str] = None
     ) -> None:
         """
         Set item in cache.
@@ -135,44 +305,62 @@ class InMemoryCache:
             key: Cache key
             value: Value to cache (must be JSON-serializable)
             ttl_seconds: TTL in seconds (uses default if None)
+            tag: Optional group the item can later be dropped with via delete_tag()
         """
-        async with self._lock:
-            import time
-            
-            ttl = ttl_seconds or self.default_ttl
-            expires_at = time.time() + ttl
-            
-            # If cache is full, remove least recently used
-            if len(self._cache) >= self.max_size and key not in self._cache:
-                if self._access_order:
-                    lru_key = self._access_order.pop(0)
-                    del self._cache[lru_key]
-            
-            # Store item
-            self._cache[key] = {
-                'value': value,
-                'expires_at': expires_at,
-                'created_at': time.time()
-            }
-            
-            # Update access order
-            if key in self._access_order:
-                self._access_order.remove(key)
-            self._access_order.append(key)
+        ttl = ttl_seconds or self.default_ttl
+        
+        if key in self._cache:
+            self._untag(key, self._cache[key][2])
+        elif len(self._cache) >= self.max_size:
+            # If cache is full, remove least recently used, unless the
+            # admission filter rates the newcomer no more popular than it
+            if self._sketch is not None:
+                victim = next(iter(self._cache))
+                if self._sketch.estimate(key) <= self._sketch.estimate(victim):
+                    return
+            lru_key, (_, _, lru_tag) = self._cache.popitem(last=False)
+            self._untag(lru_key, lru_tag)
+        
+        # Store item
+        self._cache[key] = (monotonic_ns() + ttl * 1_000_000_000, value, tag)
+        self._cache.move_to_end(key)
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
     
     async def delete(self, key: str) -> None:
         """Delete item from cache."""
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-            if key in self._access_order:
-                self._access_order.remove(key)
+        self._remove(key)
+    
+    async def delete_prefix(self, prefix: str) -> None:
+        """Delete every item whose key starts with prefix."""
+        for key in [key for key in self._cache if key.startswith(prefix)]:
+            self._remove(key)
+    
+    async def delete_tag(self, tag: str) -> None:
+        """Delete every item stored with the given tag."""
+        for key in self._tags.pop(tag, ()):
+            del self._cache[key]
+    
+    async def purge_expired(self) -> int:
+        """
+        Remove every expired item.
+        
+        get() still checks expiry itself; this only frees entries that are
+        never read again instead of leaving them to age out through the LRU.
+        
+        Returns:
+            Number of items removed
+        """
+        now = monotonic_ns()
+        expired = [key for key, (expires_at_ns, _, _) in self._cache.items() if now > expires_at_ns]
+        for key in expired:
+            self._remove(key)
+        return len(expired)
     
     async def clear(self) -> None:
         """Clear all cached items."""
-        async with self._lock:
-            self._cache.clear()
-            self._access_order.clear()
+        self._cache.clear()
+        self._tags.clear()
     
     async def get_stats(self) -> Dict[str, Any]:
         """
@@ -181,22 +369,20 @@ class InMemoryCache:
         Returns:
             Dictionary with cache metrics
         """
-        async with self._lock:
-            import time
-            
-            # Count expired items
-            expired_count = sum(
-                1 for item in self._cache.values()
-                if time.time() > item['expires_at']
-            )
-            
-            return {
-                'size': len(self._cache),
-                'max_size': self.max_size,
-                'utilization': len(self._cache) / self.max_size,
-                'expired_count': expired_count,
-                'default_ttl_seconds': self.default_ttl
-            }
+        # Count expired items
+        now = monotonic_ns()
+        expired_count = sum(
+            1 for expires_at_ns, _, _ in self._cache.values()
+            if now > expires_at_ns
+        )
+        
+        return {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'utilization': len(self._cache) / self.max_size,
+            'expired_count': expired_count,
+            'default_ttl_seconds': self.default_ttl
+        }
 
 
 class CachingService:
@@ -204,6 +390,8 @@ class CachingService:
     Service for caching risk assessments with invalidation strategy.
     """
     
+    __slots__ = ("cache", "hit_count", "miss_count", "_inflight")
+    
     def __init__(self, cache: Optional[InMemoryCache] = None):
         """
         Initialize caching service.
@@ -214,6 +402,8 @@ class CachingService:
         self.cache = cache or InMemoryCache()
         self.hit_count = 0
         self.miss_count = 0
+        # Computations in progress per cache key, shared by concurrent misses
+        self._inflight: Dict[str, asyncio.Task] = {}
     
     async def get_risk_assessment(
         self,
@@ -244,6 +434,33 @@ class CachingService:
         
         return result
     
+    async def get_risk_assessments(
+        self,
+        points: Sequence[Tuple[float, float, list[HazardType]]],
+        risk_factors: Optional[Dict[str, float]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get cached risk assessments for several points in one lookup.
+        
+        Args:
+            points: (latitude, longitude, hazard_types) for each point
+            risk_factors: Optional custom risk factors shared by all points
+            
+        Returns:
+            Cached assessment or None for each point, in order
+        """
+        keys = [
+            CacheKey.risk_assessment(latitude, longitude, hazard_types, risk_factors)
+            for latitude, longitude, hazard_types in points
+        ]
+        results = await self.cache.get_many(keys)
+        
+        hits = sum(1 for result in results if result)
+        self.hit_count += hits
+        self.miss_count += len(results) - hits
+        
+        return results
+    
     async def set_risk_assessment(
         self,
         latitude: float,
@@ -265,7 +482,70 @@ class CachingService:
             ttl_seconds: Cache TTL (default 1 hour)
         """
         key = CacheKey.risk_assessment(latitude, longitude, hazard_types, risk_factors)
-        await self.cache.set(key, assessment_result, ttl_seconds)
+        # Tagged by location so invalidate_location() skips a full key scan
+        await self.cache.set(
+            key,
+            assessment_result,
+            ttl_seconds,
+            tag=CacheKey.risk_assessment_prefix(latitude, longitude)
+        )
+    
+    async def get_or_compute_risk_assessment(
+        self,
+        latitude: float,
+        longitude: float,
+        hazard_types: list[HazardType],
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        risk_factors: Optional[Dict[str, float]] = None,
+        ttl_seconds: int = 3600
+    ) -> Dict[str, Any]:
+        """
+        Get a cached risk assessment, computing and caching it on a miss.
+        
+        Concurrent misses for the same key share a single computation: the
+        first caller starts it and later callers await the same task, so a
+        cold or just-expired hot key is assessed once rather than N times.
+        
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+            hazard_types: Hazard types to assess
+            compute: Coroutine function producing the assessment on a miss
+            risk_factors: Optional custom risk factors
+            ttl_seconds: Cache TTL (default 1 hour)
+            
+        Returns:
+            Cached or freshly computed assessment
+        """
+        key = CacheKey.risk_assessment(latitude, longitude, hazard_types, risk_factors)
+        result = await self.cache.get(key)
+        if result:
+            self.hit_count += 1
+            return result
+        
+        self.miss_count += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_and_cache(
+                key, CacheKey.risk_assessment_prefix(latitude, longitude), compute, ttl_seconds
+            ))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shielded so one cancelled caller does not cancel the shared computation
+        return await asyncio.shield(task)
+    
+    async def _compute_and_cache(
+        self,
+        key: str,
+        tag: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl_seconds: int
+    ) -> Dict[str, Any]:
+        """Run a shared computation and cache its result."""
+        result = await compute()
+        await self.cache.set(key, result, ttl_seconds, tag=tag)
+        return result
     
     async def invalidate_location(self, latitude: float, longitude: float) -> None:
         """
@@ -277,10 +557,7 @@ class CachingService:
             latitude: Location latitude
             longitude: Location longitude
         """
-        # In production with Redis, use key pattern matching
-        # For now, just note that this location's cache should be invalidated
-        # The TTL will handle cleanup
-        pass
+        await self.cache.delete_tag(CacheKey.risk_assessment_prefix(latitude, longitude))
     
     async def get_stats(self) -> Dict[str, Any]:
         """
@@ -308,8 +585,11 @@ class CachingService:
         self.miss_count = 0
 
 
-# Global cache instance
+# Global cache instances
 _cache_service: Optional[CachingService] = None
+_hazard_cache: Optional[InMemoryCache] = None
+_response_cache: Optional[InMemoryCache] = None
+_trend_cache: Optional[InMemoryCache] = None
 
 
 def get_cache_service() -> CachingService:
@@ -323,3 +603,96 @@ def get_cache_service() -> CachingService:
     if _cache_service is None:
         _cache_service = CachingService()
     return _cache_service
+
+
+def get_hazard_cache() -> InMemoryCache:
+    """
+    Get global hazard lookup cache.
+    
+    Hazards are a tiny, near-static dimension table, so lookups by ID are
+    cached for a few minutes. Entries are shared by every request, so only
+    immutable values (column rows, not ORM instances) may be stored.
+    
+    The cache is per process. Only found hazards are cached, so a hazard
+    created on another worker is visible at once; the API never updates or
+    deletes hazards, and the TTL bounds how long any out-of-band change to
+    an existing row can be served stale by other workers.
+    
+    Returns:
+        InMemoryCache instance
+    """
+    global _hazard_cache
+    if _hazard_cache is None:
+        _hazard_cache = InMemoryCache(max_size=100, default_ttl_seconds=300)
+    return _hazard_cache
+
+
+def get_response_cache() -> InMemoryCache:
+    """
+    Get global cache of serialized list responses.
+    
+    Holds the JSON bytes of GET /hazards and GET /locations pages so repeat
+    reads skip both the query and Pydantic serialization. Write endpoints
+    drop the affected namespace via delete_prefix().
+    
+    The cache lives in each worker process and delete_prefix() only reaches
+    the worker that handled the write. Exact read-after-write holds with a
+    single worker; with several, other workers can serve the previous list
+    for up to settings.response_cache_ttl_seconds, so keep that TTL short.
+    
+    Returns:
+        InMemoryCache instance
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = InMemoryCache(
+            max_size=256, default_ttl_seconds=settings.response_cache_ttl_seconds
+        )
+    return _response_cache
+
+
+def get_trend_cache() -> InMemoryCache:
+    """
+    Get global cache of historical trend analyses.
+    
+    Trends only change when historical events are recorded, so results are
+    kept per (location, hazard, years). Writers of historical data drop the
+    pair via delete_prefix(CacheKey.trends_prefix()). Location comparisons
+    sweep many pairs at once, so the admission filter keeps such one-off
+    scans from displacing frequently viewed trends.
+    
+    As with the response cache, invalidation only reaches the worker that
+    handled the write; other workers can serve trends that miss new or
+    deleted history for up to settings.trend_cache_ttl_seconds.
+    
+    Returns:
+        InMemoryCache instance
+    """
+    global _trend_cache
+    if _trend_cache is None:
+        _trend_cache = InMemoryCache(
+            max_size=4096,
+            default_ttl_seconds=settings.trend_cache_ttl_seconds,
+            admission_filter=True
+        )
+    return _trend_cache
+
+
+async def reap_expired_cache_entries(interval_seconds: float) -> None:
+    """
+    Periodically purge expired entries from the global caches.
+    
+    Runs until cancelled; the application lifespan starts it on startup and
+    cancels it on shutdown.
+    
+    Args:
+        interval_seconds: Delay between sweeps
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        caches = [_hazard_cache, _response_cache, _trend_cache]
+        if _cache_service is not None:
+            caches.append(_cache_service.cache)
+        for cache in caches:
+            if cache is not None:
+                await cache.purge_expired()
@@ -1,19 +1,105 @@
 """Data export service for generating CSV reports and batch processing."""
+import asyncio
 import csv
 import io
+from statistics import fmean
 from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
 from datetime import datetime, date
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, Select, select, insert, and_, or_, func, text, bindparam
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # Optional accelerator; the csv module is used without it
+    pa = None
+    pa_csv = None
 
 from app.models import (
     Location, RiskAssessment, Hazard, HistoricalData, 
-    HazardType, RiskLevel
+    HazardType, RiskLevel, HOT_RISK_LEVEL_PREDICATE, location_bounds_conditions,
+    risk_level_for_score
 )
+from app.services.analytics_service import get_hotspot_refresher
+from app.services.caching_service import CacheKey, get_response_cache
 from app.services.risk_engine import RiskEngine
 
 
+# Lower-cased hazard names accepted by normalize_hazard_types, including aliases
+_HAZARD_TYPE_NAMES = {
+    **{hazard_type.value: hazard_type for hazard_type in HazardType},
+    'wildfire': HazardType.FIRE,
+    'hurricane': HazardType.STORM,
+    'tornado': HazardType.STORM,
+    'cyclone': HazardType.STORM
+}
+
+_DEFAULT_HAZARD_TYPES = (HazardType.EARTHQUAKE, HazardType.FLOOD, HazardType.FIRE, HazardType.STORM)
+
+
+def _render_rows_to_csv(
+    columns: List[str],
+    rows: List[Tuple[Any, ...]],
+    include_header: bool = True
+) -> str:
+    """Serialize row tuples to CSV text.
+    
+    Pure CPU work with no database or ORM access, so callers can run it in a
+    worker thread instead of on the event loop.
+    
+    Args:
+        columns: CSV column names, in output order
+        rows: Row tuples with values in column order
+        include_header: Whether to write the header line first
+        
+    Returns:
+        CSV text
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    if include_header:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    
+    return output.getvalue()
+
+
+def _render_risk_report_csv(
+    rows: List[Tuple[Any, ...]],
+    include_header: bool = True
+) -> str:
+    """Serialize risk report rows to CSV text.
+    
+    Uses Arrow's native CSV writer when pyarrow is installed and falls back to
+    the csv module otherwise. Like _render_rows_to_csv, this is safe to run in
+    a worker thread.
+    
+    Args:
+        rows: Row tuples in ExportService.RISK_REPORT_COLUMNS order
+        include_header: Whether to write the header line first
+        
+    Returns:
+        CSV text
+    """
+    if pa is None:
+        return _render_rows_to_csv(ExportService.RISK_REPORT_COLUMNS, rows, include_header)
+    
+    columns = list(zip(*rows)) if rows else [()] * len(_RISK_REPORT_SCHEMA)
+    table = pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, _RISK_REPORT_SCHEMA)],
+        schema=_RISK_REPORT_SCHEMA
+    )
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(
+        table,
+        sink,
+        write_options=pa_csv.WriteOptions(include_header=include_header, quoting_style='needed')
+    )
+    
+    return sink.getvalue().to_pybytes().decode('utf-8')
+
+
 class DataTransformationPipeline:
     """Pipeline for transforming raw geographic data into risk assessment inputs."""
     
@@ -23,6 +109,10 @@ class DataTransformationPipeline:
     ) -> List[Dict[str, float]]:
         """Transform raw coordinate data into standardized format.
         
+        Each output dictionary holds exactly the Location column values
+        (name, coordinates and risk factors), so it can be passed straight
+        to a Location insert.
+        
         Args:
             raw_coords: List of dictionaries with coordinate data
             
@@ -41,16 +131,14 @@ class DataTransformationPipeline:
                 lat = float(coord.get('lat') or coord.get('latitude') or coord.get('y'))
                 lon = float(coord.get('lon') or coord.get('longitude') or coord.get('x'))
                 
-                # Validate ranges
-                if not (-90 <= lat <= 90):
-                    raise ValueError(f"Latitude {lat} out of range [-90, 90]")
-                if not (-180 <= lon <= 180):
-                    raise ValueError(f"Longitude {lon} out of range [-180, 180]")
+                # Skip out-of-range coordinates
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                    continue
                 
                 transformed.append({
                     'latitude': lat,
                     'longitude': lon,
-                    'name': coord.get('name', f"Location_{lat}_{lon}"),
+                    'name': coord['name'] if 'name' in coord else f"Location_{lat}_{lon}",
                     'population_density': float(coord.get('population_density', 0)),
                     'building_code_rating': float(coord.get('building_code_rating', 5.0)),
                     'infrastructure_quality': float(coord.get('infrastructure_quality', 5.0))
@@ -101,19 +189,13 @@ class DataTransformationPipeline:
         Returns:
             List of HazardType enum values
         """
-        normalized = []
-        valid_types = {ht.value: ht for ht in HazardType}
-        
-        for hazard_str in hazard_input:
-            hazard_lower = hazard_str.lower().strip()
-            if hazard_lower in valid_types:
-                normalized.append(valid_types[hazard_lower])
-            elif hazard_lower == 'wildfire':
-                normalized.append(HazardType.FIRE)
-            elif hazard_lower in ['hurricane', 'tornado', 'cyclone']:
-                normalized.append(HazardType.STORM)
-                
-        return normalized or [HazardType.EARTHQUAKE, HazardType.FLOOD, HazardType.FIRE, HazardType.STORM]
+        normalized = [
+            _HAZARD_TYPE_NAMES[name]
+            for name in (hazard_str.lower().strip() for hazard_str in hazard_input)
+            if name in _HAZARD_TYPE_NAMES
+        ]
+        
+        return normalized or list(_DEFAULT_HAZARD_TYPES)
 
 
 class ExportService:
@@ -137,7 +219,29 @@ class ExportService:
         'recommendations'
     ]
     
+    # Report query columns, labelled with RISK_REPORT_COLUMNS in the same order
+    _RISK_REPORT_SELECT = (
+        RiskAssessment.id.label('assessment_id'),
+        RiskAssessment.location_id,
+        Location.name.label('location_name'),
+        Location.latitude,
+        Location.longitude,
+        Hazard.hazard_type,
+        RiskAssessment.risk_score,
+        RiskAssessment.risk_level,
+        RiskAssessment.confidence_level,
+        Location.population_density,
+        Location.building_code_rating,
+        Location.infrastructure_quality,
+        RiskAssessment.assessed_at,
+        RiskAssessment.recommendations
+    )
+    
     BATCH_SIZE = 500  # Number of records to process at once for memory efficiency
+    STREAM_FLUSH_BYTES = 64 * 1024  # CSV text buffered before a streamed chunk is yielded
+    
+    # Levels covered by the idx_risk_assessments_hot partial index
+    HOT_RISK_LEVELS = frozenset({RiskLevel.HIGH, RiskLevel.CRITICAL})
     
     def __init__(self, db: AsyncSession):
         """Initialize export service.
@@ -173,61 +277,18 @@ class ExportService:
         Returns:
             CSV string with risk assessment data
         """
-        # Build query with filters
-        query = (
-            select(RiskAssessment)
-            .options(
-                selectinload(RiskAssessment.location),
-                selectinload(RiskAssessment.hazard)
-            )
-        )
-        
-        filters = []
-        
-        if start_date:
-            filters.append(RiskAssessment.assessed_at >= start_date)
-        if end_date:
-            filters.append(RiskAssessment.assessed_at <= end_date)
-        if min_risk_score is not None:
-            filters.append(RiskAssessment.risk_score >= min_risk_score)
-        if risk_levels:
-            filters.append(RiskAssessment.risk_level.in_(risk_levels))
-        if location_ids:
-            filters.append(RiskAssessment.location_id.in_(location_ids))
-            
-        if filters:
-            query = query.where(and_(*filters))
-        
-        # Join with Location for geographic filtering
-        if location_bounds:
-            query = query.join(Location).where(
-                and_(
-                    Location.latitude >= location_bounds.get('min_lat', -90),
-                    Location.latitude <= location_bounds.get('max_lat', 90),
-                    Location.longitude >= location_bounds.get('min_lon', -180),
-                    Location.longitude <= location_bounds.get('max_lon', 180)
-                )
-            )
-        
-        # Join with Hazard for hazard type filtering
-        if hazard_types:
-            query = query.join(Hazard).where(Hazard.hazard_type.in_(hazard_types))
-        
-        query = query.order_by(RiskAssessment.assessed_at.desc())
+        query = self._risk_report_query(
+            start_date, end_date, location_bounds, hazard_types,
+            min_risk_score, risk_levels, location_ids
+        ).order_by(RiskAssessment.assessed_at.desc())
         
         # Execute query
         result = await self.db.execute(query)
-        assessments = result.scalars().all()
-        
-        # Generate CSV
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=self.RISK_REPORT_COLUMNS)
-        writer.writeheader()
         
-        for assessment in assessments:
-            writer.writerow(self._assessment_to_csv_row(assessment))
+        # Rows are formatted on the loop; encoding runs in a thread
+        rows = list(map(self._report_row_to_csv_row, result))
         
-        return output.getvalue()
+        return await asyncio.to_thread(_render_risk_report_csv, rows)
     
     async def stream_risk_report_csv(
         self,
@@ -241,7 +302,8 @@ class ExportService:
     ) -> AsyncGenerator[str, None]:
         """Stream CSV report in chunks for large datasets.
         
-        This method uses pagination to handle datasets exceeding memory limits.
+        Assessments are read in keyset-paged batches of BATCH_SIZE so
+        datasets larger than memory are never materialized.
         It yields CSV data in batches for streaming responses.
         
         Args:
@@ -250,76 +312,46 @@ class ExportService:
         Yields:
             CSV chunks as strings
         """
-        # Build base query
-        query = (
-            select(RiskAssessment)
-            .options(
-                selectinload(RiskAssessment.location),
-                selectinload(RiskAssessment.hazard)
-            )
-        )
-        
-        filters = []
-        
-        if start_date:
-            filters.append(RiskAssessment.assessed_at >= start_date)
-        if end_date:
-            filters.append(RiskAssessment.assessed_at <= end_date)
-        if min_risk_score is not None:
-            filters.append(RiskAssessment.risk_score >= min_risk_score)
-        if risk_levels:
-            filters.append(RiskAssessment.risk_level.in_(risk_levels))
-        if location_ids:
-            filters.append(RiskAssessment.location_id.in_(location_ids))
-            
-        if filters:
-            query = query.where(and_(*filters))
-        
-        if location_bounds:
-            query = query.join(Location).where(
-                and_(
-                    Location.latitude >= location_bounds.get('min_lat', -90),
-                    Location.latitude <= location_bounds.get('max_lat', 90),
-                    Location.longitude >= location_bounds.get('min_lon', -180),
-                    Location.longitude <= location_bounds.get('max_lon', 180)
-                )
-            )
-        
-        if hazard_types:
-            query = query.join(Hazard).where(Hazard.hazard_type.in_(hazard_types))
-        
-        query = query.order_by(RiskAssessment.id)
+        query = self._risk_report_query(
+            start_date, end_date, location_bounds, hazard_types,
+            min_risk_score, risk_levels, location_ids
+        ).order_by(RiskAssessment.id)
         
         # Yield header first
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=self.RISK_REPORT_COLUMNS)
-        writer.writeheader()
-        yield output.getvalue()
-        
-        # Stream data in batches
-        offset = 0
+        yield await asyncio.to_thread(_render_risk_report_csv, [])
+        
+        # Batches are keyset-paged on id, so each row is scanned once (OFFSET
+        # paging rescans every skipped row per batch). Encoded batches go into
+        # one reused buffer that is drained once it holds STREAM_FLUSH_BYTES,
+        # so narrow rows produce a few large chunks and memory stays O(chunk).
+        # The batch statement is built once with the keyset as a bound
+        # parameter, so every batch reuses the same cached compiled SQL
+        batch_query = query.where(RiskAssessment.id > bindparam('last_id')).limit(self.BATCH_SIZE)
+        buffer = io.StringIO()
+        last_id = 0
         while True:
-            batch_query = query.limit(self.BATCH_SIZE).offset(offset)
-            result = await self.db.execute(batch_query)
-            batch = result.scalars().all()
+            result = await self.db.execute(batch_query, {'last_id': last_id})
+            batch = result.all()
             
             if not batch:
                 break
             
-            # Generate CSV for this batch
-            batch_output = io.StringIO()
-            batch_writer = csv.DictWriter(batch_output, fieldnames=self.RISK_REPORT_COLUMNS)
-            
-            for assessment in batch:
-                batch_writer.writerow(self._assessment_to_csv_row(assessment))
+            rows = list(map(self._report_row_to_csv_row, batch))
+            buffer.write(await asyncio.to_thread(_render_risk_report_csv, rows, False))
             
-            yield batch_output.getvalue()
+            if buffer.tell() >= self.STREAM_FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
             
-            offset += self.BATCH_SIZE
+            last_id = batch[-1].assessment_id
             
             # Stop if batch was smaller than BATCH_SIZE (last batch)
             if len(batch) < self.BATCH_SIZE:
                 break
+        
+        if buffer.tell():
+            yield buffer.getvalue()
     
     async def batch_process_locations(
         self,
@@ -345,54 +377,53 @@ class ExportService:
         
         # Default to all hazard types if not specified
         if not hazard_types:
-            hazard_types = [HazardType.EARTHQUAKE, HazardType.FLOOD, HazardType.FIRE, HazardType.STORM]
+            hazard_types = list(_DEFAULT_HAZARD_TYPES)
         
         # Get or create hazards
         hazards_query = select(Hazard).where(Hazard.hazard_type.in_(hazard_types))
         result = await self.db.execute(hazards_query)
         hazards = {h.hazard_type: h for h in result.scalars().all()}
         
+        # Hazard base scores are resolved once for the run; per location only
+        # the location factors are computed, then added to each base score
+        assessed_hazards = [
+            (hazard_type, hazards[hazard_type].id, hazards[hazard_type].base_severity * 10)
+            for hazard_type in hazard_types
+            if hazard_type in hazards
+        ]
+        
         results = []
         
-        # Process in batches to avoid memory issues
+        # Process in batches to avoid memory issues; each batch is written with
+        # multi-row INSERTs and the whole run is committed once
         for i in range(0, len(transformed), self.BATCH_SIZE):
             batch = transformed[i:i + self.BATCH_SIZE]
             
-            for loc_data in batch:
-                # Create or get location
-                location = Location(
-                    name=loc_data['name'],
-                    latitude=loc_data['latitude'],
-                    longitude=loc_data['longitude'],
-                    population_density=loc_data['population_density'],
-                    building_code_rating=loc_data['building_code_rating'],
-                    infrastructure_quality=loc_data['infrastructure_quality']
-                )
-                
-                if save_to_db:
-                    self.db.add(location)
-                    await self.db.flush()  # Get ID without committing
+            location_rows = []
+            assessment_rows = []
+            batch_results = []
+            
+            # Transformed dicts are already Location column values and are
+            # inserted as-is
+            for location_row in batch:
+                location_rows.append(location_row)
                 
                 # Assess risk for each hazard type
                 location_results = {
                     'location': {
-                        'name': location.name,
-                        'latitude': location.latitude,
-                        'longitude': location.longitude,
-                        'id': location.id if save_to_db else None
+                        'name': location_row['name'],
+                        'latitude': location_row['latitude'],
+                        'longitude': location_row['longitude'],
+                        'id': None
                     },
                     'assessments': []
                 }
                 
-                for hazard_type in hazard_types:
-                    hazard = hazards.get(hazard_type)
-                    if not hazard:
-                        continue
-                    
-                    # Calculate risk using engine
-                    risk_score, risk_level, confidence = await self._calculate_risk_for_location(
-                        location, hazard
-                    )
+                location_score, confidence = self._location_risk_factors(location_row)
+                
+                for hazard_type, hazard_id, base_score in assessed_hazards:
+                    risk_score = min(max(base_score + location_score, 0), 100)  # Clamp to 0-100
+                    risk_level = self._determine_risk_level(risk_score)
                     
                     assessment_data = {
                         'hazard_type': hazard_type.value,
@@ -402,29 +433,38 @@ class ExportService:
                     }
                     
                     if save_to_db:
-                        assessment = RiskAssessment(
-                            location_id=location.id,
-                            hazard_id=hazard.id,
-                            risk_score=risk_score,
-                            risk_level=risk_level,
-                            confidence_level=confidence,
-                            assessed_at=datetime.utcnow()
-                        )
-                        self.db.add(assessment)
-                        assessment_data['id'] = assessment.id
+                        assessment_rows.append((
+                            len(location_rows) - 1,
+                            {
+                                'hazard_id': hazard_id,
+                                'risk_score': risk_score,
+                                'risk_level': risk_level,
+                                'confidence_level': confidence
+                            },
+                            assessment_data
+                        ))
                     
                     location_results['assessments'].append(assessment_data)
                 
                 # Calculate overall risk
                 if location_results['assessments']:
-                    avg_score = sum(a['risk_score'] for a in location_results['assessments']) / len(location_results['assessments'])
+                    avg_score = fmean(a['risk_score'] for a in location_results['assessments'])
                     location_results['overall_risk_score'] = round(avg_score, 2)
                     location_results['overall_risk_level'] = self._determine_risk_level(avg_score).value
                 
-                results.append(location_results)
+                batch_results.append(location_results)
             
             if save_to_db:
-                await self.db.commit()
+                await self._insert_batch(location_rows, assessment_rows, batch_results)
+            
+            results.extend(batch_results)
+        
+        if save_to_db:
+            await self.db.commit()
+            get_hotspot_refresher().schedule(
+                hazards[h].id for h in hazard_types if h in hazards
+            )
+            await get_response_cache().delete_prefix(CacheKey.LOCATION_LIST_PREFIX)
         
         return results
     
@@ -474,98 +514,217 @@ class ExportService:
             'economic_damage', 'impact_description'
         ]
         
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=columns)
-        writer.writeheader()
-        
-        for event in events:
-            writer.writerow({
-                'event_id': event.id,
-                'event_date': event.event_date.isoformat(),
-                'severity': event.severity,
-                'casualties': event.casualties or 0,
-                'economic_damage': event.economic_damage or 0.0,
-                'impact_description': event.impact_description or ''
-            })
-        
-        return output.getvalue()
+        rows = [
+            (
+                event.id,
+                event.event_date.isoformat(),
+                event.severity,
+                event.casualties or 0,
+                event.economic_damage or 0.0,
+                event.impact_description or ''
+            )
+            for event in events
+        ]
+        
+        return await asyncio.to_thread(_render_rows_to_csv, columns, rows)
     
-    async def _calculate_risk_for_location(
+    def _risk_report_query(
         self,
-        location: Location,
-        hazard: Hazard
-    ) -> Tuple[float, RiskLevel, float]:
-        """Calculate risk score for a location-hazard pair.
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        location_bounds: Optional[Dict[str, float]],
+        hazard_types: Optional[List[HazardType]],
+        min_risk_score: Optional[float],
+        risk_levels: Optional[List[RiskLevel]],
+        location_ids: Optional[List[int]]
+    ) -> Select:
+        """Build the filtered risk report query shared by both CSV exporters.
+        
+        The report columns are selected directly from one join of
+        assessments, locations and hazards, so each batch is a single
+        statement returning plain rows with no ORM instances, identity-map
+        entries or relationship population. The bounds and hazard type
+        filters reuse the same joins.
         
         Args:
-            location: Location object
-            hazard: Hazard object
+            Same as generate_risk_report_csv
             
         Returns:
-            Tuple of (risk_score, risk_level, confidence)
+            Unordered select of the report columns
         """
-        # Simplified risk calculation for export service
-        # Uses location characteristics and hazard severity
+        query = (
+            select(*self._RISK_REPORT_SELECT)
+            .select_from(RiskAssessment)
+            .join(RiskAssessment.location)
+            .join(RiskAssessment.hazard)
+        )
         
-        base_score = hazard.base_severity * 10  # Scale to 0-100
+        filters = []
         
-        # Adjust based on location factors
-        pop_factor = min(location.population_density / 10000, 1.0) * 15
-        building_factor = (10 - location.building_code_rating) * 5  # Inverse relationship
-        infra_factor = (10 - location.infrastructure_quality) * 3  # Inverse relationship
+        if start_date:
+            filters.append(RiskAssessment.assessed_at >= start_date)
+        if end_date:
+            filters.append(RiskAssessment.assessed_at <= end_date)
+        if min_risk_score is not None:
+            filters.append(RiskAssessment.risk_score >= min_risk_score)
+        if risk_levels:
+            filters.extend(self._risk_level_filters(risk_levels))
+        if location_ids:
+            filters.append(RiskAssessment.location_id.in_(location_ids))
+        if location_bounds:
+            filters.extend(self._location_bounds_conditions(location_bounds))
+        if hazard_types:
+            filters.append(Hazard.hazard_type.in_(hazard_types))
+        
+        if filters:
+            query = query.where(and_(*filters))
+        
+        return query
+    
+    def _risk_level_filters(self, risk_levels: List[RiskLevel]) -> List[Any]:
+        """Build WHERE clauses for a risk level filter.
+        
+        When only high/critical levels are requested, the partial index
+        predicate is added verbatim so the planner can use idx_risk_assessments_hot.
+        
+        Args:
+            risk_levels: Requested risk levels
+            
+        Returns:
+            List of SQLAlchemy filter clauses
+        """
+        filters = [RiskAssessment.risk_level.in_(risk_levels)]
+        
+        if set(risk_levels) <= self.HOT_RISK_LEVELS:
+            filters.append(text(HOT_RISK_LEVEL_PREDICATE))
+        
+        return filters
+    
+    def _location_bounds_conditions(self, location_bounds: Dict[str, float]) -> List[Any]:
+        """Build WHERE clauses for a location bounding-box filter.
+        
+        Missing bounds default to the full coordinate range. The clauses
+        include the spatial-index prune for the session's dialect.
+        
+        Args:
+            location_bounds: Bounds keyed by min_lat, max_lat, min_lon, max_lon
+            
+        Returns:
+            List of SQLAlchemy filter clauses
+        """
+        return location_bounds_conditions(
+            self.db.get_bind().dialect.name,
+            location_bounds.get('min_lat', -90),
+            location_bounds.get('max_lat', 90),
+            location_bounds.get('min_lon', -180),
+            location_bounds.get('max_lon', 180)
+        )
+    
+    async def _insert_batch(
+        self,
+        location_rows: List[Dict[str, Any]],
+        assessment_rows: List[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+        batch_results: List[Dict[str, Any]]
+    ) -> None:
+        """Insert a batch of locations and their assessments with executemany.
+        
+        Generated IDs are written back into the matching result dictionaries.
+        
+        Args:
+            location_rows: Column values for each new location
+            assessment_rows: Tuples of (location row index, column values, result dict)
+            batch_results: Per-location result dictionaries, aligned with location_rows
+        """
+        result = await self.db.execute(
+            insert(Location).returning(Location.id, sort_by_parameter_order=True),
+            location_rows
+        )
+        location_ids = result.scalars().all()
+        
+        for location_results, location_id in zip(batch_results, location_ids):
+            location_results['location']['id'] = location_id
         
-        # Calculate final score
-        risk_score = base_score + pop_factor + building_factor + infra_factor
-        risk_score = min(max(risk_score, 0), 100)  # Clamp to 0-100
+        if not assessment_rows:
+            return
+        
+        result = await self.db.execute(
+            insert(RiskAssessment).returning(RiskAssessment.id, sort_by_parameter_order=True),
+            [
+                {**values, 'location_id': location_ids[index]}
+                for index, values, _ in assessment_rows
+            ]
+        )
+        
+        for (_, _, assessment_data), assessment_id in zip(assessment_rows, result.scalars().all()):
+            assessment_data['id'] = assessment_id
+    
+    @staticmethod
+    def _location_risk_factors(location_row: Dict[str, Any]) -> Tuple[float, float]:
+        """Calculate the hazard-independent part of a location's risk.
+        
+        Simplified risk calculation for the export service: a location's
+        score for a hazard is the hazard's base score (base_severity * 10)
+        plus this adjustment, clamped to 0-100. Neither term depends on the
+        other, so the adjustment and confidence are computed once per
+        location rather than once per location-hazard pair.
+        
+        Args:
+            location_row: Location column values
+            
+        Returns:
+            Tuple of (location score adjustment, confidence)
+        """
+        population_density = location_row['population_density']
+        building_code_rating = location_row['building_code_rating']
+        
+        # Adjust based on location factors
+        pop_factor = min(population_density / 10000, 1.0) * 15
+        building_factor = (10 - building_code_rating) * 5  # Inverse relationship
+        infra_factor = (10 - location_row['infrastructure_quality']) * 3  # Inverse relationship
         
         # Base confidence on data availability
         confidence = 0.7
-        if location.population_density > 0:
+        if population_density > 0:
             confidence += 0.1
-        if location.building_code_rating != 5.0:  # Non-default value
+        if building_code_rating != 5.0:  # Non-default value
             confidence += 0.1
         confidence = min(confidence, 1.0)
         
-        risk_level = self._determine_risk_level(risk_score)
-        
-        return risk_score, risk_level, confidence
+        return pop_factor + building_factor + infra_factor, confidence
     
-    def _assessment_to_csv_row(self, assessment: RiskAssessment) -> Dict[str, Any]:
-        """Convert risk assessment to CSV row dictionary.
+    def _report_row_to_csv_row(self, row: Row) -> Tuple[Any, ...]:
+        """Convert a risk report query row to a CSV row tuple.
         
         Args:
-            assessment: RiskAssessment object with loaded relationships
+            row: Row selected by _risk_report_query
             
         Returns:
-            Dictionary with CSV row data
+            Tuple of CSV values in RISK_REPORT_COLUMNS order
         """
-        location = assessment.location
-        hazard = assessment.hazard
-        
         # Format recommendations
         recommendations = ''
-        if assessment.recommendations:
-            if isinstance(assessment.recommendations, list):
-                recommendations = '; '.join(assessment.recommendations)
+        if row.recommendations:
+            if isinstance(row.recommendations, list):
+                recommendations = '; '.join(row.recommendations)
             else:
-                recommendations = str(assessment.recommendations)
-        
-        return {
-            'assessment_id': assessment.id,
-            'location_id': location.id,
-            'location_name': location.name,
-            'latitude': location.latitude,
-            'longitude': location.longitude,
-            'hazard_type': hazard.hazard_type.value,
-            'risk_score': round(assessment.risk_score, 2),
-            'risk_level': assessment.risk_level.value,
-            'confidence_level': round(assessment.confidence_level, 2),
-            'population_density': location.population_density,
-            'building_code_rating': location.building_code_rating,
-            'infrastructure_quality': location.infrastructure_quality,
-            'assessed_at': assessment.assessed_at.isoformat(),
-            'recommendations': recommendations
-        }
+                recommendations = str(row.recommendations)
+        
+        return (
+            row.assessment_id,
+            row.location_id,
+            row.location_name,
+            row.latitude,
+            row.longitude,
+            row.hazard_type.value,
+            round(row.risk_score, 2),
+            row.risk_level.value,
+            round(row.confidence_level, 2),
+            row.population_density,
+            row.building_code_rating,
+            row.infrastructure_quality,
+            row.assessed_at.isoformat(),
+            recommendations
+        )
     
     @staticmethod
     def _determine_risk_level(risk_score: float) -> RiskLevel:
@@ -577,11 +736,25 @@ class ExportService:
         Returns:
             RiskLevel enum value
         """
-        if risk_score < 25:
-            return RiskLevel.LOW
-        elif risk_score < 50:
-            return RiskLevel.MODERATE
-        elif risk_score < 75:
-            return RiskLevel.HIGH
-        else:
-            return RiskLevel.CRITICAL
+        return risk_level_for_score(risk_score)
+
+
+# Fixed Arrow schema for risk report batches, so encoding skips type inference
+_RISK_REPORT_SCHEMA = None
+if pa is not None:
+    _RISK_REPORT_SCHEMA = pa.schema([
+        ('assessment_id', pa.int64()),
+        ('location_id', pa.int64()),
+        ('location_name', pa.string()),
+        ('latitude', pa.float64()),
+        ('longitude', pa.float64()),
+        ('hazard_type', pa.string()),
+        ('risk_score', pa.float64()),
+        ('risk_level', pa.string()),
+        ('confidence_level', pa.float64()),
+        ('population_density', pa.float64()),
+        ('building_code_rating', pa.float64()),
+        ('infrastructure_quality', pa.float64()),
+        ('assessed_at', pa.string()),
+        ('recommendations', pa.string())
+    ])
@@ -14,7 +14,7 @@ from math import radians, cos, sin, asin, sqrt
 import time
 from enum import Enum
 
-from app.models import HazardType, RiskLevel
+from app.models import HazardType, RiskLevel, risk_level_for_score
 
 
 class ProximityDecayModel(str, Enum):
@@ -802,14 +802,7 @@ class RiskEngine:
         Returns:
             RiskLevel enum value
         """
-        if risk_score < 25:
-            return RiskLevel.LOW
-        elif risk_score < 50:
-            return RiskLevel.MODERATE
-        elif risk_score < 75:
-            return RiskLevel.HIGH
-        else:
-            return RiskLevel.CRITICAL
+        return risk_level_for_score(risk_score)
     
     def clear_cache(self) -> None:
         """Clear the distance calculation cache."""
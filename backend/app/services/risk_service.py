@@ -1,23 +1,15 @@
 """Risk calculation service with algorithms for different hazard types."""
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.models import Location, Hazard, HazardType, RiskLevel, HistoricalData
+from app.models import Location, Hazard, HazardType, RiskLevel, HistoricalData, risk_level_for_score
 
 
 class RiskCalculationService:
     """Service for calculating risk scores based on various factors."""
     
-    # Risk level thresholds
-    RISK_THRESHOLDS = {
-        RiskLevel.LOW: (0, 25),
-        RiskLevel.MODERATE: (25, 50),
-        RiskLevel.HIGH: (50, 75),
-        RiskLevel.CRITICAL: (75, 100)
-    }
-    
     def __init__(self, db: AsyncSession):
         """Initialize risk calculation service.
         
@@ -26,22 +18,60 @@ class RiskCalculationService:
         """
         self.db = db
     
+    async def calculate_risks(
+        self,
+        location: Location,
+        hazards: Sequence[Hazard],
+        custom_factors: Dict[str, float] | None = None
+    ) -> List[Tuple[float, RiskLevel, float, Dict[str, float], List[str]]]:
+        """Calculate risk for one location across several hazards.
+        
+        Historical event counts for every hazard are fetched in a single
+        grouped query, so the per-hazard calculations need no further
+        round trips.
+        
+        Args:
+            location: Location object or a row with the same columns
+            hazards: Hazard objects or rows with id, hazard_type and base_severity
+            custom_factors: Optional custom risk factors to override location defaults
+            
+        Returns:
+            One (risk_score, risk_level, confidence, factors_analysis, recommendations)
+            tuple per hazard, in input order
+        """
+        event_counts = await self._historical_event_counts(location.id, [h.id for h in hazards])
+        
+        return [
+            await self.calculate_risk(
+                location, hazard, custom_factors, event_counts.get(hazard.id, (0, 0))
+            )
+            for hazard in hazards
+        ]
+    
     async def calculate_risk(
         self,
         location: Location,
         hazard: Hazard,
-        custom_factors: Dict[str, float] | None = None
+        custom_factors: Dict[str, float] | None = None,
+        event_counts: Tuple[int, int] | None = None
     ) -> Tuple[float, RiskLevel, float, Dict[str, float], List[str]]:
         """Calculate comprehensive risk score for a location-hazard combination.
         
         Args:
-            location: Location object
-            hazard: Hazard object
+            location: Location object or a row with the same columns
+            hazard: Hazard object or a row with id, hazard_type and base_severity
             custom_factors: Optional custom risk factors to override location defaults
+            event_counts: Optional prefetched (total, last ten years) historical
+                event counts; queried when omitted
             
         Returns:
             Tuple of (risk_score, risk_level, confidence, factors_analysis, recommendations)
         """
+        if event_counts is None:
+            counts = await self._historical_event_counts(location.id, [hazard.id])
+            event_counts = counts.get(hazard.id, (0, 0))
+        total_events, recent_events = event_counts
+        
         # Use custom factors if provided, otherwise use location defaults
         pop_density = custom_factors.get('population_density', location.population_density) if custom_factors else location.population_density
         building_code = custom_factors.get('building_code_rating', location.building_code_rating) if custom_factors else location.building_code_rating
@@ -49,7 +79,7 @@ class RiskCalculationService:
         
         # Calculate individual factor impacts
         factors_analysis = await self._analyze_factors(
-            location, hazard, pop_density, building_code, infrastructure
+            location, hazard, pop_density, building_code, infrastructure, recent_events
         )
         
         # Calculate final risk score using hazard-specific algorithm
@@ -63,7 +93,7 @@ class RiskCalculationService:
         risk_level = self._determine_risk_level(risk_score)
         
         # Calculate confidence level based on historical data availability
-        confidence = await self._calculate_confidence(location, hazard)
+        confidence = await self._calculate_confidence(location, hazard, total_events)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(
@@ -78,7 +108,8 @@ class RiskCalculationService:
         hazard: Hazard,
         pop_density: float,
         building_code: float,
-        infrastructure: float
+        infrastructure: float,
+        recent_event_count: int | None = None
     ) -> Dict[str, float]:
         """Analyze individual risk factors and their impacts.
         
@@ -88,6 +119,7 @@ class RiskCalculationService:
             pop_density: Population density
             building_code: Building code rating (0-10)
             infrastructure: Infrastructure quality (0-10)
+            recent_event_count: Optional prefetched event count for the last ten years
             
         Returns:
             Dictionary of factor impacts (0-100 scale)
@@ -105,7 +137,9 @@ class RiskCalculationService:
         hazard_impact = (hazard.base_severity / 10) * 100
         
         # Historical frequency impact
-        historical_impact = await self._calculate_historical_frequency_impact(location, hazard)
+        historical_impact = await self._calculate_historical_frequency_impact(
+            location, hazard, recent_event_count
+        )
         
         return {
             'population_density_impact': round(pop_impact, 2),
@@ -118,34 +152,60 @@ class RiskCalculationService:
     async def _calculate_historical_frequency_impact(
         self,
         location: Location,
-        hazard: Hazard
+        hazard: Hazard,
+        event_count: int | None = None
     ) -> float:
         """Calculate impact based on historical event frequency.
         
         Args:
             location: Location object
             hazard: Hazard object
+            event_count: Optional prefetched event count for the last ten years
             
         Returns:
             Impact score (0-100)
         """
         # Count events in last 10 years
+        if event_count is None:
+            counts = await self._historical_event_counts(location.id, [hazard.id])
+            event_count = counts.get(hazard.id, (0, 0))[1]
+        
+        # Calculate impact based on frequency (0-10+ events)
+        frequency_impact = min((event_count / 10) * 100, 100)
+        
+        return frequency_impact
+    
+    async def _historical_event_counts(
+        self,
+        location_id: int,
+        hazard_ids: Sequence[int]
+    ) -> Dict[int, Tuple[int, int]]:
+        """Count historical events per hazard for a location in one query.
+        
+        Args:
+            location_id: Location ID
+            hazard_ids: Hazard IDs to count events for
+            
+        Returns:
+            Mapping of hazard ID to (total events, events in the last ten years);
+            hazards without events are omitted
+        """
         ten_years_ago = datetime.utcnow() - timedelta(days=3650)
         
         result = await self.db.execute(
-            select(func.count(HistoricalData.id))
+            select(
+                HistoricalData.hazard_id,
+                func.count(HistoricalData.id),
+                func.count(HistoricalData.id).filter(HistoricalData.event_date >= ten_years_ago)
+            )
             .where(
-                HistoricalData.location_id == location.id,
-                HistoricalData.hazard_id == hazard.id,
-                HistoricalData.event_date >= ten_years_ago
+                HistoricalData.location_id == location_id,
+                HistoricalData.hazard_id.in_(hazard_ids)
             )
+            .group_by(HistoricalData.hazard_id)
         )
-        event_count = result.scalar() or 0
         
-        # Calculate impact based on frequency (0-10+ events)
-        frequency_impact = min((event_count / 10) * 100, 100)
-        
-        return frequency_impact
+        return {hazard_id: (total, recent) for hazard_id, total, recent in result.all()}
     
     async def _calculate_hazard_specific_risk(
         self,
@@ -261,21 +321,20 @@ class RiskCalculationService:
         Returns:
             RiskLevel enum
         """
-        for level, (min_score, max_score) in self.RISK_THRESHOLDS.items():
-            if min_score <= risk_score < max_score:
-                return level
-        return RiskLevel.CRITICAL  # >= 75
+        return risk_level_for_score(risk_score)
     
     async def _calculate_confidence(
         self,
         location: Location,
-        hazard: Hazard
+        hazard: Hazard,
+        historical_count: int | None = None
     ) -> float:
         """Calculate confidence level based on data availability.
         
         Args:
             location: Location object
             hazard: Hazard object
+            historical_count: Optional prefetched total historical event count
             
         Returns:
             Confidence level (0-1)
@@ -283,14 +342,9 @@ class RiskCalculationService:
         base_confidence = 0.5
         
         # Increase confidence if we have historical data
-        result = await self.db.execute(
-            select(func.count(HistoricalData.id))
-            .where(
-                HistoricalData.location_id == location.id,
-                HistoricalData.hazard_id == hazard.id
-            )
-        )
-        historical_count = result.scalar() or 0
+        if historical_count is None:
+            counts = await self._historical_event_counts(location.id, [hazard.id])
+            historical_count = counts.get(hazard.id, (0, 0))[0]
         
         # Add up to 0.4 based on historical data (capped at 10+ events)
         historical_boost = min((historical_count / 10) * 0.4, 0.4)
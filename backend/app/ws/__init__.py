@@ -84,10 +84,7 @@ async def stream_location_risk_updates(
     try:
         await visualization_manager.connect(websocket, channel)
         
-        result = await db.execute(
-            select(Location).where(Location.id == location_id)
-        )
-        location = result.scalar_one_or_none()
+        location = await db.get(Location, location_id)
         
         if not location:
             await websocket.send_json({
@@ -226,10 +223,7 @@ async def stream_hazard_risk_heatmap(
     try:
         await visualization_manager.connect(websocket, channel)
         
-        result = await db.execute(
-            select(Hazard).where(Hazard.id == hazard_id)
-        )
-        hazard = result.scalar_one_or_none()
+        hazard = await db.get(Hazard, hazard_id)
         
         if not hazard:
             await websocket.send_json({
@@ -1,6 +1,7 @@
 """Pytest configuration and fixtures."""
 import pytest
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
@@ -8,7 +9,10 @@ from httpx import AsyncClient
 
 from app.main import app
 from app.db.session import Base, get_db
+from app.services.caching_service import get_hazard_cache, get_response_cache, get_trend_cache
 from app.models import Hazard, HazardType, Location, RiskAssessment, RiskLevel, HistoricalData
+from app.services import analytics_service
+from app.services.analytics_service import AdvancedAnalyticsService, HotspotRefresher
 
 
 # Use in-memory SQLite for tests
@@ -56,11 +60,44 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest.fixture
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def hotspot_refresher(
+    db_session: AsyncSession, monkeypatch
+) -> AsyncGenerator[HotspotRefresher, None]:
+    """Route background hotspot rebuilds to the test session.
+    
+    The debounce window never closes on its own during a test, so queued
+    rebuilds cannot overlap the test's own use of the session; tests call
+    flush() to run them.
+    
+    Args:
+        db_session: Test database session
+        
+    Yields:
+        HotspotRefresher: Refresher used by the write endpoints
+    """
+    @asynccontextmanager
+    async def test_session():
+        try:
+            yield db_session
+        except Exception:
+            await db_session.rollback()
+            raise
+    
+    refresher = HotspotRefresher(test_session, delay_seconds=3600)
+    monkeypatch.setattr(analytics_service, "_hotspot_refresher", refresher)
+    yield refresher
+    await refresher.flush()
+
+
+@pytest.fixture
+async def client(
+    db_session: AsyncSession, hotspot_refresher: HotspotRefresher
+) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client with overridden database dependency.
     
     Args:
         db_session: Test database session
+        hotspot_refresher: Refresher the write endpoints queue rebuilds on
         
     Yields:
         AsyncClient: Test HTTP client
@@ -69,6 +106,9 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    await get_hazard_cache().clear()
+    await get_response_cache().clear()
+    await get_trend_cache().clear()
     
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -211,6 +251,9 @@ async def sample_assessments(db_session: AsyncSession, sample_locations, sample_
             db_session.add(assessment)
             assessments.append(assessment)
     
+    # Rank the seeded rows up front, as the backfill migration does
+    await db_session.flush()
+    await AdvancedAnalyticsService(db_session).refresh_risk_hotspots()
     await db_session.commit()
     
     for assessment in assessments:
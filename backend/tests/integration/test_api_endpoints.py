@@ -1,6 +1,14 @@
 """Integration tests for API endpoints."""
+import asyncio
+import statistics
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.models import Hazard, RiskLevel
+from app.services.caching_service import CacheKey, get_hazard_cache, get_response_cache
 
 
 @pytest.mark.asyncio
@@ -97,6 +105,114 @@ class TestLocationEndpoints:
         # Verify deleted
         get_response = await client.get(f"/api/locations/{location_id}")
         assert get_response.status_code == 404
+    
+    async def test_location_timestamps_set_by_database(self, client: AsyncClient):
+        """Test created_at is set on insert and updated_at moves forward on update."""
+        created = await client.post(
+            "/api/locations", json={"name": "Clock", "latitude": 0.0, "longitude": 0.0}
+        )
+        await asyncio.sleep(0.01)
+        updated = await client.put(f"/api/locations/{created.json()['id']}", json={"name": "Clock 2"})
+        
+        assert created.json()["created_at"] is not None
+        assert updated.json()["updated_at"] > created.json()["updated_at"]
+    
+    async def test_update_nonexistent_location(self, client: AsyncClient):
+        """Test updating a non-existent location returns 404."""
+        response = await client.put("/api/locations/99999", json={"name": "Ghost"})
+        
+        assert response.status_code == 404
+    
+    async def test_delete_location_removes_dependents(
+        self, client: AsyncClient, hotspot_refresher, sample_locations, sample_assessments
+    ):
+        """Test deleting a location also deletes its assessments."""
+        location_id = sample_locations[0].id
+        hazard_id = sample_assessments[0].hazard_id
+        
+        response = await client.delete(f"/api/locations/{location_id}")
+        missing = await client.delete(f"/api/locations/{location_id}")
+        await hotspot_refresher.flush()
+        hotspots = await client.get(f"/api/analytics/hotspots/{hazard_id}")
+        
+        assert response.status_code == 200
+        assert missing.status_code == 404
+        assert location_id not in [h["location_id"] for h in hotspots.json()["hotspots"]]
+    
+    async def test_delete_missing_location_writes_nothing(
+        self, client: AsyncClient, db_session, sample_assessments
+    ):
+        """Test deleting a missing location issues no writes and keeps cached lists."""
+        await client.get("/api/locations")
+        engine = db_session.bind.sync_engine
+        writes = []
+        
+        def record_write(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+                writes.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", record_write)
+        try:
+            response = await client.delete("/api/locations/99999")
+        finally:
+            event.remove(engine, "before_cursor_execute", record_write)
+        
+        assert response.status_code == 404
+        assert writes == []
+        assert await get_response_cache().get(CacheKey.location_list(0, 100, None)) is not None
+    
+    async def test_location_list_cache_invalidated_on_write(self, client: AsyncClient):
+        """Test cached location pages are dropped after create and update."""
+        assert (await client.get("/api/locations")).json() == []
+        
+        created = await client.post(
+            "/api/locations",
+            json={"name": "Cached City", "latitude": 10.0, "longitude": 20.0}
+        )
+        after_create = await client.get("/api/locations")
+        await client.put(f"/api/locations/{created.json()['id']}", json={"name": "Renamed"})
+        after_update = await client.get("/api/locations")
+        
+        assert [loc["name"] for loc in after_create.json()] == ["Cached City"]
+        assert [loc["name"] for loc in after_update.json()] == ["Renamed"]
+    
+    async def test_write_requests_commit_once(self, client: AsyncClient, db_session):
+        """Test each write request issues exactly one COMMIT."""
+        engine = db_session.bind.sync_engine
+        commits = []
+        
+        def record_commit(conn):
+            commits.append(conn)
+        
+        event.listen(engine, "commit", record_commit)
+        try:
+            created = await client.post(
+                "/api/locations", json={"name": "Unit Of Work", "latitude": 1.0, "longitude": 2.0}
+            )
+            await client.put(f"/api/locations/{created.json()['id']}", json={"name": "Renamed"})
+        finally:
+            event.remove(engine, "commit", record_commit)
+        
+        assert len(commits) == 2
+    
+    async def test_get_locations_cursor_pagination(self, client: AsyncClient):
+        """Test walking locations with the X-Next-Cursor keyset header."""
+        for i in range(5):
+            await client.post(
+                "/api/locations",
+                json={"name": f"Page City {i}", "latitude": 10.0 + i, "longitude": 20.0}
+            )
+        
+        names = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get("/api/locations", params=params)
+            names.extend(loc["name"] for loc in response.json())
+            if "x-next-cursor" not in response.headers:
+                break
+            params = {"limit": 2, "cursor": response.headers["x-next-cursor"]}
+        
+        assert names == [f"Page City {i}" for i in range(5)]
 
 
 @pytest.mark.asyncio
@@ -139,6 +255,19 @@ class TestHazardEndpoints:
         data = response.json()
         assert isinstance(data, list)
         assert len(data) == 4  # All sample hazards
+    
+    async def test_get_hazards_served_from_cache(self, client: AsyncClient, sample_hazards, db_session):
+        """Test the hazard list is cached and refreshed when a hazard is created."""
+        first = await client.get("/api/hazards")
+        await db_session.delete(sample_hazards[0])
+        await db_session.commit()
+        cached = await client.get("/api/hazards")
+        
+        await client.post("/api/hazards", json={"hazard_type": "earthquake", "name": "Quake"})
+        refreshed = await client.get("/api/hazards")
+        
+        assert cached.content == first.content
+        assert "Quake" in [h["name"] for h in refreshed.json()]
 
 
 @pytest.mark.asyncio
@@ -178,6 +307,7 @@ class TestRiskAssessmentEndpoints:
         
         # Should have 2 assessments
         assert len(data["assessments"]) == 2
+        assert len({a["id"] for a in data["assessments"]}) == 2
         
         # Each assessment should have required fields
         for assessment in data["assessments"]:
@@ -211,6 +341,18 @@ class TestRiskAssessmentEndpoints:
         assert data["location"]["name"] == "New Risk City"
         assert len(data["assessments"]) == 2
     
+    async def test_assess_risk_duplicate_hazard_types(self, client: AsyncClient, sample_hazards):
+        """Test a hazard type listed twice is assessed once instead of failing."""
+        assessment_request = {
+            "location": {"name": "Duplicate Hazards", "latitude": 12.0, "longitude": 34.0},
+            "hazard_types": ["flood", "flood"]
+        }
+        
+        response = await client.post("/api/assess-risk", json=assessment_request)
+        
+        assert response.status_code == 200
+        assert [a["hazard_type"] for a in response.json()["assessments"]] == ["flood"]
+    
     async def test_assess_risk_custom_factors(self, client: AsyncClient, sample_hazards):
         """Test risk assessment with custom risk factors."""
         # Create location
@@ -291,6 +433,31 @@ class TestHistoricalDataEndpoints:
         data = response.json()
         assert data["severity"] == 8.0
         assert data["casualties"] == 50
+        assert data["created_at"] is not None
+    
+    async def test_create_historical_data_missing_parent(
+        self, client: AsyncClient, sample_locations, sample_hazards
+    ):
+        """Test creating historical data for an unknown location or hazard returns 404."""
+        event = {"event_date": "2020-01-15T10:30:00", "severity": 5.0}
+        
+        missing_location = await client.post("/api/historical-data", json={
+            **event, "location_id": 99999, "hazard_id": sample_hazards[0].id
+        })
+        missing_hazard = await client.post("/api/historical-data", json={
+            **event, "location_id": sample_locations[0].id, "hazard_id": 99999
+        })
+        
+        assert missing_location.status_code == 404
+        assert "Location" in missing_location.json()["detail"]
+        assert missing_hazard.status_code == 404
+        assert "Hazard" in missing_hazard.json()["detail"]
+    
+    async def test_get_historical_data_unknown_location(self, client: AsyncClient):
+        """Test listing historical data for an unknown location returns 404."""
+        response = await client.get("/api/historical-data/99999")
+        
+        assert response.status_code == 404
     
     async def test_get_historical_data_by_location(self, client: AsyncClient, sample_hazards):
         """Test retrieving historical data for a location."""
@@ -348,3 +515,357 @@ class TestHistoricalDataEndpoints:
         data = response.json()
         assert len(data) == 1
         assert data[0]["hazard_id"] == hazards[0]["id"]
+    
+    async def test_get_historical_data_cursor_pagination(
+        self, client: AsyncClient, sample_locations, sample_hazards
+    ):
+        """Test keyset pages cover every record once, including event_date ties."""
+        location_id = sample_locations[0].id
+        for date in ["2020-01-01", "2020-01-01", "2020-02-01", "2020-03-01", "2020-03-01"]:
+            await client.post("/api/historical-data", json={
+                "location_id": location_id,
+                "hazard_id": sample_hazards[0].id,
+                "event_date": f"{date}T00:00:00",
+                "severity": 5.0
+            })
+        
+        ids = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get(f"/api/historical-data/{location_id}", params=params)
+            ids.extend(record["id"] for record in response.json())
+            if "x-next-cursor" not in response.headers:
+                break
+            params = {"limit": 2, "cursor": response.headers["x-next-cursor"]}
+        
+        full = await client.get(f"/api/historical-data/{location_id}")
+        assert ids == [record["id"] for record in full.json()]
+        assert len(set(ids)) == 5
+    
+    async def test_get_historical_data_invalid_cursor(self, client: AsyncClient, sample_locations):
+        """Test a malformed cursor is rejected."""
+        response = await client.get(
+            f"/api/historical-data/{sample_locations[0].id}", params={"cursor": "yesterday"}
+        )
+        
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestAnalyticsEndpoints:
+    """Test analytics API endpoints."""
+    
+    async def test_get_critical_factors(self, client: AsyncClient, sample_assessments):
+        """Test critical factors for an existing location-hazard pair."""
+        assessment = sample_assessments[0]
+        
+        response = await client.get(
+            f"/api/analytics/critical-factors/{assessment.location_id}/{assessment.hazard_id}"
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert "critical_factors" in data
+    
+    async def test_get_hotspots_repeated(self, client: AsyncClient, sample_assessments):
+        """Test repeated hotspot requests are served consistently from the hazard cache."""
+        hazard_id = sample_assessments[0].hazard_id
+        
+        first = await client.get(f"/api/analytics/hotspots/{hazard_id}")
+        second = await client.get(f"/api/analytics/hotspots/{hazard_id}")
+        
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.json() == second.json()
+    
+    async def test_hotspots_refresh_after_new_assessment(
+        self, client: AsyncClient, hotspot_refresher, sample_hazards, sample_assessments
+    ):
+        """Test precomputed hotspots are rebuilt in the background after a new assessment."""
+        hazard = next(h for h in sample_hazards if h.hazard_type.value == "earthquake")
+        
+        response = await client.get(f"/api/analytics/hotspots/{hazard.id}")
+        
+        assert response.status_code == 200
+        before = response.json()
+        scores = [h["risk_score"] for h in before["hotspots"]]
+        assert scores == sorted(scores, reverse=True)
+        
+        await client.post("/api/assess-risk", json={
+            "location": {"name": "Hotspot City", "latitude": 36.0, "longitude": -120.0},
+            "hazard_types": ["earthquake"]
+        })
+        
+        # The write only queues the rebuild; it runs once the debounce window closes
+        response = await client.get(f"/api/analytics/hotspots/{hazard.id}")
+        pending = response.json()
+        await hotspot_refresher.flush()
+        response = await client.get(f"/api/analytics/hotspots/{hazard.id}")
+        after = response.json()
+        
+        assert pending == before
+        assert after["hotspot_count"] == before["hotspot_count"] + 1
+        assert "Hotspot City" in [h["location_name"] for h in after["hotspots"]]
+    
+    async def test_hazard_cache_holds_rows_not_orm_instances(
+        self, client: AsyncClient, sample_hazards
+    ):
+        """Test the shared hazard cache stores detached-safe rows."""
+        hazard = sample_hazards[0]
+        
+        first = await client.get(f"/api/analytics/hotspots/{hazard.id}")
+        cached = await get_hazard_cache().get(CacheKey.hazard(hazard.id))
+        second = await client.get(f"/api/analytics/hotspots/{hazard.id}")
+        
+        assert not isinstance(cached, Hazard)
+        assert (cached.id, cached.hazard_type) == (hazard.id, hazard.hazard_type)
+        assert first.json() == second.json()
+    
+    async def test_hotspots_read_never_rebuilds(
+        self, client: AsyncClient, db_session, sample_hazards
+    ):
+        """Test a hazard without assessments reads as empty without writing rankings."""
+        engine = db_session.bind.sync_engine
+        writes = []
+        
+        def record_write(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("INSERT", "DELETE")):
+                writes.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", record_write)
+        try:
+            response = await client.get(f"/api/analytics/hotspots/{sample_hazards[0].id}")
+        finally:
+            event.remove(engine, "before_cursor_execute", record_write)
+        
+        assert response.status_code == 200
+        assert response.json()["hotspots"] == []
+        assert writes == []
+    
+    async def test_trends_cache_invalidated_by_new_event(
+        self, client: AsyncClient, sample_locations, sample_hazards, sample_historical_data
+    ):
+        """Test cached trends are reused until an event is recorded for the pair."""
+        location_id, hazard_id = sample_locations[0].id, sample_hazards[0].id
+        url = f"/api/analytics/trends/{location_id}/{hazard_id}"
+        
+        first = (await client.get(url)).json()["trends"]
+        cached = (await client.get(url)).json()["trends"]
+        await client.post("/api/historical-data", json={
+            "location_id": location_id,
+            "hazard_id": hazard_id,
+            "event_date": "2024-06-01T00:00:00",
+            "severity": 9.0
+        })
+        refreshed = (await client.get(url)).json()["trends"]
+        
+        assert cached == first
+        assert refreshed["event_count"] == first["event_count"] + 1
+    
+    async def test_forecast_projects_latest_assessment(
+        self, client: AsyncClient, sample_locations, sample_hazards, sample_assessments
+    ):
+        """Test the forecast starts from the latest score and is empty without one."""
+        location, hazard = sample_locations[0], sample_hazards[0]
+        base = next(
+            a.risk_score for a in sample_assessments
+            if a.location_id == location.id and a.hazard_id == hazard.id
+        )
+        
+        response = await client.get(
+            f"/api/analytics/forecast/{location.id}/{hazard.id}", params={"months_ahead": 6}
+        )
+        empty = await client.post("/api/locations", json={"name": "New", "latitude": 1.0, "longitude": 1.0})
+        no_history = await client.get(f"/api/analytics/forecast/{empty.json()['id']}/{hazard.id}")
+        
+        forecast = response.json()["forecast"]
+        assert [m["month_ahead"] for m in forecast] == list(range(1, 7))
+        assert all(m["projected_risk_score"] == round(base, 2) for m in forecast)
+        assert forecast[0]["confidence_interval"] == {
+            "lower": round(max(0, base - 5), 2), "upper": round(min(100, base + 5), 2)
+        }
+        assert no_history.json()["forecast"] == []
+    
+    async def test_trends_nonexistent_location(self, client: AsyncClient, sample_hazards):
+        """Test trends for a missing location returns 404."""
+        response = await client.get(f"/api/analytics/trends/99999/{sample_hazards[0].id}")
+        
+        assert response.status_code == 404
+        assert "Location" in response.json()["detail"]
+    
+    async def test_trends_nonexistent_hazard(self, client: AsyncClient, sample_locations):
+        """Test trends for a missing hazard returns 404."""
+        response = await client.get(f"/api/analytics/trends/{sample_locations[0].id}/99999")
+        
+        assert response.status_code == 404
+        assert "Hazard" in response.json()["detail"]
+    
+    async def test_compare_locations_missing_location(
+        self, client: AsyncClient, sample_locations, sample_hazards
+    ):
+        """Test comparing with an unknown location ID returns 404."""
+        response = await client.post(
+            "/api/analytics/compare-locations",
+            params={
+                "location_ids": [sample_locations[0].id, 99999],
+                "hazard_id": sample_hazards[0].id
+            }
+        )
+        
+        assert response.status_code == 404
+        assert "99999" in response.json()["detail"]
+    
+    async def test_compare_locations_too_many_ids(self, client: AsyncClient, sample_hazards):
+        """Test comparing more than the allowed number of locations is rejected."""
+        response = await client.post(
+            "/api/analytics/compare-locations",
+            params={"location_ids": list(range(1, 202)), "hazard_id": sample_hazards[0].id}
+        )
+        
+        assert response.status_code == 422
+    
+    async def test_compare_locations_duplicate_ids(
+        self, client: AsyncClient, sample_locations, sample_hazards
+    ):
+        """Test duplicate location IDs are compared once."""
+        location_id = sample_locations[0].id
+        response = await client.post(
+            "/api/analytics/compare-locations",
+            params={"location_ids": [location_id, location_id], "hazard_id": sample_hazards[0].id}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["locations_compared"] == 1
+    
+    async def test_compare_locations_batched_profiles(
+        self, client: AsyncClient, sample_locations, sample_hazards,
+        sample_assessments, sample_historical_data
+    ):
+        """Test each compared location gets its own latest assessment and trends."""
+        hazard_id = sample_hazards[0].id
+        first, second = sample_locations[0].id, sample_locations[1].id
+        response = await client.post(
+            "/api/analytics/compare-locations",
+            params={"location_ids": [first, second], "hazard_id": hazard_id}
+        )
+        
+        assert response.status_code == 200
+        comparison = response.json()["comparison"]
+        
+        expected_scores = {
+            a.location_id: a.risk_score for a in sample_assessments if a.hazard_id == hazard_id
+        }
+        assert comparison[str(first)]["current_risk"]["risk_score"] == expected_scores[first]
+        assert comparison[str(second)]["current_risk"]["risk_score"] == expected_scores[second]
+        
+        trends = await client.get(f"/api/analytics/trends/{first}/{hazard_id}")
+        assert comparison[str(first)]["historical_trends"] == trends.json()["trends"]
+        assert comparison[str(second)]["historical_trends"]["event_count"] == 0
+        
+    async def test_regional_risk_bounding_box(
+        self, client: AsyncClient, db_session, sample_locations, sample_hazards, sample_assessments
+    ):
+        """Test regional risk only counts locations inside the bounding box, including moved ones."""
+        bounds = {
+            "min_latitude": 33.0,
+            "max_latitude": 38.0,
+            "min_longitude": -123.0,
+            "max_longitude": -118.0
+        }
+        
+        response = await client.get("/api/analytics/regional-risk", params=bounds)
+        
+        assert response.status_code == 200
+        assert response.json()["assessment_count"] == 2 * len(sample_hazards)
+        
+        seattle = sample_locations[2]
+        seattle.latitude = 36.0
+        seattle.longitude = -120.0
+        await db_session.commit()
+        
+        response = await client.get("/api/analytics/regional-risk", params=bounds)
+        
+        assert response.json()["assessment_count"] == 3 * len(sample_hazards)
+    
+    async def test_regional_risk_statistics(
+        self, client: AsyncClient, sample_assessments
+    ):
+        """Test regional statistics and level distribution over every assessment."""
+        response = await client.get("/api/analytics/regional-risk", params={
+            "min_latitude": -90.0, "max_latitude": 90.0,
+            "min_longitude": -180.0, "max_longitude": 180.0
+        })
+        
+        stats = response.json()["risk_statistics"]
+        scores = [a.risk_score for a in sample_assessments]
+        assert stats["average_risk_score"] == round(statistics.mean(scores), 2)
+        assert stats["median_risk_score"] == round(statistics.median(scores), 2)
+        assert stats["std_deviation"] == round(statistics.stdev(scores), 2)
+        assert stats["min_risk_score"] == min(scores)
+        assert stats["max_risk_score"] == max(scores)
+        assert stats["risk_level_distribution"] == {
+            level.value: sum(1 for a in sample_assessments if a.risk_level == level)
+            for level in RiskLevel
+        }
+    
+    async def test_regional_risk_invalid_bounds(self, client: AsyncClient):
+        """Test inverted or out-of-range bounds are rejected with 400."""
+        inverted = await client.get("/api/analytics/regional-risk", params={
+            "min_latitude": 40.0, "max_latitude": 30.0,
+            "min_longitude": -125.0, "max_longitude": -115.0
+        })
+        out_of_range = await client.get("/api/analytics/regional-risk", params={
+            "min_latitude": -95.0, "max_latitude": 30.0,
+            "min_longitude": -125.0, "max_longitude": -115.0
+        })
+        
+        assert inverted.status_code == 400
+        assert out_of_range.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestHealthEndpoints:
+    """Test health check endpoints."""
+    
+    async def test_database_health(self, client: AsyncClient):
+        """Test the database probe answers when the database is reachable."""
+        response = await client.get("/health/db")
+        
+        assert response.status_code == 200
+        assert response.json() == {"status": "healthy", "database": "reachable"}
+    
+    async def test_database_health_timeout(self, client: AsyncClient, db_session, monkeypatch):
+        """Test a database that does not answer in time fails the probe with 503."""
+        async def stalled_execute(*args, **kwargs):
+            await asyncio.sleep(1)
+        
+        monkeypatch.setattr(db_session, "execute", stalled_execute)
+        monkeypatch.setattr("app.main.DB_HEALTH_TIMEOUT_SECONDS", 0.01)
+        response = await client.get("/health/db")
+        
+        assert response.status_code == 503
+    
+    @pytest.mark.parametrize("error", [
+        OperationalError("SELECT 1", {}, ConnectionRefusedError("connection refused")),
+        ConnectionRefusedError("connection refused"),
+    ])
+    async def test_database_health_unreachable(
+        self, client: AsyncClient, db_session, monkeypatch, error
+    ):
+        """Test a refused connection or driver error fails the probe with 503."""
+        async def failing_execute(*args, **kwargs):
+            raise error
+        
+        monkeypatch.setattr(db_session, "execute", failing_execute)
+        response = await client.get("/health/db")
+        
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Database unreachable"
+    
+    async def test_db_pool_status(self, client: AsyncClient):
+        """Test the pool endpoint reports the engine's pool status."""
+        response = await client.get("/health/db-pool")
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+        assert isinstance(response.json()["pool"], str)
@@ -131,6 +131,24 @@ class TestExportRiskReportAPI:
         rows = list(reader)
         
         assert len(rows) > 0
+    
+    @pytest.mark.asyncio
+    async def test_export_risk_report_gzip(self, client: AsyncClient, sample_assessments):
+        """Test the streamed report is gzip-encoded only when the client accepts it."""
+        compressed = await client.post(
+            "/api/export/risk-report",
+            json={},
+            headers={"Accept-Encoding": "gzip"}
+        )
+        plain = await client.post(
+            "/api/export/risk-report",
+            json={},
+            headers={"Accept-Encoding": "identity"}
+        )
+        
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in plain.headers
+        assert compressed.text == plain.text
 
 
 class TestBatchProcessAPI:
@@ -356,6 +374,24 @@ class TestExportFormatsAPI:
         assert "columns" in schema
         assert isinstance(schema["columns"], list)
         assert len(schema["columns"]) > 0
+    
+    @pytest.mark.asyncio
+    async def test_formats_etag_revalidation(self, client: AsyncClient):
+        """Test the formats endpoint is cacheable and honours If-None-Match."""
+        response = await client.get("/api/export/formats")
+        etag = response.headers["etag"]
+        
+        assert "max-age" in response.headers["cache-control"]
+        
+        revalidated = await client.get("/api/export/formats", headers={"If-None-Match": etag})
+        
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        
+        stale = await client.get("/api/export/formats", headers={"If-None-Match": '"stale"'})
+        
+        assert stale.status_code == 200
+        assert stale.json() == response.json()
 
 
 class TestExportPerformance:
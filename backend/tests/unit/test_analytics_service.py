@@ -0,0 +1,126 @@
+"""Unit tests for the advanced analytics service."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import select
+
+from app.models import RiskAssessment, RiskHotspot, RiskLevel
+from app.services.analytics_service import AdvancedAnalyticsService, HotspotRefresher
+
+
+@pytest.mark.asyncio
+class TestLatestAssessment:
+    """Tests for the latest-assessment lookup behind forecasts and factor ranking."""
+    
+    async def test_forecast_and_factors_follow_new_assessment(
+        self, db_session, sample_locations, sample_hazards, sample_assessments
+    ):
+        """Test forecast and factor ranking read an assessment written in the same session."""
+        location, hazard = sample_locations[0], sample_hazards[0]
+        analytics = AdvancedAnalyticsService(db_session)
+        
+        forecast = await analytics.forecast_risk_evolution(location, hazard, months_ahead=1)
+        factors = await analytics.identify_critical_risk_factors(location, hazard)
+        
+        db_session.add(RiskAssessment(
+            location_id=location.id, hazard_id=hazard.id, risk_score=99.0,
+            risk_level=RiskLevel.CRITICAL, confidence_level=0.9,
+            factors_analysis={"hazard_severity_impact": 99.0}
+        ))
+        await db_session.flush()
+        refreshed = await analytics.forecast_risk_evolution(location, hazard, months_ahead=1)
+        refreshed_factors = await analytics.identify_critical_risk_factors(location, hazard)
+        
+        assert forecast["current_risk_score"] != 99.0
+        assert refreshed["current_risk_score"] == 99.0
+        assert refreshed_factors != factors
+        assert refreshed_factors[0]["factor_name"] == "hazard_severity_impact"
+    
+    async def test_never_assessed_pair_has_no_forecast_or_factors(
+        self, db_session, sample_locations, sample_hazards
+    ):
+        """Test a pair without assessments yields an empty forecast and no factors."""
+        location, hazard = sample_locations[0], sample_hazards[0]
+        analytics = AdvancedAnalyticsService(db_session)
+        
+        forecast = await analytics.forecast_risk_evolution(location, hazard, months_ahead=3)
+        
+        assert forecast["forecast"] == []
+        assert await analytics.identify_critical_risk_factors(location, hazard) == []
+
+
+class TestComputeTrend:
+    """Tests for the event-history trend summary."""
+    
+    def test_damage_total_is_float_without_recorded_damage(self):
+        """Test events without damage figures still report a float damage total."""
+        trend = AdvancedAnalyticsService._compute_trend(
+            [(3.0, None, None), (4.0, 2, None)], years=10
+        )
+        
+        assert trend['total_economic_damage'] == 0.0
+        assert isinstance(trend['total_economic_damage'], float)
+        assert trend['total_casualties'] == 2
+
+
+@pytest.mark.asyncio
+class TestHotspotRefresher:
+    """Tests for the debounced background hotspot rebuilds."""
+    
+    @staticmethod
+    def counting_factory(db_session, opened):
+        """Build a session factory that reuses the test session and counts rebuilds."""
+        @asynccontextmanager
+        async def factory():
+            opened.append(1)
+            yield db_session
+        return factory
+    
+    @staticmethod
+    async def add_assessment(db_session, location, hazard):
+        """Commit one assessment without ranking it."""
+        db_session.add(RiskAssessment(
+            location_id=location.id, hazard_id=hazard.id, risk_score=55.0,
+            risk_level=RiskLevel.MODERATE, confidence_level=0.8
+        ))
+        await db_session.commit()
+    
+    async def test_writes_in_window_share_one_rebuild_per_hazard(
+        self, db_session, sample_locations, sample_hazards
+    ):
+        """Test hazards queued repeatedly are rebuilt once each, only on flush."""
+        opened = []
+        refresher = HotspotRefresher(self.counting_factory(db_session, opened), delay_seconds=3600)
+        first, second = sample_hazards[:2]
+        await self.add_assessment(db_session, sample_locations[0], first)
+        await self.add_assessment(db_session, sample_locations[1], second)
+        
+        refresher.schedule([first.id, second.id])
+        refresher.schedule([second.id])
+        await asyncio.sleep(0)
+        queued = (await db_session.execute(select(RiskHotspot))).scalars().all()
+        await refresher.flush()
+        ranked = (await db_session.execute(select(RiskHotspot.hazard_id))).scalars().all()
+        
+        assert queued == []
+        assert len(opened) == 2
+        assert sorted(ranked) == sorted([first.id, second.id])
+    
+    async def test_rebuilds_after_debounce_window(
+        self, db_session, sample_locations, sample_hazards
+    ):
+        """Test queued hazards are rebuilt without a flush once the window closes."""
+        opened = []
+        refresher = HotspotRefresher(self.counting_factory(db_session, opened), delay_seconds=0.01)
+        hazard = sample_hazards[0]
+        await self.add_assessment(db_session, sample_locations[0], hazard)
+        
+        refresher.schedule([hazard.id])
+        await asyncio.sleep(0.2)
+        ranked = (await db_session.execute(
+            select(RiskHotspot.location_id).where(RiskHotspot.hazard_id == hazard.id)
+        )).scalars().all()
+        
+        assert len(opened) == 1
+        assert ranked == [sample_locations[0].id]
@@ -0,0 +1,269 @@
+"""Unit tests for the in-memory LRU cache."""
+import asyncio
+
+import pytest
+
+from app.models import HazardType
+from app.services import caching_service
+from app.services.caching_service import CacheKey, CachingService, FrequencySketch, InMemoryCache
+
+
+@pytest.mark.asyncio
+class TestInMemoryCache:
+    """Tests for InMemoryCache LRU and TTL behavior."""
+    
+    async def test_evicts_least_recently_used(self):
+        """Test a read refreshes recency so the untouched key is evicted."""
+        cache = InMemoryCache(max_size=2)
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        
+        await cache.get("a")
+        await cache.set("c", {"v": 3})
+        
+        assert await cache.get("a") == {"v": 1}
+        assert await cache.get("b") is None
+        assert await cache.get("c") == {"v": 3}
+    
+    async def test_overwrite_does_not_evict(self):
+        """Test replacing an existing key at capacity keeps every entry."""
+        cache = InMemoryCache(max_size=2)
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        
+        await cache.set("a", {"v": 10})
+        
+        assert await cache.get("a") == {"v": 10}
+        assert await cache.get("b") == {"v": 2}
+    
+    async def test_expired_entry_is_dropped(self):
+        """Test an expired entry reads as missing and is removed."""
+        cache = InMemoryCache(max_size=2)
+        await cache.set("a", {"v": 1}, ttl_seconds=-1)
+        
+        assert await cache.get("a") is None
+        assert (await cache.get_stats())["size"] == 0
+    
+    async def test_delete_prefix_and_clear(self):
+        """Test prefix deletion removes only matching keys and clear empties the cache."""
+        cache = InMemoryCache()
+        await cache.set("geo:trends:1:1:years:5", {"v": 1})
+        await cache.set("geo:trends:2:1:years:5", {"v": 2})
+        
+        await cache.delete_prefix("geo:trends:1:")
+        
+        assert await cache.get("geo:trends:1:1:years:5") is None
+        assert await cache.get("geo:trends:2:1:years:5") == {"v": 2}
+        
+        await cache.clear()
+        assert (await cache.get_stats())["size"] == 0
+    
+    async def test_purge_expired_keeps_live_entries(self):
+        """Test purging removes only expired entries and their tag index entries."""
+        cache = InMemoryCache()
+        await cache.set("old", {"v": 1}, ttl_seconds=-1, tag="x")
+        await cache.set("new", {"v": 2}, tag="x")
+        
+        assert await cache.purge_expired() == 1
+        
+        await cache.delete_tag("x")
+        assert (await cache.get_stats())["size"] == 0
+    
+    async def test_reaper_sweeps_global_caches(self, monkeypatch):
+        """Test the background reaper purges expired entries without any reads."""
+        trend_cache = InMemoryCache()
+        monkeypatch.setattr(caching_service, "_trend_cache", trend_cache)
+        await trend_cache.set("geo:trends:1:1:years:5", {"v": 1}, ttl_seconds=-1)
+        
+        reaper = asyncio.create_task(caching_service.reap_expired_cache_entries(0.001))
+        await asyncio.sleep(0.05)
+        reaper.cancel()
+        
+        assert (await trend_cache.get_stats())["size"] == 0
+    
+    async def test_global_caches_use_short_configured_ttls(self, monkeypatch):
+        """Test the per-worker list and trend caches take their TTLs from settings."""
+        monkeypatch.setattr(caching_service, "_response_cache", None)
+        monkeypatch.setattr(caching_service, "_trend_cache", None)
+        monkeypatch.setattr(caching_service.settings, "response_cache_ttl_seconds", 3)
+        monkeypatch.setattr(caching_service.settings, "trend_cache_ttl_seconds", 4)
+        
+        assert caching_service.get_response_cache().default_ttl == 3
+        assert caching_service.get_trend_cache().default_ttl == 4
+    
+    async def test_delete_tag_after_eviction_and_retag(self):
+        """Test delete_tag drops only live members after eviction and re-tagging."""
+        cache = InMemoryCache(max_size=3)
+        await cache.set("a", {"v": 1}, tag="x")
+        await cache.set("b", {"v": 2}, tag="x")
+        await cache.set("c", {"v": 3}, tag="y")
+        await cache.set("d", {"v": 4}, tag="x")  # evicts "a"
+        await cache.set("b", {"v": 5}, tag="y")  # moves "b" to tag y
+        
+        await cache.delete_tag("x")
+        
+        assert await cache.get("d") is None
+        assert await cache.get("b") == {"v": 5}
+        assert await cache.get("c") == {"v": 3}
+        
+        await cache.delete_tag("y")
+        assert (await cache.get_stats())["size"] == 0
+    
+    async def test_admission_filter_protects_popular_entries(self):
+        """Test a one-off key cannot displace a hot LRU victim but a repeated one can."""
+        cache = InMemoryCache(max_size=2, admission_filter=True)
+        for key in ("hot", "warm"):
+            await cache.get(key)
+            await cache.set(key, {"k": key})
+        for _ in range(3):
+            await cache.get("hot")
+        await cache.get("warm")
+        
+        await cache.get("scan")
+        await cache.set("scan", {"k": "scan"})
+        
+        assert await cache.get("scan") is None
+        assert await cache.get("hot") == {"k": "hot"}
+        
+        for _ in range(3):
+            await cache.get("repeat")
+        await cache.set("repeat", {"k": "repeat"})
+        
+        assert await cache.get("repeat") == {"k": "repeat"}
+        assert await cache.get("warm") is None
+
+
+class TestFrequencySketch:
+    """Tests for the count-min frequency sketch."""
+    
+    def test_estimates_track_and_decay(self):
+        """Test estimates grow with accesses, saturate, and halve after the sample period."""
+        sketch = FrequencySketch(capacity=16)
+        for _ in range(20):
+            sketch.increment("a")
+        sketch.increment("b")
+        
+        assert sketch.estimate("a") == 15
+        assert sketch.estimate("b") >= 1
+        assert sketch.estimate("never") <= sketch.estimate("b")
+        
+        for i in range(160):
+            sketch.increment(f"filler-{i}")
+        
+        assert sketch.estimate("a") < 15
+
+
+class TestCacheKey:
+    """Tests for cache key construction."""
+    
+    def test_risk_assessment_key_ignores_argument_order(self):
+        """Test hazard and factor order do not change the key while factor values do."""
+        key = CacheKey.risk_assessment(
+            37.77491, -122.41942, [HazardType.FLOOD, HazardType.EARTHQUAKE],
+            {"population_density": 7000.0, "building_code_rating": 8.5}
+        )
+        
+        assert key == CacheKey.risk_assessment(
+            37.77491, -122.41942, [HazardType.EARTHQUAKE, HazardType.FLOOD],
+            {"building_code_rating": 8.5, "population_density": 7000.0}
+        )
+        assert key != CacheKey.risk_assessment(
+            37.77491, -122.41942, [HazardType.EARTHQUAKE, HazardType.FLOOD],
+            {"building_code_rating": 8.0, "population_density": 7000.0}
+        )
+        assert key.startswith("risk_assessment:")
+        assert ":hazards:earthquake,flood:" in key
+        assert CacheKey.risk_assessment(1.0, 2.0, ["flood", HazardType.EARTHQUAKE]) == (
+            CacheKey.risk_assessment(1.0, 2.0, [HazardType.FLOOD, HazardType.EARTHQUAKE])
+        )
+    
+    def test_coordinates_share_integer_buckets(self):
+        """Test coordinates within the same ~11m bucket map to one key."""
+        assert CacheKey.quantize_coordinate(37.77491) == 377749
+        assert CacheKey.location_by_coords(37.77491, -122.41942) == (
+            CacheKey.location_by_coords(37.774905, -122.419424)
+        )
+        assert CacheKey.location_by_coords(-0.00001, 0.0) == "location:coords:0:0"
+
+
+@pytest.mark.asyncio
+class TestCachingService:
+    """Tests for the risk assessment caching service."""
+    
+    async def test_invalidate_location_drops_only_that_location(self):
+        """Test invalidation removes every entry for the location and nothing else."""
+        service = CachingService(InMemoryCache())
+        hazards = [HazardType.FLOOD]
+        await service.set_risk_assessment(37.7749, -122.4194, hazards, {"v": 1})
+        await service.set_risk_assessment(
+            37.7749, -122.4194, hazards, {"v": 2}, risk_factors={"population_density": 10.0}
+        )
+        await service.set_risk_assessment(37.7749, -122.41942, [HazardType.FIRE], {"v": 3})
+        await service.set_risk_assessment(37.7749, -122.419, hazards, {"v": 4})
+        
+        await service.invalidate_location(37.7749, -122.4194)
+        
+        assert await service.get_risk_assessment(37.7749, -122.4194, hazards) is None
+        assert await service.get_risk_assessment(
+            37.7749, -122.4194, hazards, {"population_density": 10.0}
+        ) is None
+        assert await service.get_risk_assessment(37.7749, -122.4194, [HazardType.FIRE]) is None
+        assert await service.get_risk_assessment(37.7749, -122.419, hazards) == {"v": 4}
+    
+    async def test_get_risk_assessments_batches_lookups(self):
+        """Test a batch lookup returns per-point results and updates hit counts."""
+        service = CachingService(InMemoryCache())
+        await service.set_risk_assessment(37.7749, -122.4194, [HazardType.FLOOD], {"v": 1})
+        await service.set_risk_assessment(
+            40.7128, -74.006, [HazardType.FIRE], {"v": 2}, ttl_seconds=-1
+        )
+        
+        results = await service.get_risk_assessments([
+            (37.7749, -122.4194, [HazardType.FLOOD]),
+            (40.7128, -74.006, [HazardType.FIRE]),
+            (1.0, 1.0, [HazardType.STORM]),
+        ])
+        
+        assert results == [{"v": 1}, None, None]
+        assert service.hit_count == 1
+        assert service.miss_count == 2
+    
+    async def test_concurrent_misses_share_one_computation(self):
+        """Test concurrent misses for one key run the computation once and then hit."""
+        service = CachingService(InMemoryCache())
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"risk_score": 42.0}
+        
+        results = await asyncio.gather(*[
+            service.get_or_compute_risk_assessment(37.7749, -122.4194, [HazardType.FLOOD], compute)
+            for _ in range(5)
+        ])
+        cached = await service.get_or_compute_risk_assessment(
+            37.7749, -122.4194, [HazardType.FLOOD], compute
+        )
+        
+        assert len(calls) == 1
+        assert results == [{"risk_score": 42.0}] * 5
+        assert cached == {"risk_score": 42.0}
+        assert service.hit_count == 1
+    
+    async def test_failed_computation_is_not_cached(self):
+        """Test a failing computation propagates and the next call retries."""
+        service = CachingService(InMemoryCache())
+        
+        async def fail():
+            raise RuntimeError("engine down")
+        
+        async def succeed():
+            return {"risk_score": 1.0}
+        
+        with pytest.raises(RuntimeError):
+            await service.get_or_compute_risk_assessment(1.0, 1.0, [HazardType.FIRE], fail)
+        
+        assert await service.get_or_compute_risk_assessment(
+            1.0, 1.0, [HazardType.FIRE], succeed
+        ) == {"risk_score": 1.0}
@@ -4,14 +4,61 @@ import csv
 import io
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
+from sqlalchemy import select
 
-from app.services.export_service import ExportService, DataTransformationPipeline
+from app.services import export_service
+from app.services.export_service import (
+    ExportService, DataTransformationPipeline, _render_rows_to_csv, _render_risk_report_csv
+)
 from app.models import (
-    Location, RiskAssessment, Hazard, HistoricalData,
-    HazardType, RiskLevel
+    Location, RiskAssessment, RiskHotspot, Hazard, HistoricalData,
+    HazardType, RiskLevel, HOT_RISK_LEVEL_PREDICATE
 )
 
 
+class TestRenderRowsToCsv:
+    """Tests for the thread-safe CSV rendering helper."""
+    
+    def test_render_with_and_without_header(self):
+        """Test rows render in column order, optionally without the header."""
+        rows = [(1, 2), ("x,y", None)]
+        
+        with_header = _render_rows_to_csv(["a", "b"], rows)
+        without_header = _render_rows_to_csv(["a", "b"], rows, include_header=False)
+        
+        assert list(csv.reader(io.StringIO(with_header))) == [
+            ["a", "b"], ["1", "2"], ["x,y", ""]
+        ]
+        assert without_header == with_header.split("\r\n", 1)[1]
+    
+    def test_risk_report_schema_matches_columns(self):
+        """Test the Arrow schema lists the report columns in order."""
+        pytest.importorskip("pyarrow")
+        
+        assert export_service._RISK_REPORT_SCHEMA.names == ExportService.RISK_REPORT_COLUMNS
+    
+    def test_risk_report_arrow_matches_csv_module(self, monkeypatch):
+        """Test Arrow and csv-module rendering parse to the same rows."""
+        pytest.importorskip("pyarrow")
+        
+        row = (
+            1, 2, 'Quote "City", CA', 37.7749, -122.4194, 'earthquake',
+            65.5, 'high', 0.8, 7000.0, 8.5, 7.5, '2024-01-01T00:00:00',
+            'Retrofit; Insure'
+        )
+        
+        arrow_rows = list(csv.DictReader(io.StringIO(_render_risk_report_csv([row]))))
+        monkeypatch.setattr(export_service, "pa", None)
+        plain_rows = list(csv.DictReader(io.StringIO(_render_risk_report_csv([row]))))
+        
+        assert len(arrow_rows) == len(plain_rows) == 1
+        for column in ExportService.RISK_REPORT_COLUMNS:
+            try:
+                assert float(arrow_rows[0][column]) == float(plain_rows[0][column])
+            except ValueError:
+                assert arrow_rows[0][column] == plain_rows[0][column]
+
+
 class TestDataTransformationPipeline:
     """Tests for data transformation pipeline."""
     
@@ -144,6 +191,14 @@ class TestDataTransformationPipeline:
         assert HazardType.FIRE in result  # wildfire -> fire
         assert HazardType.STORM in result  # hurricane -> storm
     
+    def test_normalize_hazard_types_skips_unknown(self):
+        """Test unknown names are dropped while order and padding are handled."""
+        result = DataTransformationPipeline.normalize_hazard_types(
+            [" Cyclone ", "meteor", "flood"]
+        )
+        
+        assert result == [HazardType.STORM, HazardType.FLOOD]
+    
     def test_normalize_hazard_types_default(self):
         """Test default hazard types when input is empty or invalid."""
         result = DataTransformationPipeline.normalize_hazard_types([])
@@ -157,8 +212,8 @@ class TestExportServiceCSVGeneration:
     """Tests for CSV generation functionality."""
     
     @pytest.mark.asyncio
-    async def test_assessment_to_csv_row(self, db_session):
-        """Test conversion of assessment to CSV row."""
+    async def test_report_row_to_csv_row(self, db_session):
+        """Test conversion of a report query row to a CSV row."""
         # Create test data
         location = Location(
             id=1,
@@ -187,11 +242,17 @@ class TestExportServiceCSVGeneration:
             recommendations=["Retrofit buildings", "Emergency plan"],
             assessed_at=datetime(2024, 1, 15, 12, 0, 0)
         )
-        assessment.location = location
-        assessment.hazard = hazard
+        db_session.add_all([location, hazard, assessment])
+        await db_session.flush()
         
         service = ExportService(db_session)
-        row = service._assessment_to_csv_row(assessment)
+        result = await db_session.execute(
+            service._risk_report_query(None, None, None, None, None, None, None)
+        )
+        row = dict(zip(
+            ExportService.RISK_REPORT_COLUMNS,
+            service._report_row_to_csv_row(result.one())
+        ))
         
         assert row['assessment_id'] == 1
         assert row['location_id'] == 1
@@ -277,6 +338,17 @@ class TestExportServiceCSVGeneration:
         for row in rows:
             assert row['risk_level'] in ['high', 'critical']
     
+    def test_risk_level_filters_match_partial_index(self, db_session):
+        """Test the partial index predicate is added only for high/critical filters."""
+        service = ExportService(db_session)
+        
+        hot = service._risk_level_filters([RiskLevel.CRITICAL])
+        mixed = service._risk_level_filters([RiskLevel.LOW, RiskLevel.HIGH])
+        
+        assert len(hot) == 2
+        assert str(hot[1]) == HOT_RISK_LEVEL_PREDICATE
+        assert len(mixed) == 1
+    
     @pytest.mark.asyncio
     async def test_generate_risk_report_csv_with_min_score(
         self, db_session, sample_assessments
@@ -346,6 +418,41 @@ class TestExportServiceStreaming:
         # Should have multiple chunks for large dataset
         # (1 header + ceil(records / BATCH_SIZE))
         assert chunk_count > 1
+    
+    @pytest.mark.asyncio
+    async def test_stream_risk_report_csv_batches_cover_every_row(
+        self, db_session, sample_assessments, monkeypatch
+    ):
+        """Test that rows spread over several keyset batches are each streamed once."""
+        service = ExportService(db_session)
+        monkeypatch.setattr(service, "BATCH_SIZE", 2)
+        
+        full_csv = ""
+        async for chunk in service.stream_risk_report_csv():
+            full_csv += chunk
+        
+        rows = list(csv.DictReader(io.StringIO(full_csv)))
+        
+        assert sorted(int(row['assessment_id']) for row in rows) == sorted(
+            assessment.id for assessment in sample_assessments
+        )
+        assert all(row['location_name'] for row in rows)
+    
+    @pytest.mark.asyncio
+    async def test_stream_risk_report_csv_flushes_by_buffer_size(
+        self, db_session, sample_assessments, monkeypatch
+    ):
+        """Test that buffered batches are yielded once the flush size is reached."""
+        service = ExportService(db_session)
+        monkeypatch.setattr(service, "BATCH_SIZE", 1)
+        
+        unbuffered = [chunk async for chunk in service.stream_risk_report_csv()]
+        monkeypatch.setattr(service, "STREAM_FLUSH_BYTES", 1)
+        flushed = [chunk async for chunk in service.stream_risk_report_csv()]
+        
+        assert len(unbuffered) == 2
+        assert len(flushed) == len(sample_assessments) + 1
+        assert ''.join(flushed) == ''.join(unbuffered)
 
 
 class TestBatchProcessing:
@@ -395,9 +502,9 @@ class TestBatchProcessing:
     
     @pytest.mark.asyncio
     async def test_batch_process_locations_save_to_db(
-        self, db_session, sample_hazards
+        self, db_session, hotspot_refresher, sample_hazards
     ):
-        """Test batch processing with database saving."""
+        """Test batch processing with database saving queues the hotspot rebuilds."""
         service = ExportService(db_session)
         
         coordinates = [
@@ -409,9 +516,43 @@ class TestBatchProcessing:
             save_to_db=True
         )
         
+        await hotspot_refresher.flush()
+        ranked = await db_session.execute(select(RiskHotspot.hazard_id))
+        
         assert len(results) == 1
         assert results[0]['location']['id'] is not None  # Should have DB ID
         assert all('id' in a for a in results[0]['assessments'])
+        assert sorted(ranked.scalars().all()) == sorted(h.id for h in sample_hazards)
+    
+    @pytest.mark.asyncio
+    async def test_batch_process_save_to_db_bulk_ids(
+        self, db_session, hotspot_refresher, sample_hazards
+    ):
+        """Test bulk-inserted locations and assessments get their generated IDs."""
+        service = ExportService(db_session)
+        
+        coordinates = [
+            {"lat": 30.0 + i * 0.5, "lon": -100.0 - i * 0.5, "name": f"Bulk_{i}"}
+            for i in range(5)
+        ]
+        
+        results = await service.batch_process_locations(
+            coordinates=coordinates,
+            save_to_db=True
+        )
+        
+        location_ids = [r['location']['id'] for r in results]
+        assessment_ids = [a['id'] for r in results for a in r['assessments']]
+        
+        assert None not in location_ids
+        assert None not in assessment_ids
+        assert len(set(assessment_ids)) == 5 * len(sample_hazards)
+        
+        stored = await db_session.execute(
+            select(RiskAssessment).where(RiskAssessment.id.in_(assessment_ids))
+        )
+        for assessment in stored.scalars().all():
+            assert assessment.location_id in location_ids
     
     @pytest.mark.asyncio
     async def test_batch_process_large_dataset(
@@ -460,6 +601,29 @@ class TestBatchProcessing:
         # Only valid coordinate should be processed
         assert len(results) == 1
         assert results[0]['location']['name'] == "Valid"
+    
+    @pytest.mark.asyncio
+    async def test_batch_process_scores_add_location_factors(
+        self, db_session, sample_hazards
+    ):
+        """Test each hazard score is its base score plus the shared location factors."""
+        service = ExportService(db_session)
+        
+        results = await service.batch_process_locations(
+            coordinates=[{
+                "lat": 37.7749, "lon": -122.4194, "name": "Scored",
+                "population_density": 5000, "building_code_rating": 8.0,
+                "infrastructure_quality": 7.0
+            }],
+            hazard_types=[HazardType.EARTHQUAKE, HazardType.FLOOD],
+            save_to_db=False
+        )
+        
+        assessments = {a['hazard_type']: a for a in results[0]['assessments']}
+        assert assessments['earthquake']['risk_score'] == 96.5
+        assert assessments['flood']['risk_score'] == 86.5
+        assert assessments['earthquake']['risk_level'] == 'critical'
+        assert all(a['confidence_level'] == 0.9 for a in assessments.values())
 
 
 class TestHistoricalTrends:
@@ -648,3 +812,33 @@ class TestCSVValidation:
         rows = list(reader)
         
         assert any('Test, City' in row['location_name'] for row in rows)
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_arrow", [True, False])
+    async def test_csv_quoting_of_special_characters(self, db_session, monkeypatch, use_arrow):
+        """Test both renderers escape a name with a comma and quotes.
+        
+        Arrow's quoting_style='needed' quotes every string field, while the
+        csv module quotes only fields that contain special characters.
+        """
+        if use_arrow:
+            pytest.importorskip("pyarrow")
+        else:
+            monkeypatch.setattr(export_service, "pa", None)
+        
+        name = 'Quote "City", CA'
+        location = Location(name=name, latitude=37.7749, longitude=-122.4194)
+        hazard = Hazard(hazard_type=HazardType.EARTHQUAKE, name="Test", base_severity=5.0)
+        db_session.add_all([location, hazard])
+        await db_session.flush()
+        db_session.add(RiskAssessment(
+            location_id=location.id, hazard_id=hazard.id, risk_score=50.0,
+            risk_level=RiskLevel.MODERATE, confidence_level=0.7
+        ))
+        await db_session.commit()
+        
+        csv_data = await ExportService(db_session).generate_risk_report_csv()
+        
+        assert '"Quote ""City"", CA"' in csv_data
+        assert (',"earthquake",' if use_arrow else ',earthquake,') in csv_data
+        assert list(csv.DictReader(io.StringIO(csv_data)))[0]['location_name'] == name
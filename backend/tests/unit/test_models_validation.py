@@ -1,9 +1,14 @@
 """Unit tests for database models."""
 import pytest
 from datetime import datetime
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
+from sqlalchemy.orm import selectinload
 
-from app.models import Location, Hazard, HazardType, RiskLevel, RiskAssessment, HistoricalData
+from app.models import (
+    Location, Hazard, HazardType, RiskLevel, RiskAssessment, HistoricalData, risk_level_for_score,
+    HOT_RISK_LEVEL_PREDICATE
+)
 
 
 @pytest.mark.asyncio
@@ -69,6 +74,19 @@ class TestLocationModel:
         
         assert location.updated_at >= original_updated
     
+    async def test_location_updated_at_readable_after_update(self, db_session):
+        """Test updated_at can be read after an ORM update without a refresh."""
+        location = Location(name="Eager", latitude=0.0, longitude=0.0)
+        db_session.add(location)
+        await db_session.commit()
+        original_updated = location.updated_at
+        
+        location.name = "Eager Renamed"
+        await db_session.commit()
+        
+        # An expired attribute would lazy-load here and raise MissingGreenlet
+        assert location.updated_at >= original_updated
+    
     async def test_location_cascade_delete_assessments(self, db_session, sample_hazards):
         """Test that deleting location cascades to risk assessments."""
         location = Location(
@@ -150,12 +168,33 @@ class TestHazardModel:
         
         assert hazard.weight_factors["drainage"] == 0.4
         assert sum(hazard.weight_factors.values()) == pytest.approx(1.0)
+    
+    async def test_hazard_updated_at_readable_after_update(self, db_session):
+        """Test updated_at can be read after an ORM update without a refresh."""
+        hazard = Hazard(hazard_type=HazardType.STORM, name="Storm", base_severity=5.0)
+        db_session.add(hazard)
+        await db_session.commit()
+        original_updated = hazard.updated_at
+        
+        hazard.base_severity = 6.0
+        await db_session.commit()
+        
+        assert hazard.updated_at >= original_updated
 
 
 @pytest.mark.asyncio
 class TestRiskAssessmentModel:
     """Test RiskAssessment model."""
     
+    async def test_risk_level_for_score_boundaries(self):
+        """Test each level starts at its lower bound and out-of-range scores clamp to the ends."""
+        assert risk_level_for_score(-1.0) == RiskLevel.LOW
+        assert risk_level_for_score(24.99) == RiskLevel.LOW
+        assert risk_level_for_score(25.0) == RiskLevel.MODERATE
+        assert risk_level_for_score(50.0) == RiskLevel.HIGH
+        assert risk_level_for_score(75.0) == RiskLevel.CRITICAL
+        assert risk_level_for_score(150.0) == RiskLevel.CRITICAL
+    
     async def test_create_risk_assessment(self, db_session, sample_hazards):
         """Test creating a complete risk assessment."""
         location = Location(
@@ -222,6 +261,34 @@ class TestRiskAssessmentModel:
         # Test relationships
         assert assessment.location.name == "Relationship Test"
         assert assessment.hazard.hazard_type == hazard.hazard_type
+    
+    async def test_relationships_require_eager_loading(self, db_session, sample_assessments):
+        """Test relationships never lazy-load with SQL; selectinload must be used."""
+        assessment_id = sample_assessments[0].id
+        db_session.expunge_all()
+        
+        result = await db_session.execute(
+            select(Location).where(Location.id == sample_assessments[0].location_id)
+        )
+        location = result.scalar_one()
+        
+        with pytest.raises(InvalidRequestError):
+            location.risk_assessments
+        
+        result = await db_session.execute(
+            select(RiskAssessment)
+            .options(selectinload(RiskAssessment.location))
+            .where(RiskAssessment.id == assessment_id)
+        )
+        assert result.scalar_one().location.id == location.id
+    
+    async def test_hot_partial_index_created_with_schema(self, db_session):
+        """Test create_all builds the high/critical partial index from migration 008."""
+        result = await db_session.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_risk_assessments_hot'"
+        ))
+        
+        assert result.scalar_one().endswith(f"WHERE {HOT_RISK_LEVEL_PREDICATE}")
 
 
 @pytest.mark.asyncio
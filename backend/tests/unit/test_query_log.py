@@ -0,0 +1,53 @@
+"""Unit tests for the per-request query log summary."""
+import json
+import logging
+from collections import Counter
+
+import pytest
+
+from app.db.session import N_PLUS_ONE_THRESHOLD, log_request_query_summary, summarize_queries_after_body
+
+
+def _scope(statements: Counter) -> dict:
+    return {"request_id": "abc", "endpoint": "GET /api/test", "statements": statements}
+
+
+def test_summary_reports_repeated_statements(caplog):
+    """Test statements at the N+1 threshold are listed and logged as a warning."""
+    statements = Counter({"SELECT hazards": N_PLUS_ONE_THRESHOLD, "SELECT locations": 1})
+    
+    with caplog.at_level(logging.INFO, logger="app.db.queries"):
+        log_request_query_summary(_scope(statements))
+    
+    record = caplog.records[-1]
+    summary = json.loads(record.getMessage())
+    assert record.levelno == logging.WARNING
+    assert summary["query_count"] == N_PLUS_ONE_THRESHOLD + 1
+    assert summary["repeated"] == [{"statement": "SELECT hazards", "count": N_PLUS_ONE_THRESHOLD}]
+
+
+def test_summary_without_repeats_is_info(caplog):
+    """Test a request with distinct statements is summarized at INFO level."""
+    with caplog.at_level(logging.INFO, logger="app.db.queries"):
+        log_request_query_summary(_scope(Counter({"SELECT 1": 1, "SELECT 2": 1})))
+    
+    record = caplog.records[-1]
+    assert record.levelno == logging.INFO
+    assert json.loads(record.getMessage())["repeated"] == []
+
+
+@pytest.mark.asyncio
+async def test_summary_waits_for_streamed_body(caplog):
+    """Test queries run while a body streams are counted before the summary is logged."""
+    scope = _scope(Counter())
+    
+    async def body():
+        scope["statements"]["SELECT streamed"] += 1
+        yield b"chunk"
+    
+    with caplog.at_level(logging.INFO, logger="app.db.queries"):
+        chunks = [chunk async for chunk in summarize_queries_after_body(body(), scope)]
+    
+    assert chunks == [b"chunk"]
+    assert len(caplog.records) == 1
+    assert json.loads(caplog.records[0].getMessage())["query_count"] == 1
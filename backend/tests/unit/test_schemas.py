@@ -6,6 +6,7 @@ from pydantic import ValidationError
 from app.schemas import (
     LocationCreate,
     LocationUpdate,
+    LocationBounds,
     HazardCreate,
     RiskAssessmentRequest,
     RiskFactors,
@@ -76,6 +77,17 @@ class TestLocationSchemas:
         update = LocationUpdate(name="Updated Name")
         assert update.name == "Updated Name"
         assert update.latitude is None
+    
+    def test_location_bounds_ordering(self):
+        """Test bounding boxes must have min strictly below max."""
+        bounds = LocationBounds(min_lat=30.0, max_lat=40.0, min_lon=-125.0, max_lon=-115.0)
+        assert bounds.max_lat == 40.0
+        
+        with pytest.raises(ValidationError):
+            LocationBounds(min_lat=40.0, max_lat=30.0, min_lon=-125.0, max_lon=-115.0)
+        
+        with pytest.raises(ValidationError):
+            LocationBounds(min_lat=30.0, max_lat=40.0, min_lon=-115.0, max_lon=-115.0)
 
 
 class TestHazardSchemas: